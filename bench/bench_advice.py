@@ -0,0 +1,148 @@
+# bench/bench_advice.py
+# Micro-benchmark: generate_advice throughput with the prebuilt catalog index vs. the
+# previous per-call catalog walk (dict lookups, isinstance checks, mode gating, fallback
+# flattening). Both paths draw from an identically seeded RNG and must produce equal output.
+# Run from the repo root:  python -m bench.bench_advice
+
+import random
+import time
+
+import feedback.advice_pkg.builder as builder
+from feedback.advice_pkg.bands import band_for_stat, value_from_context
+from feedback.catalog import COMPOUND_FLAGS, PHRASE_BOOK, TIP_LINES
+
+ITERATIONS = 20_000
+REPEATS = 5
+
+
+def _legacy_flatten(lines_def):
+    if isinstance(lines_def, list):
+        return [s for s in lines_def if isinstance(s, str) and s.strip()]
+    if isinstance(lines_def, dict):
+        out = []
+        for v in lines_def.values():
+            if isinstance(v, list):
+                out.extend([s for s in v if isinstance(s, str) and s.strip()])
+        return out
+    return []
+
+
+def _legacy_line(stat, polarity, context, rng=None):
+    """The previous choose_banded_line, kept here for comparison."""
+    rng = rng or random
+    lines_def = PHRASE_BOOK.get(stat, {}).get(polarity, [])
+    if isinstance(lines_def, list):
+        flat = _legacy_flatten(lines_def)
+        return rng.choice(flat) if flat else None
+    if isinstance(lines_def, dict):
+        band = band_for_stat(stat, value_from_context(stat, context), polarity)
+        lines = lines_def.get(band) or []
+        if not lines:
+            flat = _legacy_flatten(lines_def)
+            return rng.choice(flat) if flat else None
+        return rng.choice(lines)
+    return None
+
+
+def _legacy_tip(stat, context, mode, rng=None):
+    """The previous choose_banded_tip, kept here for comparison."""
+    rng = rng or random
+    entry = TIP_LINES.get(stat)
+    if not isinstance(entry, dict):
+        return None
+    allowed = entry.get("modes", ["ALL"])
+    if "ALL" not in allowed and mode not in allowed:
+        return None
+    text = entry.get("text")
+    if isinstance(text, str):
+        return text
+    if isinstance(text, dict):
+        lines = text.get(band_for_stat(stat, value_from_context(stat, context), "positive")) or []
+        if lines and isinstance(lines, list):
+            return rng.choice(lines)
+    return None
+
+
+def _legacy_flag(flags, mode, rng=None):
+    """The previous select_flag_phrase, kept here for comparison."""
+    rng = rng or random
+    for flag in flags:
+        if not isinstance(flag, str):
+            continue
+        entry = COMPOUND_FLAGS.get(flag)
+        if not isinstance(entry, dict):
+            continue
+        allowed = entry.get("modes", ["ALL"])
+        if "ALL" not in allowed and mode not in allowed:
+            continue
+        lines = entry.get("lines", [])
+        if lines:
+            return rng.choice(lines)
+    return None
+
+
+def _workload():
+    # A spread of tag sets across both modes; the critique/tip loops see gated and missing stats
+    stats = sorted(PHRASE_BOOK)
+    flags = sorted(COMPOUND_FLAGS)
+    rng = random.Random(0)
+    jobs = []
+    for i in range(200):
+        hi, lo = rng.sample(stats, 2)
+        ctx = {s: rng.uniform(-20, 800) for s in stats}
+        ctx["killParticipation"] = rng.random()
+        tags = {
+            "highlight": hi,
+            "lowlight": lo,
+            "praises": rng.sample(stats, 3),
+            "critiques": rng.sample(stats, 3),
+            "compound_flags": ["unknown_flag"] + rng.sample(flags, 2),
+        }
+        jobs.append((tags, ctx, "TURBO" if i % 2 else "NON_TURBO"))
+    return jobs
+
+
+def _run(jobs):
+    # One RNG per run: identical draws on both paths keep the outputs comparable
+    rng = random.Random(0)
+    out = []
+    for n in range(ITERATIONS):
+        tags, ctx, mode = jobs[n % len(jobs)]
+        out.append(builder.generate_advice(tags, ctx, mode=mode, rng=rng))
+    return out
+
+
+def _timed(jobs):
+    start = time.perf_counter()
+    out = _run(jobs)
+    return time.perf_counter() - start, out
+
+
+def _use(selectors):
+    builder.choose_banded_line, builder.choose_banded_tip, builder.select_flag_phrase = selectors
+
+
+def main():
+    jobs = _workload()
+    indexed = (builder.choose_banded_line, builder.choose_banded_tip, builder.select_flag_phrase)
+    legacy = (_legacy_line, _legacy_tip, _legacy_flag)
+
+    # Alternate the two paths and keep the best of REPEATS runs to damp warm-up and noise
+    best = {"catalog index": float("inf"), "catalog walk": float("inf")}
+    outputs = {}
+    try:
+        for _ in range(REPEATS):
+            for label, selectors in (("catalog index", indexed), ("catalog walk", legacy)):
+                _use(selectors)
+                secs, outputs[label] = _timed(jobs)
+                best[label] = min(best[label], secs)
+    finally:
+        _use(indexed)
+
+    assert outputs["catalog index"] == outputs["catalog walk"], "indexed selection diverged from the catalog walk"
+    print(f"{'path':>14} {'advice/s':>12} {'µs/call':>10}")
+    for label, secs in best.items():
+        print(f"{label:>14} {ITERATIONS / secs:>12,.0f} {secs / ITERATIONS * 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# bench/bench_stats_record.py
+# Micro-benchmark: stats dict (extract_player_stats + None-sweep) vs. the PlayerStats record,
+# both fed to the NON_TURBO engine. Reports time, peak allocation and retained bytes per player.
+# Run from the repo root:  python -m bench.bench_stats_record
+
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from feedback.engine import analyze_player
+from feedback.extract import extract_player_stats
+from feedback.player_stats import extract_player_record
+
+SAMPLE = Path(__file__).resolve().parent.parent / "tests" / "samples" / "match_normal.json"
+ITERATIONS = 20_000
+RETAINED = 2_000
+
+
+def _legacy_stats(player, match):
+    """The former formatter path: extracted dict, duration injection, None-sweep."""
+    stats = extract_player_stats(player, player.get("stats", {}), 0, "NON_TURBO")
+    stats["durationSeconds"] = match.get("durationSeconds", 0)
+    for k in list(stats.keys()):
+        if stats[k] is None:
+            stats[k] = "" if k in {"lane", "roleBasic"} else ({} if k == "statsBlock" else 0)
+    return stats
+
+
+def _record_stats(player, match):
+    return extract_player_record(player, player.get("stats", {}), "NON_TURBO", match.get("durationSeconds", 0))
+
+
+def _per_player_us(build, player, match) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        analyze_player(build(player, match), {}, "", 30)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def _allocations(build, player, match):
+    """(peak bytes traced during one analysis, bytes held per retained stats object)."""
+    tracemalloc.start()
+    analyze_player(build(player, match), {}, "", 30)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    kept = [build(player, match) for _ in range(RETAINED)]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return peak, retained / RETAINED
+
+
+def main():
+    match = json.loads(SAMPLE.read_text(encoding="utf-8"))
+    player = match["players"][0]
+    assert _record_stats(player, match).to_dict() == _legacy_stats(player, match)
+
+    print(f"{'stats shape':>12} {'µs/analysis':>12} {'peak B/analysis':>16} {'retained B/player':>18}")
+    for label, build in (("dict", _legacy_stats), ("PlayerStats", _record_stats)):
+        us = _per_player_us(build, player, match)
+        peak, retained = _allocations(build, player, match)
+        print(f"{label:>12} {us:>12.2f} {peak:>16,} {retained:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# bot/analysis_cache.py
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from bot.config import RUNTIME_DIR
+from feedback.catalog import CATALOG_VERSION, ENGINE_VERSION
+
+# Memoized match analysis (stats extraction → engine → advice → title), keyed on
+# (match_id, steam_id, ENGINE_VERSION, CATALOG_VERSION). Output is deterministic per
+# match:player, so re-formatting the same player-match (pending upgrades, retries, debug
+# runs) is a lookup. In-memory LRU (ANALYSIS_CACHE_SIZE, default 256) with an optional
+# SQLite tier under the runtime dir (ANALYSIS_CACHE_DISK=1, ANALYSIS_CACHE_DISK_MAX rows,
+# least recently used evicted first).
+_DEFAULT_SIZE = 256
+_DEFAULT_DISK_MAX = 5000
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    return int(raw) if raw.isdigit() else default
+
+
+def _truthy(v: str | None) -> bool:
+    return str(v or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def analysis_key(match_id, steam_id) -> str:
+    return f"{match_id}:{steam_id}:{ENGINE_VERSION}:{CATALOG_VERSION}"
+
+
+class AnalysisCache:
+    def __init__(self, max_items: int, disk_path: str | None = None, disk_max: int = _DEFAULT_DISK_MAX):
+        self.max_items = max_items
+        self.disk_path = disk_path
+        self.disk_max = disk_max
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, dict]" = OrderedDict()
+        self._conn = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.disk_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.disk_path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                " key TEXT PRIMARY KEY, payload TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(analyses)")}
+            if "last_used" not in columns:
+                # Tier written before last_used existed: start every row at its insert time
+                conn.execute("ALTER TABLE analyses ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+                conn.execute("UPDATE analyses SET last_used = created")
+            conn.execute("CREATE INDEX IF NOT EXISTS analyses_last_used ON analyses (last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, value: dict) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(value)
+            if self.disk_path:
+                try:
+                    conn = self._connect()
+                    row = conn.execute("SELECT payload FROM analyses WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        conn.execute("UPDATE analyses SET last_used = ? WHERE key = ?", (time.time(), key))
+                        conn.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Analysis cache read failed: {e}")
+                    row = None
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return copy.deepcopy(value)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: dict) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, value)
+            if not self.disk_path:
+                return
+            try:
+                conn = self._connect()
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO analyses (key, payload, created, last_used) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, separators=(",", ":"), ensure_ascii=False), now, now),
+                )
+                conn.execute(
+                    "DELETE FROM analyses WHERE key IN ("
+                    " SELECT key FROM analyses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_max,),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Analysis cache write failed: {e}")
+
+    def get_or_compute(self, key: str, compute: Callable[[], dict]) -> dict:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        value = compute()
+        self.put(key, value)
+        return copy.deepcopy(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+_CACHE: AnalysisCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            disk = os.path.join(RUNTIME_DIR, "analysis.sqlite3") if _truthy(os.getenv("ANALYSIS_CACHE_DISK")) else None
+            _CACHE = AnalysisCache(
+                max(1, _env_int("ANALYSIS_CACHE_SIZE", _DEFAULT_SIZE)),
+                disk,
+                _env_int("ANALYSIS_CACHE_DISK_MAX", _DEFAULT_DISK_MAX),
+            )
+        return _CACHE
+
+
+def cached_analysis(match_id, steam_id, compute: Callable[[], Any]) -> dict:
+    """Return the memoized analysis for this player-match, computing it on a miss."""
+    if match_id is None or steam_id is None:
+        return compute()
+    return get_analysis_cache().get_or_compute(analysis_key(match_id, steam_id), compute)
+
+
+def analysis_cache_stats() -> dict:
+    return get_analysis_cache().stats()
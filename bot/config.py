@@ -26,3 +26,6 @@ if CONFIG.get("test_mode", False):
     CONFIG["webhook_enabled"] = False
     CONFIG["webhook_url"] = None
     print("🧪 Test mode is ON — will not post to Discord or update state.")
+
+# Local runtime directory for caches and persisted run data (override with GUILDBOT_RUNTIME_DIR)
+RUNTIME_DIR = os.getenv("GUILDBOT_RUNTIME_DIR") or os.path.join(os.path.dirname(__file__), '..', 'data', 'runtime')
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from typing import TypedDict, Literal, Optional, Union, Any
+from typing import TypedDict, Literal, Optional, Union, Any, Dict, Iterable
 
-from bot.stratz import fetch_latest_match, fetch_full_match
+from bot.stratz import fetch_latest_match, fetch_latest_matches, fetch_imp_readiness
+from bot.match_cache import get_full_match
 
 # ---- Types & constants (documentation + static checking) --------------------
 
@@ -18,6 +19,8 @@ class LatestMatchBundle(TypedDict):
 
 
 ReturnType = Union[LatestMatchBundle, QuotaError, None]
+# {steam_id: match_id}; a None value means the batched poll failed for that player
+LatestIdMap = Dict[int, Optional[int]]
 
 QUOTA_SIGNAL: QuotaError = {"error": "quota_exceeded"}
 
@@ -47,16 +50,73 @@ def _extract_match_id(latest: Any) -> Optional[int]:
         return None
 
 
-def get_latest_new_match(steam_id: int, last_posted_id: str | None) -> ReturnType:
+def poll_latest_match_ids(steam_ids: Iterable[int]) -> Union[LatestIdMap, QuotaError, None]:
+    """
+    Poll the most recent match ID for the whole roster in batched Stratz queries.
+    Returns {steam_id: match_id} (players without a match are absent), the quota signal,
+    or None when the poll itself errored. Players whose chunk failed map to None, so
+    get_latest_new_match looks only those up individually instead of treating them as
+    having no new match.
+    """
+    failed: list = []
+    try:
+        latest = fetch_latest_matches([int(s) for s in steam_ids], failed=failed)
+    except Exception as e:
+        print(f"❌ Error in poll_latest_match_ids: {type(e).__name__}: {e}")
+        return None
+
+    if _is_quota(latest):
+        print("🛑 Quota exceeded while polling latest matches")
+        return QUOTA_SIGNAL
+
+    polled: LatestIdMap = {int(sid): mid for sid, mid in (latest or {}).items()}
+    if failed:
+        print(f"❌ Batched latest-match poll failed for {len(failed)} players — they will be looked up individually")
+        for sid in failed:
+            polled[int(sid)] = None
+    return polled
+
+
+def probe_imp_readiness(match_ids: Iterable[int]) -> Union[Dict[int, Dict[int, Any]], QuotaError]:
+    """
+    Ask Stratz which players of these matches have IMP yet, in batched lightweight queries.
+    Returns {match_id: {steam_id: imp_or_None}} (matches the probe failed for are absent) or the quota signal.
+    """
+    try:
+        readiness = fetch_imp_readiness([int(m) for m in match_ids])
+    except Exception as e:
+        print(f"❌ Error in probe_imp_readiness: {type(e).__name__}: {e}")
+        return {}
+
+    if _is_quota(readiness):
+        print("🛑 Quota exceeded while probing IMP readiness")
+        return QUOTA_SIGNAL
+
+    return readiness or {}
+
+
+def get_latest_new_match(
+    steam_id: int,
+    last_posted_id: str | None,
+    latest_ids: Optional[LatestIdMap] = None,
+) -> ReturnType:
     """
     Fetch and compare most recent match for a player. If it's new, return full data.
     Otherwise, return None to skip. Detects quota exhaustion and returns signal.
+
+    When `latest_ids` (from poll_latest_match_ids) is given, the latest match ID is
+    read from it instead of issuing a per-player Stratz query, except for players the
+    batched poll failed for (mapped to None), which are looked up individually.
     """
     try:
         if not isinstance(steam_id, int):
             print(f"⚠️ steam_id should be int, got {type(steam_id).__name__} -> {steam_id}")
 
-        latest = fetch_latest_match(steam_id)
+        if latest_ids is not None and latest_ids.get(steam_id, 0) is not None:
+            mid = latest_ids.get(steam_id)
+            latest = {"match_id": mid} if mid is not None else None
+        else:
+            latest = fetch_latest_match(steam_id)
 
         if _is_quota(latest):
             print(f"🛑 Quota exceeded while fetching latest match for {steam_id}")
@@ -72,7 +132,7 @@ def get_latest_new_match(steam_id: int, last_posted_id: str | None) -> ReturnTyp
             print(f"⏩ Match {match_id} already posted for {steam_id}")
             return None
 
-        full_data = fetch_full_match(match_id)
+        full_data = get_full_match(match_id)
 
         if _is_quota(full_data):
             print(f"🛑 Quota exceeded while fetching full data for match {match_id}")
@@ -6,7 +6,7 @@ import random
 from feedback.engine import analyze_player as analyze_normal
 from feedback.engine_turbo import analyze_player as analyze_turbo
 from feedback.advice import generate_advice, get_title_phrase
-from feedback.extract import extract_player_stats
+from feedback.player_stats import extract_player_record
 from datetime import datetime
 import os
 
@@ -14,7 +14,9 @@ import os
 from bot.formatter_pkg.stats_sets import NORMAL_STATS, TURBO_STATS
 from bot.formatter_pkg.mode import resolve_game_mode_name, is_turbo_mode
 from bot.formatter_pkg.util import normalize_hero_name, get_role, get_baseline
-from bot.formatter_pkg.embed import build_discord_embed, build_fallback_embed
+from bot.analysis_cache import cached_analysis
+from bot.match_context import MatchContext, match_context
+from bot.formatter_pkg.embed import build_discord_embed, build_fallback_embed, embed_content_hash
 
 __all__ = [
     # constants
@@ -22,58 +24,66 @@ __all__ = [
     # main formatters
     "format_match_embed", "format_fallback_embed",
     # embed builders
-    "build_discord_embed", "build_fallback_embed",
+    "build_discord_embed", "build_fallback_embed", "embed_content_hash",
     # utilities (deprecated kept public)
     "normalize_hero_name", "get_role", "get_baseline",
 ]
 
-# --- Main match analysis entrypoint ---
-def format_match_embed(player: dict, match: dict, stats_block: dict, player_name: str = "Player") -> dict:
-    game_mode_field = match.get("gameMode")
-    raw_label = (match.get("gameModeName") or "").upper()
-
-    game_mode_name = resolve_game_mode_name(game_mode_field, raw_label)
-    is_turbo = is_turbo_mode(game_mode_field, raw_label)
-    mode = "TURBO" if is_turbo else "NON_TURBO"
-
-    team_kills = player.get("_team_kills") or sum(
-        p.get("kills", 0) for p in match.get("players", [])
-        if p.get("isRadiant") == player.get("isRadiant")
-    )
+# --- Analysis (memoized per match:player by bot.analysis_cache) ---
+def _analyze_player(
+    player: dict, match: dict, stats_block: dict, mode: str, context: MatchContext | None = None
+) -> dict:
+    """Stats extraction → engine → advice → title for one player-match."""
+    ctx = context or match_context(match)
+    team_kills = ctx.team_kills_for(player)
 
-    stats = extract_player_stats(player, stats_block, team_kills, mode)
-    stats["durationSeconds"] = match.get("durationSeconds", 0)
+    # One-pass PlayerStats record (durationSeconds injected, None-swept as before)
+    stats = extract_player_record(player, stats_block, mode, match.get("durationSeconds", 0))
 
-    # Safe-null sweep — preserve exact behavior
-    for k in list(stats.keys()):
-        v = stats[k]
-        if v is None:
-            if k in {"lane", "roleBasic"}:
-                stats[k] = ""
-            elif k == "statsBlock":
-                stats[k] = {}
-            else:
-                stats[k] = 0
-
-    engine = analyze_turbo if is_turbo else analyze_normal
-    result = engine(stats, {}, player.get("roleBasic", ""), team_kills)
+    engine = analyze_turbo if mode == "TURBO" else analyze_normal
+    result = engine(stats, {}, player.get("roleBasic", ""), team_kills, role_category=ctx.role_category(player))
 
     tags = result.get("feedback_tags", {})
     is_victory = player.get("isVictory", False)
 
-    # Deterministic randomness (seeded per match:player)
-    try:
-        seed_str = f"{match.get('id')}:{player.get('steamAccountId')}"
-        random.seed(hashlib.md5(seed_str.encode()).hexdigest())
-    except Exception:
-        pass
+    # Deterministic randomness (seeded per match:player) on a private RNG, so concurrent
+    # workers never share RNG state. Seeding Random(s) matches the former random.seed(s).
+    seed_str = f"{match.get('id')}:{player.get('steamAccountId')}"
+    rng = random.Random(hashlib.md5(seed_str.encode()).hexdigest())
 
-    advice = generate_advice(tags, stats, mode=mode)
+    advice = generate_advice(tags, stats, mode=mode, rng=rng)
 
     score = float(result.get("score") or 0.0)
-    emoji, title = get_title_phrase(score, is_victory, tags.get("compound_flags", []))
+    emoji, title = get_title_phrase(score, is_victory, tags.get("compound_flags", []), rng=rng)
     title = title[:1].lower() + title[1:]
 
+    return {
+        "emoji": emoji,
+        "title": title,
+        "score": score,
+        "positives": advice.get("positives", [])[:3],
+        "negatives": advice.get("negatives", [])[:3],
+        "flags": advice.get("flags", [])[:3],
+        "tips": advice.get("tips", [])[:3],
+    }
+
+
+# --- Main match analysis entrypoint ---
+def format_match_embed(
+    player: dict, match: dict, stats_block: dict, player_name: str = "Player",
+    context: MatchContext | None = None,
+) -> dict:
+    # Whole-match facts (mode, team totals) are shared by every tracked player in the match
+    ctx = context or match_context(match)
+    game_mode_name = ctx.game_mode_name
+    mode = ctx.mode
+
+    analysis = cached_analysis(
+        match.get("id"),
+        player.get("steamAccountId"),
+        lambda: _analyze_player(player, match, stats_block, mode, ctx),
+    )
+
     # 🔗 Steam avatar (optional)
     avatar_url = None
     try:
@@ -93,32 +103,33 @@ def format_match_embed(player: dict, match: dict, stats_block: dict, player_name
 
     return {
         "playerName": player_name,
-        "emoji": emoji,
-        "title": title,
-        "score": score,
+        "emoji": analysis["emoji"],
+        "title": analysis["title"],
+        "score": analysis["score"],
         "mode": mode,
         "gameModeName": game_mode_name,
         "role": player.get("roleBasic", "unknown"),
         "hero": player.get("hero", {}).get("displayName") or normalize_hero_name(player.get("hero", {}).get("name", "")),
         "kda": f"{player.get('kills', 0)}/{player.get('deaths', 0)}/{player.get('assists', 0)}",
         "duration": match.get("durationSeconds", 0),
-        "isVictory": is_victory,
-        "positives": advice.get("positives", [])[:3],
-        "negatives": advice.get("negatives", [])[:3],
-        "flags": advice.get("flags", [])[:3],
-        "tips": advice.get("tips", [])[:3],
+        "isVictory": player.get("isVictory", False),
+        "positives": analysis["positives"],
+        "negatives": analysis["negatives"],
+        "flags": analysis["flags"],
+        "tips": analysis["tips"],
         "matchId": match.get("id"),
         "avatarUrl": avatar_url,  # ← new, optional
     }
 
 # --- Minimal fallback embed for IMP-missing matches ---
-def format_fallback_embed(player: dict, match: dict, player_name: str = "Player", private_data_blocked: bool = False) -> dict:
-    game_mode_field = match.get("gameMode")
-    raw_label = (match.get("gameModeName") or "").upper()
-
-    game_mode_name = resolve_game_mode_name(game_mode_field, raw_label)
-    is_turbo = is_turbo_mode(game_mode_field, raw_label)
-    mode = "TURBO" if is_turbo else "NON_TURBO"
+def format_fallback_embed(
+    player: dict, match: dict, player_name: str = "Player", private_data_blocked: bool = False,
+    context: MatchContext | None = None,
+) -> dict:
+    ctx = context or match_context(match)
+    game_mode_name = ctx.game_mode_name
+    is_turbo = ctx.is_turbo
+    mode = ctx.mode
     is_victory = player.get("isVictory", False)
 
     duration = match.get("durationSeconds", 0)
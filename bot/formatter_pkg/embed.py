@@ -1,5 +1,7 @@
 # bot/formatter_pkg/embed.py
 
+import hashlib
+import json
 from typing import List, Dict, Any
 
 
@@ -16,6 +18,16 @@ def _ellipsis_lines(lines: List[str], max_lines: int = 3) -> str:
     return "\n".join(lines[:max_lines] + ["…"])
 
 
+def embed_content_hash(embed: Dict[str, Any]) -> str:
+    """
+    Stable hash of what an embed shows. The volatile `timestamp` (set to "now" by the
+    builders below) is excluded, so rebuilding the same content gives the same hash.
+    """
+    content = {k: v for k, v in (embed or {}).items() if k != "timestamp"}
+    raw = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
 def build_discord_embed(result: Dict[str, Any]) -> Dict[str, Any]:
     """
     Build the FULL match embed using the agreed contract and field order.
@@ -3,106 +3,133 @@
 import requests
 import os
 import json
+import hashlib
+
+from bot.config import RUNTIME_DIR
+from bot.state_pkg.legacy import migrate_pending_keys
 
 GIST_ID = "2a6cdb57dcdbd69d7468f612a31691f9"
 GIST_FILENAME = "state.json"
 GITHUB_TOKEN = os.getenv("GIST_TOKEN")
 
-def load_state():
-    """Fetches the current state.json from GitHub Gist"""
-    res = requests.get(f"https://api.github.com/gists/{GIST_ID}", headers={
+# Local mirror of the gist: {"etag": ..., "content": ..., "hash": ...}.
+# Lets load_state do a conditional GET (304 → reuse the cached body) and save_state
+# skip the PATCH when the serialized state has not changed since it was loaded.
+CACHE_PATH = os.path.join(RUNTIME_DIR, "gist_state_cache.json")
+
+# Hash of the state as last seen on the gist (set by load_state / save_state)
+_remote_hash: str | None = None
+
+
+def _headers() -> dict:
+    return {
         "Authorization": f"Bearer {GITHUB_TOKEN}",
         "Accept": "application/vnd.github+json"
-    })
-    res.raise_for_status()
-    gist = res.json()
+    }
+
+
+def _serialize(state) -> str:
+    """Compact JSON — the gist body and the basis for change detection."""
+    return json.dumps(state, separators=(",", ":"), ensure_ascii=False)
 
-    print("🧪 Gist file keys:", list(gist["files"].keys()))
 
-    if GIST_FILENAME not in gist["files"]:
-        print(f"❌ Gist file {GIST_FILENAME} not found. Returning empty dict.")
+def _hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _read_cache() -> dict:
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
         return {}
 
-    content = gist["files"][GIST_FILENAME]["content"]
+
+def _write_cache(etag: str | None, content: str, digest: str):
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        tmp = f"{CACHE_PATH}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"etag": etag, "content": content, "hash": digest}, f, separators=(",", ":"))
+        os.replace(tmp, CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not write gist state cache: {e}")
+
+
+def load_state():
+    """Fetches the current state.json from GitHub Gist (conditional on the cached ETag)"""
+    global _remote_hash
+    cache = _read_cache()
+    headers = _headers()
+    if cache.get("etag") and isinstance(cache.get("content"), str):
+        headers["If-None-Match"] = cache["etag"]
+
+    res = requests.get(f"https://api.github.com/gists/{GIST_ID}", headers=headers)
+    if res.status_code == 304:
+        print("🧪 Gist unchanged (304) — using cached state.json")
+        content = cache["content"]
+    else:
+        res.raise_for_status()
+        gist = res.json()
+
+        print("🧪 Gist file keys:", list(gist["files"].keys()))
+
+        if GIST_FILENAME not in gist["files"]:
+            print(f"❌ Gist file {GIST_FILENAME} not found. Returning empty dict.")
+            _remote_hash = None
+            return {}
+
+        content = gist["files"][GIST_FILENAME]["content"]
+
     try:
         parsed = json.loads(content)
     except json.JSONDecodeError:
         print("❌ Failed to decode state.json. Returning empty dict.")
+        _remote_hash = None
         return {}
 
+    # Hash the state as stored (before migration) so a migrated load is saved back
+    _remote_hash = _hash(_serialize(parsed))
+    if res.status_code != 304:
+        _write_cache(res.headers.get("ETag"), content, _remote_hash)
+
     if isinstance(parsed, dict):
-        # 🔁 Migration: pending keys from legacy "<matchId>" → composite "<matchId>:<steamId>"
-        # This allows multiple pending messages per match (one per player) without overwriting.
-        try:
-            pending = parsed.get("pending")
-            if isinstance(pending, dict) and pending:
-                migrated = {}
-                changed = False
-                for k, entry in list(pending.items()):
-                    # Keep already-composite keys as-is
-                    if ":" in str(k):
-                        migrated[str(k)] = entry
-                        continue
-
-                    # Legacy numeric key — re-key using embedded steamId if present
-                    if str(k).isdigit():
-                        steam = None
-                        try:
-                            steam = int((entry or {}).get("steamId"))
-                        except Exception:
-                            steam = None
-
-                        if steam is not None:
-                            new_key = f"{int(k)}:{steam}"
-                            # Only re-key if target not already present
-                            if new_key not in pending and new_key not in migrated:
-                                migrated[new_key] = entry
-                                changed = True
-                            else:
-                                # If collision, keep legacy key to avoid data loss
-                                migrated[str(k)] = entry
-                        else:
-                            # No steamId — keep legacy key
-                            migrated[str(k)] = entry
-                    else:
-                        # Unknown key shape — keep as-is
-                        migrated[str(k)] = entry
-
-                if changed:
-                    parsed["pending"] = migrated
-                    print(f"🔁 Migrated pending keys → composite matchId:steamId (count={len(migrated)})")
-        except Exception as e:
-            print(f"⚠️ Pending migration skipped due to error: {type(e).__name__}: {e}")
-
-        return parsed
+        return migrate_pending_keys(parsed)
 
     print(f"⚠️ state.json contained a {type(parsed).__name__}, expected dict. Overwriting.")
     return {}
 
 def save_state(new_state):
-    """Updates state.json in GitHub Gist with the provided dictionary"""
+    """Updates state.json in GitHub Gist with the provided dictionary (skipped when unchanged)"""
+    global _remote_hash
+    content = _serialize(new_state)
+    digest = _hash(content)
+    if digest == _remote_hash:
+        print("🟰 State unchanged — skipping Gist PATCH")
+        return False
+
     payload = {
         "files": {
             GIST_FILENAME: {
-                "content": json.dumps(new_state, indent=2)
+                "content": content
             }
         }
     }
 
-    print(f"🔧 PATCH payload being sent to Gist:\n{json.dumps(payload, indent=2)}")
+    print(f"🔧 PATCHing {GIST_FILENAME} on Gist ({len(content)} bytes)")
 
     res = requests.patch(
         f"https://api.github.com/gists/{GIST_ID}",
-        headers={
-            "Authorization": f"Bearer {GITHUB_TOKEN}",
-            "Accept": "application/vnd.github+json"
-        },
+        headers=_headers(),
         json=payload
     )
 
     if res.status_code == 200:
-        updated_content = res.json()["files"][GIST_FILENAME]["content"]
-        print(f"✅ Gist successfully patched. New content:\n{updated_content}")
+        print("✅ Gist successfully patched.")
+        _remote_hash = digest
+        # The PATCH response is the updated gist; its ETag validates the next conditional GET
+        _write_cache(res.headers.get("ETag"), content, digest)
     else:
         print(f"❌ Gist PATCH failed: {res.status_code} - {res.text}")
 
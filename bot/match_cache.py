@@ -0,0 +1,85 @@
+# bot/match_cache.py
+
+import threading
+from typing import Any, Callable
+
+from bot import stratz
+
+
+class MatchCache:
+    """
+    Per-run cache of full-match payloads keyed by match id.
+    Concurrent callers asking for the same match wait on a single in-flight fetch.
+    Only successful payloads (dicts without a quota error) are cached; failures and
+    quota signals are handed to the waiting callers and retried on the next request.
+    """
+
+    def __init__(self, loader: Callable[[int], Any]):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._results: dict[int, dict] = {}
+        self._inflight: dict[int, threading.Event] = {}
+        self._settled: dict[int, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, match_id: int) -> Any:
+        mid = int(match_id)
+        with self._lock:
+            if mid in self._results:
+                self.hits += 1
+                return self._results[mid]
+            event = self._inflight.get(mid)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._inflight[mid] = event
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                return self._results.get(mid, self._settled.get(mid))
+
+        result = None
+        try:
+            result = self._loader(mid)
+        finally:
+            with self._lock:
+                if isinstance(result, dict) and result.get("error") != "quota_exceeded":
+                    self._results[mid] = result
+                else:
+                    self._settled[mid] = result
+                self._inflight.pop(mid, None)
+            event.set()
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._settled.clear()
+            self.hits = self.misses = self.coalesced = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+
+# Process-wide instance, reset at the start of every run
+_RUN_CACHE = MatchCache(lambda mid: stratz.fetch_full_match(mid))
+
+
+def get_full_match(match_id: int) -> Any:
+    """Cached drop-in for bot.stratz.fetch_full_match (same return contract)."""
+    return _RUN_CACHE.get(match_id)
+
+
+def reset_match_cache() -> None:
+    _RUN_CACHE.clear()
+
+
+def match_cache_stats() -> dict:
+    return _RUN_CACHE.stats()
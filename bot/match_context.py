@@ -0,0 +1,110 @@
+# bot/match_context.py
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from bot.formatter_pkg.mode import resolve_game_mode_name, is_turbo_mode
+from feedback.engine_pkg.util import safe_num, get_role_category
+
+# Whole-match facts every tracked player in a match shares (mode, team kill totals, role
+# categories), computed once per fetched match payload instead of once per player; the
+# formatter and engine read them from here.
+# Memoized by match id and payload identity: a re-fetched payload (e.g. the IMP upgrade)
+# gets a fresh context. The cache holds payloads strongly, so the runner clears it at the
+# start and end of every run (the same lifetime as the per-run MatchCache);
+# MATCH_CONTEXT_SIZE only bounds a single run.
+_DEFAULT_SIZE = 64
+
+
+class MatchContext:
+    __slots__ = (
+        "match_id", "game_mode_name", "is_turbo", "mode",
+        "team_kills", "role_categories",
+    )
+
+    def __init__(self, match: dict):
+        game_mode_field = match.get("gameMode")
+        raw_label = (match.get("gameModeName") or "").upper()
+
+        self.match_id = match.get("id")
+        self.game_mode_name = resolve_game_mode_name(game_mode_field, raw_label)
+        self.is_turbo = is_turbo_mode(game_mode_field, raw_label)
+        self.mode = "TURBO" if self.is_turbo else "NON_TURBO"
+
+        players = match.get("players", [])
+        teams: dict = {}
+        for p in players:
+            teams.setdefault(p.get("isRadiant"), []).append(p)
+
+        self.team_kills = {side: _team_kills(members) for side, members in teams.items()}
+        self.role_categories = {
+            p.get("steamAccountId"): get_role_category(p.get("roleBasic", ""), p.get("lane", ""))
+            for p in players if p.get("steamAccountId") is not None
+        }
+
+    def team_kills_for(self, player: dict) -> Any:
+        """Team kill total for KP; a pre-set player["_team_kills"] still wins."""
+        return player.get("_team_kills") or self.team_kills.get(player.get("isRadiant"), 0)
+
+    def role_category(self, player: dict) -> str:
+        cached = self.role_categories.get(player.get("steamAccountId"))
+        return cached if cached is not None else get_role_category(player.get("roleBasic", ""), player.get("lane", ""))
+
+
+def _team_kills(members: list) -> Any:
+    # Summed exactly as the formatter did per player (same values, same order); a
+    # non-numeric kills value counts as 0 instead of failing every player in the match
+    try:
+        return sum(p.get("kills", 0) for p in members)
+    except TypeError:
+        return sum(safe_num(p.get("kills")) for p in members)
+
+
+class MatchContextCache:
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, match: dict) -> MatchContext:
+        key = match.get("id")
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] is match:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        ctx = MatchContext(match)
+        with self._lock:
+            self._items[key] = (match, ctx)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return ctx
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+def _env_size() -> int:
+    raw = (os.getenv("MATCH_CONTEXT_SIZE") or "").strip()
+    return int(raw) if raw.isdigit() and int(raw) > 0 else _DEFAULT_SIZE
+
+
+_CACHE = MatchContextCache(_env_size())
+
+
+def match_context(match: dict) -> MatchContext:
+    """The shared MatchContext for a fetched match payload (built on first use)."""
+    return _CACHE.get(match)
+
+
+def clear_match_contexts() -> None:
+    _CACHE.clear()
@@ -0,0 +1,137 @@
+# bot/match_store.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from bot.config import RUNTIME_DIR
+
+# Persistent store of FINAL full-match payloads (every player has IMP), one SQLite row per match.
+# Payloads are compressed JSON; the sha256 digest of the canonical JSON makes rewrites of
+# identical content a no-op. Total stored bytes are bounded with least-recently-used eviction.
+_DEFAULT_MAX_MB = 256
+
+
+def _max_bytes() -> int:
+    """Size bound from env MATCH_STORE_MAX_MB (0 disables the store)."""
+    raw = (os.getenv("MATCH_STORE_MAX_MB") or "").strip()
+    if raw.isdigit():
+        return int(raw) * 1024 * 1024
+    return _DEFAULT_MAX_MB * 1024 * 1024
+
+
+def is_final_match(match) -> bool:
+    """A match payload is immutable once Stratz has populated IMP for every player."""
+    if not isinstance(match, dict) or match.get("error"):
+        return False
+    players = match.get("players") or []
+    return bool(players) and all(isinstance(p, dict) and p.get("imp") is not None for p in players)
+
+
+class MatchStore:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS matches ("
+                " match_id INTEGER PRIMARY KEY,"
+                " digest TEXT NOT NULL,"
+                " payload BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS matches_lru ON matches (last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def load(self, match_id: int) -> dict | None:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT payload FROM matches WHERE match_id = ?", (int(match_id),)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE matches SET last_access = ? WHERE match_id = ?", (time.time(), int(match_id)))
+            conn.commit()
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def save(self, match_id: int, match: dict) -> bool:
+        raw = json.dumps(match, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        blob = zlib.compress(raw, 6)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT digest FROM matches WHERE match_id = ?", (int(match_id),)).fetchone()
+            if row is not None and row[0] == digest:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO matches (match_id, digest, payload, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (int(match_id), digest, blob, len(blob), time.time()),
+            )
+            self._evict(conn)
+            conn.commit()
+        return True
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM matches").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for match_id, size in conn.execute("SELECT match_id, size FROM matches ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM matches WHERE match_id = ?", (match_id,))
+            total -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connect()
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM matches").fetchone()
+        return {"matches": count, "bytes": total}
+
+
+_STORE: MatchStore | None = None
+_STORE_LOCK = threading.Lock()
+
+
+def _store() -> MatchStore | None:
+    global _STORE
+    max_bytes = _max_bytes()
+    if max_bytes <= 0:
+        return None
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = MatchStore(os.path.join(RUNTIME_DIR, "matches.sqlite3"), max_bytes)
+    return _STORE
+
+
+def load_match(match_id: int) -> dict | None:
+    """Return a stored final payload for this match, or None (never raises)."""
+    try:
+        store = _store()
+        return store.load(match_id) if store else None
+    except Exception as e:
+        print(f"⚠️ Match store read failed for {match_id}: {type(e).__name__}: {e}")
+        return None
+
+
+def save_match(match_id: int, match: dict) -> bool:
+    """Write through a payload only if it is final. Returns True if a row was written (never raises)."""
+    if not is_final_match(match):
+        return False
+    try:
+        store = _store()
+        return store.save(match_id, match) if store else False
+    except Exception as e:
+        print(f"⚠️ Match store write failed for {match_id}: {type(e).__name__}: {e}")
+        return False
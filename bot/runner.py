@@ -1,28 +1,58 @@
 # bot/runner.py
 
-from bot.gist_state import load_state, save_state
+from bot.state_pkg import load_state, save_state, get_state_backend
 from bot.config import CONFIG
+from bot.fetch import poll_latest_match_ids
+from bot.match_cache import reset_match_cache, match_cache_stats
+from bot.match_context import clear_match_contexts
+from bot.analysis_cache import analysis_cache_stats
 from bot.runner_pkg import (
     process_pending_upgrades_and_expiry,
-    process_player,
+    drain_durable_outbox,
+    pending_pass_stats,
+    run_player_pipeline,
     webhook_cooldown_active,
     webhook_cooldown_remaining,
     is_hard_blocked,
 )
-import time
+
+
+def _finish_run(state: dict):
+    clear_match_contexts()  # don't pin this run's match payloads in a long-lived process
+    if save_state(state):
+        print(f"📝 Updated state in {get_state_backend().label}")
+    cache = match_cache_stats()
+    print(
+        f"🗃️ Match cache: {cache['hits']} hits, {cache['misses']} misses, "
+        f"{cache['coalesced']} coalesced"
+    )
+    analysis = analysis_cache_stats()
+    print(
+        f"🧠 Analysis cache: {analysis['hits']} hits, {analysis['disk_hits']} disk hits, "
+        f"{analysis['misses']} misses"
+    )
+    print("✅ GuildBot run complete.")
 
 
 def run_bot():
     print("🚀 GuildBot started")
+    reset_match_cache()
+    clear_match_contexts()
 
     players = CONFIG["players"]
     print(f"👥 Loaded {len(players)} players from config.json")
 
-    state = load_state()
-    print("📥 Loaded state.json from GitHub Gist")
+    state = load_state(players.values())
+    print(f"📥 Loaded state from {get_state_backend().label}")
 
-    # Pass 0: try to upgrade or expire existing fallbacks before scanning for new matches
-    ok = process_pending_upgrades_and_expiry(state)
+    # Pass 0: send posts a previous run built but could not deliver, then try to
+    # upgrade or expire existing fallbacks before scanning for new matches
+    ok = drain_durable_outbox(state) and process_pending_upgrades_and_expiry(state)
+    pending = pending_pass_stats()
+    print(
+        f"🗂️ Pending pass: {pending['expired']} expired, {pending['probed']} probed, "
+        f"{pending['skipped']} skipped (not due), {pending['upgraded']} upgraded"
+    )
     if not ok:
         if is_hard_blocked():
             print("🧯 Ending run early due to Cloudflare hard block.")
@@ -31,34 +61,29 @@ def run_bot():
             print(f"🧯 Ending run early — webhook cooling down for {remaining:.1f}s.")
         else:
             print("🧯 Ending run early to preserve API quota.")
-        save_state(state)
-        print("📝 Updated state.json on GitHub Gist")
-        print("✅ GuildBot run complete.")
+        _finish_run(state)
         return
 
-    for index, (player_name, steam_id) in enumerate(players.items(), start=1):
-        if is_hard_blocked():
-            print("🧯 Ending run early due to Cloudflare hard block.")
-            break
-        if webhook_cooldown_active():
-            remaining = webhook_cooldown_remaining()
-            print(f"🧯 Ending run early — webhook cooling down for {remaining:.1f}s.")
-            break
+    # Pass 1: poll the latest match ID for the whole roster in batched queries
+    latest_ids = poll_latest_match_ids(players.values())
+    if isinstance(latest_ids, dict) and latest_ids.get("error") == "quota_exceeded":
+        print("🧯 Ending run early to preserve API quota.")
+        _finish_run(state)
+        return
+    if latest_ids is None:
+        print("⚠️ Batched latest-match poll failed — falling back to per-player lookups")
+    else:
+        found = sum(1 for mid in latest_ids.values() if mid is not None)
+        print(f"📡 Polled latest matches for {len(players)} players ({found} with a match)")
 
-        print(f"🔍 [{index}/{len(players)}] Checking {player_name} ({steam_id})...")
-        last_posted_id = state.get(str(steam_id))
-        should_continue = process_player(player_name, steam_id, last_posted_id, state)
-        if not should_continue:
-            if is_hard_blocked():
-                print("🧯 Ending run early due to Cloudflare hard block.")
-            elif webhook_cooldown_active():
-                remaining = webhook_cooldown_remaining()
-                print(f"🧯 Ending run early due to webhook cooldown ({remaining:.1f}s).")
-            else:
-                print("🧯 Ending run early to preserve API quota.")
-            break
-        time.sleep(0.6)
+    # Pass 2: fetch → format → post pipeline over the roster
+    reason = run_player_pipeline(players, state, latest_ids)
+    if reason == "hard_block":
+        print("🧯 Ending run early due to Cloudflare hard block.")
+    elif reason == "webhook_cooldown":
+        remaining = webhook_cooldown_remaining()
+        print(f"🧯 Ending run early due to webhook cooldown ({remaining:.1f}s).")
+    elif reason:
+        print("🧯 Ending run early to preserve API quota.")
 
-    save_state(state)
-    print("📝 Updated state.json on GitHub Gist")
-    print("✅ GuildBot run complete.")
+    _finish_run(state)
@@ -2,6 +2,7 @@
 
 from .webhook_client import (
     post_to_discord_embed,
+    post_to_discord_embeds,
     edit_discord_message,
     strip_query,
     is_hard_blocked,
@@ -11,8 +12,17 @@ from .webhook_client import (
 
 from .pending import (
     process_pending_upgrades_and_expiry,
+    pending_pass_stats,
 )
 
 from .players import (
     process_player,
 )
+
+from .durable_outbox import (
+    drain_durable_outbox,
+)
+
+from .pipeline import (
+    run_player_pipeline,
+)
@@ -0,0 +1,58 @@
+# bot/runner_pkg/durable_outbox.py
+
+from bot.config import CONFIG
+from bot.state_pkg import park_post, unpark_post
+from .outbox import EmbedOutbox
+from .players import apply_post_record
+
+# Durable outbox: fully built posts (embed + target webhook + state mutation, see
+# players.post_record) that a hard block or webhook cooldown kept from being sent.
+# They live in state["outbox"] keyed "<matchId>:<steamId>" and are drained at the start
+# of the next run, so a cooldown costs no extra Stratz calls and no re-analysis.
+
+
+def park_unsent(state: dict, outbox: EmbedOutbox) -> int:
+    """Move records still queued in a run's EmbedOutbox into the durable outbox."""
+    records = outbox.pending_records()
+    for record in records:
+        park_post(state, f"{record['matchId']}:{record['steamId']}", record)
+    if records:
+        print(f"📦 Parked {len(records)} unsent posts in the durable outbox for next run")
+    return len(records)
+
+
+def drain_durable_outbox(state: dict) -> bool:
+    """
+    Send every parked post, batched per webhook. Returns False to signal the run should
+    end (hard block / webhook cooldown); anything unsent stays parked.
+    """
+    parked = state.get("outbox") or {}
+    if not parked:
+        return True
+    if not CONFIG.get("webhook_enabled"):
+        print(f"⚠️ Webhook disabled — leaving {len(parked)} parked posts in the outbox.")
+        return True
+
+    print(f"📤 Draining {len(parked)} parked posts from the durable outbox")
+    boxes: dict[str, EmbedOutbox] = {}
+    for key, record in list(parked.items()):
+        url = record.get("webhookUrl") if isinstance(record, dict) else None
+        if not url or not record.get("embed"):
+            unpark_post(state, key)
+            continue
+
+        def on_posted(msg_id, index, count, key=key, record=record):
+            apply_post_record(state, record, msg_id, index, count)
+            unpark_post(state, key)
+
+        box = boxes.setdefault(url, EmbedOutbox(url))
+        if not box.add(record["embed"], on_posted, record):
+            return False
+
+    for box in boxes.values():
+        if not box.flush():
+            return False
+        # Rejected outright (not rate-limited): drop them; the normal pass rebuilds the post
+        for record in box.failed:
+            unpark_post(state, f"{record['matchId']}:{record['steamId']}")
+    return True
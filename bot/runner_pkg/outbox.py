@@ -0,0 +1,100 @@
+# bot/runner_pkg/outbox.py
+
+from typing import Any, Callable, Dict, List, Tuple
+
+from .webhook_client import (
+    post_to_discord_embeds,
+    is_hard_blocked,
+    webhook_cooldown_active,
+)
+
+# Discord limits for a single webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# on_posted(message_id, embed_index, embed_count)
+OnPosted = Callable[[str | None, int, int], None]
+
+
+def embed_char_count(embed: Dict[str, Any]) -> int:
+    """Characters Discord counts toward the per-message embed total."""
+    total = len(str(embed.get("title") or "")) + len(str(embed.get("description") or ""))
+    for field in embed.get("fields") or []:
+        total += len(str(field.get("name") or "")) + len(str(field.get("value") or ""))
+    total += len(str((embed.get("footer") or {}).get("text") or ""))
+    total += len(str((embed.get("author") or {}).get("name") or ""))
+    return total
+
+
+class EmbedOutbox:
+    """
+    Collects finished embeds during a run and posts them as multi-embed webhook messages
+    (≤10 embeds and ≤6000 embed characters per message), so a busy evening costs a
+    fraction of the webhook budget. Each queued embed carries an `on_posted` callback that
+    receives the message id and the embed's position in it, so pending fallbacks can be
+    edited in place later. An optional serializable `record` rides along so embeds left
+    unsent by a cooldown can be parked in the durable outbox (see `pending_records()`).
+    """
+
+    def __init__(
+        self,
+        webhook_url: str,
+        max_embeds: int = MAX_EMBEDS_PER_MESSAGE,
+        max_chars: int = MAX_EMBED_CHARS_PER_MESSAGE,
+    ):
+        self.webhook_url = webhook_url
+        self.max_embeds = max_embeds
+        self.max_chars = max_chars
+        self._items: List[Tuple[Dict[str, Any], OnPosted, dict | None]] = []
+        self.failed: List[dict] = []  # records of batches Discord rejected outright
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, embed: Dict[str, Any], on_posted: OnPosted, record: dict | None = None) -> bool:
+        """Queue an embed; flushes once a full message worth is waiting. False → end the run."""
+        self._items.append((embed, on_posted, record))
+        if len(self._items) >= self.max_embeds:
+            return self.flush()
+        return True
+
+    def _batches(self, items):
+        batch, chars = [], 0
+        for item in items:
+            size = embed_char_count(item[0])
+            if batch and (len(batch) >= self.max_embeds or chars + size > self.max_chars):
+                yield batch
+                batch, chars = [], 0
+            batch.append(item)
+            chars += size
+        if batch:
+            yield batch
+
+    def flush(self) -> bool:
+        """
+        Post everything queued. Returns False on hard block / webhook cooldown; in that case
+        the unsent embeds stay queued (see `pending()`).
+        """
+        items, self._items = self._items, []
+        batches = list(self._batches(items))
+        for n, batch in enumerate(batches):
+            ok, msg_id = post_to_discord_embeds([embed for embed, _, _ in batch], self.webhook_url, want_message_id=True)
+            if ok:
+                for index, (_, on_posted, _) in enumerate(batch):
+                    on_posted(msg_id, index, len(batch))
+                continue
+            if is_hard_blocked() or webhook_cooldown_active():
+                self._items = [item for rest in batches[n:] for item in rest] + self._items
+                print(f"🧯 Webhook unavailable — {len(self._items)} queued embeds not sent.")
+                return False
+            print(f"⚠️ Failed to post a batch of {len(batch)} embeds — they will be rebuilt next run.")
+            self.failed.extend(record for _, _, record in batch if record is not None)
+        return True
+
+    def pending(self) -> List[Tuple[Dict[str, Any], OnPosted]]:
+        """Embeds still queued (e.g. after a cooldown interrupted a flush)."""
+        return [(embed, on_posted) for embed, on_posted, _ in self._items]
+
+    def pending_records(self) -> List[dict]:
+        """Serializable records of the embeds still queued."""
+        return [record for _, _, record in self._items if record is not None]
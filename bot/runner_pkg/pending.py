@@ -3,12 +3,14 @@
 import time
 import os
 from bot.config import CONFIG
-from bot.throttle import throttle
-from bot.stratz import fetch_full_match
+from bot.state_pkg import record_posted, put_pending, drop_pending
+from bot.match_cache import get_full_match
+from bot.fetch import probe_imp_readiness
 from bot.formatter import (
     format_match_embed,
     build_discord_embed,
     build_fallback_embed,
+    embed_content_hash,
 )
 from .webhook_client import (
     edit_discord_message,
@@ -16,6 +18,7 @@ from .webhook_client import (
     webhook_cooldown_active,
     is_hard_blocked,
 )
+from .pending_schedule import PendingSchedule, schedule_retry
 
 # --- Defaults & bounds ---
 # Historical default was 24h; we now honor an env override with a default of 12h.
@@ -73,13 +76,15 @@ def _expire_pending_entry(entry: dict) -> dict:
     return build_fallback_embed(expired)
 
 
-def _normalize_pending_keys(pending_map: dict) -> None:
+def _normalize_pending_keys(state: dict) -> None:
     """
-    One-time in-place migration to support multiple players per match:
+    One-time migration to support multiple players per match:
     - Legacy shape keyed by 'matchId' only → re-key to 'matchId:steamId' if steamId present.
     - If postedAt is missing, initialize it to now() to avoid immediate expiry glitches.
+    Changes go through put_pending/drop_pending so they are journaled and saved.
     Idempotent across runs.
     """
+    pending_map = state.get("pending")
     if not isinstance(pending_map, dict):
         return
 
@@ -112,24 +117,80 @@ def _normalize_pending_keys(pending_map: dict) -> None:
     for k in init_times:
         try:
             if isinstance(pending_map.get(k), dict) and not pending_map[k].get("postedAt"):
-                pending_map[k]["postedAt"] = now
+                put_pending(state, k, dict(pending_map[k], postedAt=now))
         except Exception:
             continue
 
     # Apply rekeys
     for old, new in rekeys:
         try:
-            pending_map[new] = pending_map.pop(old)
+            put_pending(state, new, pending_map[old])
+            drop_pending(state, old)
         except Exception:
             # If anything odd happens, leave the old key in place
             continue
 
 
+def _parse_pending_key(key) -> tuple[int, int | None]:
+    """Key may be either "matchId:steamId" (preferred) or legacy "matchId". Raises on bad keys."""
+    if ":" in str(key):
+        a, b = str(key).split(":", 1)
+        return int(a), (int(b) if b.isdigit() else None)
+    return int(str(key)), None
+
+
+_PASS_STATS = {"expired": 0, "probed": 0, "skipped": 0, "upgraded": 0}
+
+
+def pending_pass_stats() -> dict:
+    """Counters from the most recent pending pass (expired, probed, skipped, upgraded)."""
+    return dict(_PASS_STATS)
+
+
+def _mark_sent(state: dict, key, entry: dict, embed: dict) -> None:
+    """
+    Journal the hash of what the message now shows before the entry is dropped, so a
+    retry after a lost drop_pending (crash, restart) skips the PATCH via last_hash.
+    """
+    put_pending(state, key, dict(entry, embedHash=embed_content_hash(embed)))
+
+
+def _expire_entry(state: dict, key, entry: dict, match_id: int, steam_id) -> bool:
+    """Edit the message to its expired form and drop the entry. False → end the run."""
+    webhook_base = entry.get("webhookBase") or CONFIG.get("webhook_url")
+    message_id = entry.get("messageId")
+    print(f"⏳ Pending match {match_id} (steam {steam_id}) expired — marking message and removing from state.")
+    try:
+        if CONFIG.get("webhook_enabled") and webhook_base and message_id:
+            expired_embed = _expire_pending_entry(entry)
+            ok = edit_discord_message(
+                message_id, expired_embed, webhook_base, exact_base=True,  # ✅
+                embed_index=entry.get("embedIndex"), embed_count=entry.get("embedCount"),
+                last_hash=entry.get("embedHash"),
+            )
+            if not ok:
+                if is_hard_blocked() or webhook_cooldown_active():
+                    return False
+                print(f"⚠️ Failed to mark expired for match {match_id} (steam {steam_id}) — will retry next run")
+                return True
+            _mark_sent(state, key, entry, expired_embed)
+        # Remove from pending after attempting expiry
+        drop_pending(state, key)
+        _PASS_STATS["expired"] += 1
+    except Exception as e:
+        print(f"❌ Error expiring pending match {match_id} (steam {steam_id}): {e}")
+        drop_pending(state, key)
+    return True
+
+
 def process_pending_upgrades_and_expiry(state: dict) -> bool:
     """
     Pass 0: try to upgrade or expire any pending fallback messages.
+    Expiries are handled first (message edits only, no Stratz calls); then only entries
+    whose backoff-scheduled check is due are probed for IMP, earliest first.
     Returns False to signal the run should end early (e.g., cooldown/hard-block).
     """
+    _PASS_STATS.update(expired=0, probed=0, skipped=0, upgraded=0)
     if is_hard_blocked():
         return False
 
@@ -139,30 +200,52 @@ def process_pending_upgrades_and_expiry(state: dict) -> bool:
 
     # 🔧 Migrate legacy keys ('matchId' only) → 'matchId:steamId' so
     # multiple players can share a match without overwriting each other.
-    _normalize_pending_keys(pending_map)
+    _normalize_pending_keys(state)
 
     now = time.time()
-    items = list(pending_map.items())
-
-    for key, entry in items:
-        if is_hard_blocked() or webhook_cooldown_active():
-            return False
+    schedule = PendingSchedule(pending_map, now, _entry_expiry_seconds)
 
-        # Key may be either "matchId:steamId" (preferred) or legacy "matchId"
-        match_id = None
-        steam_id_from_key = None
+    # Key may be either "matchId:steamId" (preferred) or legacy "matchId"; bad keys are dropped
+    def parse(key):
         try:
-            if ":" in str(key):
-                a, b = str(key).split(":", 1)
-                match_id = int(a)
-                steam_id_from_key = int(b) if b.isdigit() else None
-            else:
-                match_id = int(str(key))
+            return _parse_pending_key(key)
         except Exception:
-            # Bad key — drop it
-            pending_map.pop(key, None)
+            drop_pending(state, key)
+            return None
+
+    # 1) Expiries first — pure edits, no Stratz calls
+    for key in schedule.pop_expired():
+        if is_hard_blocked() or webhook_cooldown_active():
+            return False
+        parsed = parse(key)
+        entry = pending_map.get(key)
+        if parsed is None or entry is None:
             continue
+        if not _expire_entry(state, key, entry, parsed[0], entry.get("steamId")):
+            return False
+
+    # 2) Entries whose next check is due, earliest first; the rest wait for a later run
+    due = [(key, parse(key)) for key in schedule.pop_due()]
+    due = [(key, parsed) for key, parsed in due if parsed is not None and key in pending_map]
+    _PASS_STATS["skipped"] = schedule.skipped
+    _PASS_STATS["probed"] = len(due)
+    if schedule.skipped:
+        print(f"⏭️ Skipped IMP checks for {schedule.skipped} pending entries not yet due")
+    if not due:
+        return True
+
+    # Probe IMP for the due entries in batched lightweight queries (players { steamAccountId imp });
+    # the heavy full-match query below only runs for matches whose IMP has landed.
+    readiness = probe_imp_readiness(sorted({match_id for _, (match_id, _) in due}))
+    if isinstance(readiness, dict) and readiness.get("error") == "quota_exceeded":
+        print("🛑 Quota exceeded during pending upgrade pass — aborting early.")
+        return False
 
+    for key, (match_id, steam_id_from_key) in due:
+        if is_hard_blocked() or webhook_cooldown_active():
+            return False
+
+        entry = pending_map[key]
         steam_id = entry.get("steamId")
         if steam_id_from_key and steam_id != steam_id_from_key:
             # Trust the stored entry but keep awareness; no-op beyond this
@@ -171,33 +254,19 @@ def process_pending_upgrades_and_expiry(state: dict) -> bool:
         webhook_base = entry.get("webhookBase") or CONFIG.get("webhook_url")
         message_id = entry.get("messageId")
 
-        # Expiry check (per-entry or env-driven)
-        posted_at = float(entry.get("postedAt") or 0)
-        expiry_seconds = _entry_expiry_seconds(entry)
-        if posted_at and (now - posted_at) >= expiry_seconds:
-            print(f"⏳ Pending match {match_id} (steam {steam_id}) expired — marking message and removing from state.")
-            try:
-                if CONFIG.get("webhook_enabled") and webhook_base and message_id:
-                    expired_embed = _expire_pending_entry(entry)
-                    ok = edit_discord_message(message_id, expired_embed, webhook_base, exact_base=True)  # ✅
-                    if not ok:
-                        if is_hard_blocked() or webhook_cooldown_active():
-                            return False
-                        print(f"⚠️ Failed to mark expired for match {match_id} (steam {steam_id}) — will retry next run")
-                        continue
-                # Remove from pending after attempting expiry
-                pending_map.pop(key, None)
-            except Exception as e:
-                print(f"❌ Error expiring pending match {match_id} (steam {steam_id}): {e}")
-                pending_map.pop(key, None)
+        # The probe failed for this match's chunk — no answer, so no backoff; checked again next run
+        if match_id not in readiness:
+            continue
+
+        # Not parsed yet — back off without a full fetch
+        if readiness[match_id].get(steam_id) is None:
+            put_pending(state, key, schedule_retry(entry, now))
             continue
 
-        # Try to upgrade — re-fetch match and check IMP
-        throttle()
-        full = fetch_full_match(match_id)
+        # IMP has landed — fetch the full payload and upgrade (cached per run; Stratz calls are throttled)
+        full = get_full_match(match_id)
         if not full:
             # transient miss — skip this one for now
-            time.sleep(0.5)
             continue
         if isinstance(full, dict) and full.get("error") == "quota_exceeded":
             print("🛑 Quota exceeded during pending upgrade pass — aborting early.")
@@ -209,7 +278,6 @@ def process_pending_upgrades_and_expiry(state: dict) -> bool:
                 player_data = p
                 break
         if not player_data:
-            time.sleep(0.5)
             continue
 
         if player_data.get("imp") is not None and CONFIG.get("webhook_enabled") and webhook_base and message_id:
@@ -219,11 +287,17 @@ def process_pending_upgrades_and_expiry(state: dict) -> bool:
                 display_name = snap.get("playerName", "Player")
                 result = format_match_embed(player_data, full, player_data.get("stats", {}), display_name)
                 embed = build_discord_embed(result)
-                ok = edit_discord_message(message_id, embed, webhook_base, exact_base=True)  # ✅
+                ok = edit_discord_message(
+                    message_id, embed, webhook_base, exact_base=True,  # ✅
+                    embed_index=entry.get("embedIndex"), embed_count=entry.get("embedCount"),
+                    last_hash=entry.get("embedHash"),
+                )
                 if ok:
                     print(f"🔁 Upgraded fallback → full embed for match {match_id} (steam {steam_id})")
-                    state[str(steam_id)] = match_id
-                    pending_map.pop(key, None)
+                    _mark_sent(state, key, entry, embed)
+                    record_posted(state, steam_id, match_id)
+                    drop_pending(state, key)
+                    _PASS_STATS["upgraded"] += 1
                 else:
                     if is_hard_blocked() or webhook_cooldown_active():
                         return False
@@ -232,7 +306,4 @@ def process_pending_upgrades_and_expiry(state: dict) -> bool:
                 print(f"❌ Error building/upgrading embed for match {match_id} (steam {steam_id}): {e}")
                 # Leave pending for retry
 
-        # Pace between items to be gentle on Discord + Stratz
-        time.sleep(0.5)
-
     return True
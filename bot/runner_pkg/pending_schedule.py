@@ -0,0 +1,90 @@
+# bot/runner_pkg/pending_schedule.py
+
+import heapq
+import os
+
+# Deadline-ordered scheduling for the pending pass. Stratz usually needs a while to
+# parse a match and populate IMP, so each pending entry is re-checked on an exponential
+# backoff (base, 2×base, 4×base … capped) measured from when its fallback was posted,
+# instead of on every run. Entries past their expiry are handed out first.
+_DEFAULT_CHECK_BASE = 15 * 60       # first check ~15 min after the fallback was posted
+_DEFAULT_CHECK_MAX = 3 * 60 * 60    # never wait more than 3h between checks
+_MIN_CHECK = 60
+_MAX_CHECK = 12 * 60 * 60
+
+
+def _env_seconds(name: str, default: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    if raw.isdigit():
+        return max(_MIN_CHECK, min(_MAX_CHECK, int(raw)))
+    return default
+
+
+def check_delay(attempts: int) -> float:
+    """
+    Seconds until the next IMP check after `attempts` unsuccessful checks
+    (env PENDING_CHECK_BASE_SEC / PENDING_CHECK_MAX_SEC).
+    """
+    base = _env_seconds("PENDING_CHECK_BASE_SEC", _DEFAULT_CHECK_BASE)
+    cap = _env_seconds("PENDING_CHECK_MAX_SEC", _DEFAULT_CHECK_MAX)
+    return float(min(cap, base * (2 ** max(0, min(int(attempts), 16)))))
+
+
+def next_check_at(entry: dict) -> float:
+    """When this entry is next due for an IMP check (legacy entries: postedAt + base delay)."""
+    try:
+        return float(entry["nextCheckAt"])
+    except (KeyError, TypeError, ValueError):
+        return float(entry.get("postedAt") or 0) + check_delay(0)
+
+
+def schedule_retry(entry: dict, now: float) -> dict:
+    """Record one more unsuccessful check on `entry` and push its next check out."""
+    attempts = int(entry.get("checkAttempts") or 0) + 1
+    entry["checkAttempts"] = attempts
+    entry["nextCheckAt"] = now + check_delay(attempts)
+    return entry
+
+
+class PendingSchedule:
+    """
+    Min-heaps over the pending map for one pass:
+      • expiries — entries whose expiry deadline has passed, oldest deadline first
+      • checks   — live entries keyed by next check time
+    `pop_expired()` and `pop_due()` drain what is actionable at `now`; whatever stays in
+    the check heap is a probe skipped this run (`skipped`).
+    """
+
+    def __init__(self, pending_map: dict, now: float, expiry_seconds):
+        self.now = now
+        self._expiries: list = []
+        self._checks: list = []
+        for seq, (key, entry) in enumerate(pending_map.items()):
+            if not isinstance(entry, dict):
+                continue
+            posted_at = float(entry.get("postedAt") or 0)
+            if posted_at and now - posted_at >= expiry_seconds(entry):
+                heapq.heappush(self._expiries, (posted_at + expiry_seconds(entry), seq, key))
+            else:
+                heapq.heappush(self._checks, (next_check_at(entry), seq, key))
+
+    def pop_expired(self) -> list:
+        """Keys of expired entries, earliest deadline first."""
+        keys = []
+        while self._expiries:
+            keys.append(heapq.heappop(self._expiries)[2])
+        return keys
+
+    def pop_due(self) -> list:
+        """Keys of entries whose next check time has arrived, earliest first."""
+        keys = []
+        while self._checks and self._checks[0][0] <= self.now:
+            keys.append(heapq.heappop(self._checks)[2])
+        return keys
+
+    @property
+    def skipped(self) -> int:
+        return len(self._checks)
+
+    def next_due(self) -> float | None:
+        return self._checks[0][0] if self._checks else None
@@ -0,0 +1,166 @@
+# bot/runner_pkg/pipeline.py
+
+import os
+import queue
+import threading
+
+from bot.config import CONFIG
+from .outbox import EmbedOutbox
+from .durable_outbox import park_unsent
+from .players import prepare_player, build_player_post, publish_player_post
+from .webhook_client import is_hard_blocked, webhook_cooldown_active, resolve_webhook_for_post
+
+# Staged player pipeline: fetch (full match) → format (analysis + embed) → post (Discord + state).
+# Each stage has a bounded worker pool; stages are joined by bounded queues so a slow
+# downstream stage applies backpressure instead of letting work pile up in memory.
+# Pacing comes only from the Stratz/webhook throttles — there are no fixed sleeps.
+# New posts go through an EmbedOutbox and leave as multi-embed messages; the remainder
+# is flushed once every stage has drained (also when a Stratz quota cancelled the run),
+# and anything a hard block or webhook cooldown kept back is parked in the durable outbox.
+
+_DONE = object()
+
+# Cancellation reasons that mean the webhook itself must not be hit again this run
+_WEBHOOK_STOPS = ("hard_block", "webhook_cooldown")
+
+# Defaults per stage (env overrides: PIPELINE_FETCH_WORKERS, PIPELINE_FORMAT_WORKERS,
+# PIPELINE_POST_WORKERS, PIPELINE_QUEUE_SIZE).
+_DEFAULT_FETCH_WORKERS = 4
+_DEFAULT_FORMAT_WORKERS = 2   # analysis uses a per-player RNG, so formatting may run concurrently
+_DEFAULT_POST_WORKERS = 1     # webhook posts are globally paced; one poster keeps post order stable
+_DEFAULT_QUEUE_SIZE = 8
+
+
+def _env_int(name: str, default: int, lo: int = 1, hi: int = 32) -> int:
+    raw = (os.getenv(name) or "").strip()
+    if raw.isdigit():
+        return max(lo, min(hi, int(raw)))
+    return default
+
+
+class _Cancel:
+    """
+    Pipeline-wide cancellation signal. Hard blocks and webhook cooldowns observed by
+    any stage cancel the whole pipeline; the first reason recorded wins.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self.reason: str | None = None
+
+    def set(self, reason: str) -> None:
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+            self._event.set()
+
+    def is_set(self) -> bool:
+        if self._event.is_set():
+            return True
+        if is_hard_blocked():
+            self.set("hard_block")
+        elif webhook_cooldown_active():
+            self.set("webhook_cooldown")
+        return self._event.is_set()
+
+
+def _start_stage(name: str, fn, inbox: queue.Queue, outbox: queue.Queue | None, workers: int, cancel: _Cancel):
+    """
+    Start `workers` threads applying `fn` to items from `inbox`, forwarding non-None results.
+    Once cancelled, workers keep draining their inbox without doing work so upstream
+    stages never block. The last worker to finish forwards the end-of-stream marker.
+    """
+    remaining = [workers]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                inbox.put(_DONE)  # let sibling workers see the end of stream too
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and outbox is not None:
+                    outbox.put(_DONE)
+                return
+            if cancel.is_set():
+                continue
+            try:
+                out = fn(item)
+            except Exception as e:
+                print(f"❌ Pipeline {name} stage error: {type(e).__name__}: {e}")
+                continue
+            if out is not None and outbox is not None:
+                outbox.put(out)
+
+    threads = [threading.Thread(target=worker, name=f"pipeline-{name}-{i}", daemon=True) for i in range(workers)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def run_player_pipeline(players: dict, state: dict, latest_ids: dict | None = None) -> str | None:
+    """
+    Process every player through the fetch → format → post pipeline.
+    Returns None when all players were handled, or the cancellation reason
+    ("hard_block", "webhook_cooldown", "quota" or "stopped") when the run should end early.
+    """
+    cancel = _Cancel()
+    queue_size = _env_int("PIPELINE_QUEUE_SIZE", _DEFAULT_QUEUE_SIZE, hi=256)
+    fetch_q: queue.Queue = queue.Queue(maxsize=queue_size)
+    format_q: queue.Queue = queue.Queue(maxsize=queue_size)
+    post_q: queue.Queue = queue.Queue(maxsize=queue_size)
+    state_lock = threading.Lock()
+
+    resolved = resolve_webhook_for_post(CONFIG.get("webhook_url"))
+    outbox = EmbedOutbox(resolved) if CONFIG.get("webhook_enabled") and resolved else None
+
+    def fetch(item):
+        player_name, steam_id, last_posted_id = item
+        job = prepare_player(player_name, steam_id, last_posted_id, latest_ids)
+        if isinstance(job, dict) and job.get("error") == "quota_exceeded":
+            print(f"🛑 Quota exceeded while processing {player_name}.")
+            cancel.set("quota")
+            return None
+        return job
+
+    def post(item):
+        with state_lock:
+            ok = publish_player_post(item, state, outbox)
+        if not ok:
+            _stop()
+        return None
+
+    def _stop():
+        cancel.set("hard_block" if is_hard_blocked() else "webhook_cooldown" if webhook_cooldown_active() else "stopped")
+
+    threads = []
+    threads += _start_stage("fetch", fetch, fetch_q, format_q, _env_int("PIPELINE_FETCH_WORKERS", _DEFAULT_FETCH_WORKERS), cancel)
+    threads += _start_stage("format", build_player_post, format_q, post_q, _env_int("PIPELINE_FORMAT_WORKERS", _DEFAULT_FORMAT_WORKERS), cancel)
+    threads += _start_stage("post", post, post_q, None, _env_int("PIPELINE_POST_WORKERS", _DEFAULT_POST_WORKERS), cancel)
+
+    total = len(players)
+    for index, (player_name, steam_id) in enumerate(players.items(), start=1):
+        if cancel.is_set():
+            break
+        print(f"🔍 [{index}/{total}] Checking {player_name} ({steam_id})...")
+        last_posted_id = state.get(str(steam_id))
+        fetch_q.put((player_name, steam_id, last_posted_id))
+    fetch_q.put(_DONE)
+
+    for t in threads:
+        t.join()
+
+    if outbox is not None and len(outbox):
+        # Embeds already built still go out unless the webhook itself is blocked; a quota
+        # cancel only stops new Stratz work.
+        webhook_blocked = cancel.reason in _WEBHOOK_STOPS or is_hard_blocked() or webhook_cooldown_active()
+        if not webhook_blocked and not outbox.flush():
+            _stop()
+        if len(outbox):
+            # Cooldown / hard block left built embeds unsent — keep them for the next run
+            park_unsent(state, outbox)
+
+    return cancel.reason
@@ -3,15 +3,17 @@
 import json
 import time
 import os
-from bot.fetch import get_latest_new_match
+from bot.fetch import get_latest_new_match, QUOTA_SIGNAL
 from bot.formatter import (
     format_match_embed,
     build_discord_embed,
     format_fallback_embed,
     build_fallback_embed,
+    embed_content_hash,
 )
 from bot.config import CONFIG
-from bot.throttle import throttle
+from bot.match_context import match_context
+from bot.state_pkg import record_posted, put_pending, drop_pending, park_post
 from .webhook_client import (
     post_to_discord_embed,
     edit_discord_message,
@@ -20,6 +22,7 @@ from .webhook_client import (
     strip_query,
     resolve_webhook_for_post,  # ✅ NEW: get the actual posting URL
 )
+from .outbox import EmbedOutbox
 
 
 def _debug_level() -> int:
@@ -77,19 +80,22 @@ def _private_ids() -> set[int]:
     return ids
 
 
-def process_player(player_name: str, steam_id: int, last_posted_id: str | None, state: dict) -> bool:
-    """Fetch and format the latest match for a player."""
-    if is_hard_blocked():
-        return False
-    if webhook_cooldown_active():
-        return False
-
-    throttle()
-
-    match_bundle = get_latest_new_match(steam_id, last_posted_id)
+def prepare_player(
+    player_name: str,
+    steam_id: int,
+    last_posted_id: str | None,
+    latest_ids: dict | None = None,
+) -> dict | None:
+    """
+    Fetch stage: resolve the player's latest new match and its full payload.
+    Returns a job dict, None to skip the player, or QUOTA_SIGNAL on quota exhaustion.
+    """
+    match_bundle = get_latest_new_match(steam_id, last_posted_id, latest_ids)
+    if isinstance(match_bundle, dict) and match_bundle.get("error") == "quota_exceeded":
+        return QUOTA_SIGNAL
     if not match_bundle:
         print(f"⏩ No new match or failed to fetch for {player_name}. Skipping.")
-        return True
+        return None
 
     match_id = match_bundle["match_id"]
     match_data = match_bundle["full_data"]
@@ -97,56 +103,48 @@ def process_player(player_name: str, steam_id: int, last_posted_id: str | None,
     player_data = next((p for p in match_data["players"] if p.get("steamAccountId") == steam_id), None)
     if not player_data:
         print(f"❌ Player data missing in match {match_id} for {player_name}")
-        return True
+        return None
 
-    # If there is a pending entry for this specific (match, player), prefer editing that message when full stats are ready
-    pending_map = state.setdefault("pending", {})
-    composite_key = f"{match_id}:{steam_id}"
-    pending_entry = pending_map.get(composite_key)
+    return {
+        "playerName": player_name,
+        "steamId": steam_id,
+        "matchId": match_id,
+        "match": match_data,
+        "player": player_data,
+        # Built once per match payload and shared by every tracked player in it
+        "context": match_context(match_data),
+    }
 
-    # 🔄 Backward-compat: migrate legacy single-key (matchId-only) entries to composite keys when they match this player
-    if not pending_entry:
-        legacy = pending_map.get(str(match_id))
-        if legacy and legacy.get("steamId") == steam_id:
-            pending_entry = legacy
-            pending_map[composite_key] = legacy
-            pending_map.pop(str(match_id), None)
+
+def build_player_post(job: dict) -> dict | None:
+    """
+    Analyze/format stage: build the embed for a prepared job without touching state.
+    Returns a post dict with `kind` in {"private", "fallback", "full"}, or None on error.
+    """
+    player_name = job["playerName"]
+    steam_id = job["steamId"]
+    match_id = job["matchId"]
+    match_data = job["match"]
+    player_data = job["player"]
+    context = job.get("context") or match_context(match_data)
+    post = dict(job)
 
     # --- NEW: Private-data path (no pending/upgrade tracking, custom status, no '(Pending Stats)') ---
     if steam_id in _private_ids():
         print(f"🔒 Private-data player detected for {player_name} ({steam_id}) — posting one-off fallback.")
         try:
             # Build standard fallback then mutate title/status per private-data rules
-            result = format_fallback_embed(player_data, match_data, player_name)
+            result = format_fallback_embed(player_data, match_data, player_name, context=context)
 
             # Remove "(Pending Stats)" and set final status message
             result["title"] = ""  # no pending wording
             result["statusNote"] = "Public Match Data not exposed — Detailed analysis unavailable."
 
-            embed = build_fallback_embed(result)
-
-            # 🔐 Use the exact webhook used for posting (after overrides) when storing state
-            resolved = resolve_webhook_for_post(CONFIG.get("webhook_url"))
-            if CONFIG.get("webhook_enabled") and resolved:
-                posted, _ = post_to_discord_embed(embed, resolved, want_message_id=False)
-                if posted:
-                    print(f"✅ Posted private-data fallback for {player_name} match {match_id}")
-                    state[str(steam_id)] = match_id
-                else:
-                    if is_hard_blocked():
-                        return False
-                    if webhook_cooldown_active():
-                        print("🧯 Ending run early due to webhook cooldown.")
-                        return False
-                    print(f"⚠️ Failed to post private-data fallback for {player_name} match {match_id}")
-            else:
-                print("⚠️ Webhook disabled or misconfigured — printing instead.")
-                print(json.dumps(embed, indent=2))
-                state[str(steam_id)] = match_id
-
+            post.update(kind="private", result=result, embed=build_fallback_embed(result))
+            return post
         except Exception as e:
-            print(f"❌ Error formatting or posting private-data fallback for {player_name}: {e}")
-        return True
+            print(f"❌ Error formatting private-data fallback for {player_name}: {e}")
+            return None
 
     # --- Test hook: force fallback even if IMP is ready ---
     imp_value = player_data.get("imp")
@@ -160,58 +158,168 @@ def process_player(player_name: str, steam_id: int, last_posted_id: str | None,
     if imp_value is None:
         print(f"⏳ IMP not ready for match {match_id} (player {steam_id}). Posting minimal fallback embed.")
         try:
-            result = format_fallback_embed(player_data, match_data, player_name)
-            embed = build_fallback_embed(result)
+            result = format_fallback_embed(player_data, match_data, player_name, context=context)
+            post.update(kind="fallback", result=result, embed=build_fallback_embed(result))
+            return post
+        except Exception as e:
+            print(f"❌ Error formatting fallback embed for {player_name}: {e}")
+            return None
 
-            # 🔐 Resolve actual posting URL and store it with the pending entry
+    print(f"🎮 {player_name} — processing match {match_id}")
+
+    try:
+        result = format_match_embed(player_data, match_data, player_data.get("stats", {}), player_name, context=context)
+        post.update(kind="full", result=result, embed=build_discord_embed(result))
+        return post
+    except Exception as e:
+        print(f"❌ Error formatting match for {player_name}: {e}")
+        return None
+
+
+def post_record(post: dict, resolved: str, label: str) -> dict:
+    """
+    Serializable description of a fresh post: the built embed, where it goes, and what
+    to record in state once it lands. Kept in the durable outbox when a cooldown or hard
+    block stops the run before it is sent.
+    """
+    record = {
+        "kind": post["kind"],
+        "label": label,
+        "playerName": post["playerName"],
+        "steamId": post["steamId"],
+        "matchId": post["matchId"],
+        "webhookUrl": resolved,
+        "embed": post["embed"],
+    }
+    if post["kind"] == "fallback":
+        record["snapshot"] = post["result"]
+    return record
+
+
+def apply_post_record(state: dict, record: dict, msg_id, index, count) -> None:
+    """State mutation for a fresh post that Discord accepted."""
+    steam_id = record["steamId"]
+    match_id = record["matchId"]
+    print(f"✅ Posted {record['label']} for {record['playerName']} match {match_id}")
+    if record["kind"] == "fallback":
+        entry = {
+            "steamId": steam_id,
+            "matchId": match_id,              # ✅ store explicitly for upgrade/expiry
+            "messageId": msg_id,
+            "postedAt": time.time(),
+            "webhookBase": strip_query(record["webhookUrl"]),  # ✅ exact base used
+            "snapshot": record["snapshot"],
+            "embedHash": embed_content_hash(record["embed"]),  # ✅ skip no-op edits later
+        }
+        if count > 1:
+            # Batched message: remember which embed is ours so edits splice it in place
+            entry["embedIndex"] = index
+            entry["embedCount"] = count
+        put_pending(state, f"{match_id}:{steam_id}", entry)
+    record_posted(state, steam_id, match_id)
+
+
+def _send_new_embed(record: dict, state: dict, outbox: EmbedOutbox | None) -> bool:
+    """
+    Send a fresh embed now, or queue it in `outbox` to go out in a multi-embed message.
+    State is updated through apply_post_record once the embed is sent. If a hard block or
+    webhook cooldown stops an immediate post, the record is parked in the durable outbox.
+    Returns False to signal the run should end (hard block / webhook cooldown).
+    """
+    def on_posted(msg_id, index, count):
+        apply_post_record(state, record, msg_id, index, count)
+
+    player_name = record["playerName"]
+    match_id = record["matchId"]
+    if outbox is not None:
+        print(f"📥 Queued {record['label']} for {player_name} match {match_id}")
+        return outbox.add(record["embed"], on_posted, record)
+
+    posted, msg_id = post_to_discord_embed(
+        record["embed"], record["webhookUrl"], want_message_id=record["kind"] == "fallback",
+    )
+    if posted:
+        on_posted(msg_id, None, 1)
+        return True
+    if is_hard_blocked() or webhook_cooldown_active():
+        park_post(state, f"{match_id}:{record['steamId']}", record)
+        if webhook_cooldown_active():
+            print("🧯 Ending run early due to webhook cooldown.")
+        return False
+    print(f"⚠️ Failed to post {record['label']} for {player_name} match {match_id}")
+    return True
+
+
+def publish_player_post(post: dict, state: dict, outbox: EmbedOutbox | None = None) -> bool:
+    """
+    Post stage: send (or upgrade-edit) the embed and record the result in state.
+    With an `outbox`, fresh posts are queued and sent in multi-embed batches; their
+    state updates are applied when the batch lands. Upgrade edits are always immediate.
+    Returns False to signal the run should end (hard block / webhook cooldown).
+    """
+    player_name = post["playerName"]
+    steam_id = post["steamId"]
+    match_id = post["matchId"]
+    embed = post["embed"]
+    kind = post["kind"]
+
+    if kind == "private":
+        try:
+            # 🔐 Use the exact webhook used for posting (after overrides) when storing state
             resolved = resolve_webhook_for_post(CONFIG.get("webhook_url"))
             if CONFIG.get("webhook_enabled") and resolved:
-                posted, msg_id = post_to_discord_embed(embed, resolved, want_message_id=True)
-                if posted:
-                    print(f"✅ Posted fallback embed for {player_name} match {match_id}")
-                    pending_map[composite_key] = {
-                        "steamId": steam_id,
-                        "matchId": match_id,              # ✅ store explicitly for upgrade/expiry
-                        "messageId": msg_id,
-                        "postedAt": time.time(),
-                        "webhookBase": strip_query(resolved),  # ✅ exact base used
-                        "snapshot": result,
-                    }
-                    state[str(steam_id)] = match_id
-                else:
-                    if is_hard_blocked():
-                        return False
-                    if webhook_cooldown_active():
-                        print("🧯 Ending run early due to webhook cooldown.")
-                        return False
-                    print(f"⚠️ Failed to post fallback embed for {player_name} match {match_id}")
+                return _send_new_embed(post_record(post, resolved, "private-data fallback"), state, outbox)
             else:
                 print("⚠️ Webhook disabled or misconfigured — printing instead.")
                 print(json.dumps(embed, indent=2))
-                state[str(steam_id)] = match_id
+                record_posted(state, steam_id, match_id)
         except Exception as e:
-            print(f"❌ Error formatting or posting fallback embed for {player_name}: {e}")
+            print(f"❌ Error posting private-data fallback for {player_name}: {e}")
         return True
 
-    print(f"🎮 {player_name} — processing match {match_id}")
+    # If there is a pending entry for this specific (match, player), prefer editing that message when full stats are ready
+    pending_map = state.setdefault("pending", {})
+    composite_key = f"{match_id}:{steam_id}"
+    pending_entry = pending_map.get(composite_key)
 
-    try:
-        result = format_match_embed(player_data, match_data, player_data.get("stats", {}), player_name)
-        embed = build_discord_embed(result)
+    # 🔄 Backward-compat: migrate legacy single-key (matchId-only) entries to composite keys when they match this player
+    if not pending_entry:
+        legacy = pending_map.get(str(match_id))
+        if legacy and legacy.get("steamId") == steam_id:
+            pending_entry = legacy
+            put_pending(state, composite_key, legacy)
+            drop_pending(state, str(match_id))
+
+    if kind == "fallback":
+        try:
+            # 🔐 Resolve actual posting URL and store it with the pending entry
+            resolved = resolve_webhook_for_post(CONFIG.get("webhook_url"))
+            if CONFIG.get("webhook_enabled") and resolved:
+                return _send_new_embed(post_record(post, resolved, "fallback embed"), state, outbox)
+            else:
+                print("⚠️ Webhook disabled or misconfigured — printing instead.")
+                print(json.dumps(embed, indent=2))
+                record_posted(state, steam_id, match_id)
+        except Exception as e:
+            print(f"❌ Error posting fallback embed for {player_name}: {e}")
+        return True
 
+    try:
         if pending_entry and pending_entry.get("messageId") and CONFIG.get("webhook_enabled"):
             ok = edit_discord_message(
                 pending_entry["messageId"],
                 embed,
                 pending_entry.get("webhookBase") or CONFIG.get("webhook_url"),
                 exact_base=True,  # ✅ honor stored base; do NOT override
+                embed_index=pending_entry.get("embedIndex"),
+                embed_count=pending_entry.get("embedCount"),
+                last_hash=pending_entry.get("embedHash"),
             )
             if ok:
                 print(f"🔁 Upgraded fallback → full embed for {player_name} match {match_id}")
-                state[str(steam_id)] = match_id
+                record_posted(state, steam_id, match_id)
                 # Remove both composite and any lingering legacy key for safety
-                pending_map.pop(composite_key, None)
-                pending_map.pop(str(match_id), None)
+                drop_pending(state, composite_key, str(match_id))
             else:
                 if is_hard_blocked():
                     return False
@@ -223,23 +331,45 @@ def process_player(player_name: str, steam_id: int, last_posted_id: str | None,
             # Normal fresh post path
             resolved = resolve_webhook_for_post(CONFIG.get("webhook_url"))
             if CONFIG.get("webhook_enabled") and resolved:
-                posted, _ = post_to_discord_embed(embed, resolved, want_message_id=False)
-                if posted:
-                    print(f"✅ Posted embed for {player_name} match {match_id}")
-                    state[str(steam_id)] = match_id
-                else:
-                    if is_hard_blocked():
-                        return False
-                    if webhook_cooldown_active():
-                        print("🧯 Ending run early due to webhook cooldown.")
-                        return False
-                    print(f"⚠️ Failed to post embed for {player_name} match {match_id}")
+                return _send_new_embed(post_record(post, resolved, "embed"), state, outbox)
             else:
                 print("⚠️ Webhook disabled or misconfigured — printing instead.")
                 print(json.dumps(embed, indent=2))
-                state[str(steam_id)] = match_id
+                record_posted(state, steam_id, match_id)
 
     except Exception as e:
-        print(f"❌ Error formatting or posting match for {player_name}: {e}")
+        print(f"❌ Error posting match for {player_name}: {e}")
 
     return True
+
+
+def process_player(
+    player_name: str,
+    steam_id: int,
+    last_posted_id: str | None,
+    state: dict,
+    latest_ids: dict | None = None,
+) -> bool:
+    """
+    Fetch and format the latest match for a player (sequential fetch → format → post).
+    `latest_ids` is the roster-wide {steam_id: match_id} map from the batched poll;
+    when omitted, the latest match is looked up with a per-player Stratz query.
+    Returns False to signal the run should end early.
+    """
+    if is_hard_blocked():
+        return False
+    if webhook_cooldown_active():
+        return False
+
+    job = prepare_player(player_name, steam_id, last_posted_id, latest_ids)
+    if isinstance(job, dict) and job.get("error") == "quota_exceeded":
+        print(f"🛑 Quota exceeded while processing {player_name}.")
+        return False
+    if not job:
+        return True
+
+    post = build_player_post(job)
+    if not post:
+        return True
+
+    return publish_player_post(post, state)
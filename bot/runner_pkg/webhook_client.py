@@ -1,10 +1,11 @@
 # bot/runner_pkg/webhook_client.py
 
 import time
-import random
 import requests
 import os
 from bot.throttle import throttle_webhook
+from bot.formatter_pkg.embed import embed_content_hash
+from .webhook_transport import get_webhook_transport
 
 # --- Debug / webhook selection -------------------------------------------------
 
@@ -149,11 +150,18 @@ def resolve_webhook_for_post(webhook_url: str | None) -> str | None:
 
 
 def post_to_discord_embed(embed: dict, webhook_url: str, want_message_id: bool = False) -> tuple[bool, str | None]:
+    """Post a single embed to Discord. See post_to_discord_embeds for the handling details."""
+    return post_to_discord_embeds([embed], webhook_url, want_message_id)
+
+
+def post_to_discord_embeds(embeds: list[dict], webhook_url: str, want_message_id: bool = False) -> tuple[bool, str | None]:
     """
-    Post a single embed to Discord with safe handling:
+    Post one message carrying up to 10 embeds to Discord with safe handling:
       • Respect 429 with Retry-After / reset-after.
       • Detect Cloudflare 1015 HTML and mark hard-block.
       • Throttle per webhook to avoid hitting limits.
+      • Pace by Discord's per-route rate-limit headers via the pooled webhook transport
+        (no fixed post-success sleeps).
       • Abort run on long cooldowns (set global cooldown).
     Returns (success, message_id) — message_id may be None if not requested or if 204/No Content.
 
@@ -174,13 +182,12 @@ def post_to_discord_embed(embed: dict, webhook_url: str, want_message_id: bool =
     throttle_webhook(strip_query(webhook_url))
 
     url = _add_wait_param(webhook_url) if want_message_id else webhook_url
-    payload = {"embeds": [embed]}
+    payload = {"embeds": list(embeds)}
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = get_webhook_transport().request("POST", url, json=payload, timeout=10)
 
         if response.status_code == 204:
             # No body returned (typical when wait=false). Success.
-            time.sleep(1.0 + random.uniform(0.1, 0.6))
             return (True, None)
 
         if response.status_code == 200:
@@ -192,7 +199,6 @@ def post_to_discord_embed(embed: dict, webhook_url: str, want_message_id: bool =
                     msg_id = str(msg.get("id")) if isinstance(msg, dict) else None
                 except Exception:
                     msg_id = None
-            time.sleep(1.0 + random.uniform(0.1, 0.6))
             return (True, msg_id)
 
         if response.status_code == 429:
@@ -204,7 +210,7 @@ def post_to_discord_embed(embed: dict, webhook_url: str, want_message_id: bool =
                 return (False, None)
             time.sleep(backoff)
             throttle_webhook(strip_query(webhook_url))
-            retry = requests.post(url, json=payload, timeout=10)
+            retry = get_webhook_transport().request("POST", url, json=payload, timeout=10)
             if retry.status_code in (200, 204):
                 msg_id = None
                 if want_message_id and retry.status_code == 200:
@@ -213,7 +219,6 @@ def post_to_discord_embed(embed: dict, webhook_url: str, want_message_id: bool =
                         msg_id = str(msg.get("id")) if isinstance(msg, dict) else None
                     except Exception:
                         msg_id = None
-                time.sleep(1.0 + random.uniform(0.1, 0.6))
                 return (True, msg_id)
             if _looks_like_cloudflare_1015(retry):
                 _HARD_BLOCKED = True
@@ -240,7 +245,29 @@ def post_to_discord_embed(embed: dict, webhook_url: str, want_message_id: bool =
         return (False, None)
 
 
-def edit_discord_message(message_id: str, embed: dict, webhook_url: str, exact_base: bool = True) -> bool:
+# Hash of the last embed successfully sent per (message id, embed index) in this process.
+# Only a short-lived backstop (bounded, oldest dropped first): the durable no-op check is
+# the embedHash persisted on pending entries and passed in as last_hash.
+_LAST_EDIT_HASH: dict[tuple[str, int], str] = {}
+_LAST_EDIT_HASH_MAX = 256
+
+
+def _remember_edit(edit_key: tuple[str, int], content_hash: str) -> None:
+    _LAST_EDIT_HASH.pop(edit_key, None)
+    _LAST_EDIT_HASH[edit_key] = content_hash
+    while len(_LAST_EDIT_HASH) > _LAST_EDIT_HASH_MAX:
+        _LAST_EDIT_HASH.pop(next(iter(_LAST_EDIT_HASH)), None)
+
+
+def edit_discord_message(
+    message_id: str,
+    embed: dict,
+    webhook_url: str,
+    exact_base: bool = True,
+    embed_index: int | None = None,
+    embed_count: int | None = None,
+    last_hash: str | None = None,
+) -> bool:
     """
     Edit a previously-sent webhook message by ID.
     PATCH {webhookBase}/messages/{message_id} with {"embeds":[.]}
@@ -248,6 +275,14 @@ def edit_discord_message(message_id: str, embed: dict, webhook_url: str, exact_b
     exact_base=True → use the passed base exactly (no debug/prod override).
     Set exact_base=False only if you intentionally want override behavior.
 
+    embed_index/embed_count: when the message was posted as a batch of several embeds,
+    only the embed at `embed_index` is replaced; the message's other embeds are read back
+    (GET) and re-sent unchanged so the PATCH does not drop them.
+
+    last_hash: embed_content_hash of what the message last showed (stored on pending
+    entries). When the new embed hashes the same — or matches the last edit made to this
+    message in this process — the PATCH is skipped and True is returned.
+
     NOTE: If webhook_url is None/empty and exact_base=False, this will use the default selected by DEBUG_LEVEL.
     """
     global _HARD_BLOCKED
@@ -257,6 +292,13 @@ def edit_discord_message(message_id: str, embed: dict, webhook_url: str, exact_b
     if not base_url:
         return False
 
+    # 🟰 No-op edit: the message already shows this content
+    content_hash = embed_content_hash(embed)
+    edit_key = (str(message_id), embed_index or 0)
+    if content_hash == last_hash or content_hash == _LAST_EDIT_HASH.get(edit_key):
+        print(f"🟰 Message {message_id} already shows this embed — skipping edit")
+        return True
+
     if _webhook_cooldown_active():
         return False
 
@@ -265,12 +307,20 @@ def edit_discord_message(message_id: str, embed: dict, webhook_url: str, exact_b
 
     base = strip_query(base_url)
     url = f"{base}/messages/{message_id}"
-    payload = {"embeds": [embed]}
+    embeds = [embed]
+    if embed_index is not None and (embed_count or 0) > 1:
+        current = _fetch_message_embeds(url)
+        if current is None or not 0 <= embed_index < len(current):
+            print(f"⚠️ Could not read back batched message {message_id} — will retry edit later")
+            return False
+        embeds = [_request_embed(e) for e in current]
+        embeds[embed_index] = embed
+    payload = {"embeds": embeds}
 
     try:
-        response = requests.patch(url, json=payload, timeout=10)
+        response = get_webhook_transport().request("PATCH", url, json=payload, timeout=10)
         if response.status_code in (200, 204):
-            time.sleep(0.6 + random.uniform(0.05, 0.3))
+            _remember_edit(edit_key, content_hash)
             return True
         if response.status_code == 429:
             backoff = _parse_retry_after(response)
@@ -280,8 +330,9 @@ def edit_discord_message(message_id: str, embed: dict, webhook_url: str, exact_b
                 return False
             time.sleep(backoff)
             throttle_webhook(strip_query(base_url))
-            retry = requests.patch(url, json=payload, timeout=10)
+            retry = get_webhook_transport().request("PATCH", url, json=payload, timeout=10)
             if retry.status_code in (200, 204):
+                _remember_edit(edit_key, content_hash)
                 return True
             if _looks_like_cloudflare_1015(retry):
                 _HARD_BLOCKED = True
@@ -299,6 +350,47 @@ def edit_discord_message(message_id: str, embed: dict, webhook_url: str, exact_b
         return False
 
 
+# Keys Discord accepts when (re)sending an embed; read-back embeds carry extra server fields
+_EMBED_KEYS = ("title", "description", "url", "timestamp", "color", "fields", "footer", "image", "thumbnail", "author")
+_EMBED_SUBKEYS = {
+    "footer": ("text", "icon_url"),
+    "image": ("url",),
+    "thumbnail": ("url",),
+    "author": ("name", "url", "icon_url"),
+}
+
+
+def _request_embed(embed: dict) -> dict:
+    """Strip a read-back embed down to the fields accepted in a webhook request."""
+    out = {}
+    for key in _EMBED_KEYS:
+        if key not in embed:
+            continue
+        val = embed[key]
+        if key in _EMBED_SUBKEYS and isinstance(val, dict):
+            val = {k: v for k, v in val.items() if k in _EMBED_SUBKEYS[key]}
+        elif key == "fields" and isinstance(val, list):
+            val = [{k: f.get(k) for k in ("name", "value", "inline") if k in f} for f in val if isinstance(f, dict)]
+        out[key] = val
+    return out
+
+
+def _fetch_message_embeds(message_url: str) -> list[dict] | None:
+    """GET a webhook message and return its embeds (None on any failure)."""
+    try:
+        throttle_webhook(strip_query(message_url))
+        response = get_webhook_transport().request("GET", message_url, json=None, timeout=10)
+        if response.status_code != 200:
+            print(f"⚠️ Reading webhook message failed {response.status_code}: {response.text[:200]}")
+            return None
+        data = response.json()
+        embeds = data.get("embeds") if isinstance(data, dict) else None
+        return embeds if isinstance(embeds, list) else None
+    except Exception as e:
+        print(f"❌ Reading webhook message failed: {e}")
+        return None
+
+
 # --- Small public helpers for runner/orchestrator ---
 
 def is_hard_blocked() -> bool:
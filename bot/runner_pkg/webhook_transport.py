@@ -0,0 +1,106 @@
+# bot/runner_pkg/webhook_transport.py
+
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+# Discord reports per-route buckets through these headers; we pace each route by them
+# instead of sleeping a fixed amount after every request.
+_MESSAGE_ID_RE = re.compile(r"/messages/\d+")
+
+
+class _Bucket:
+    __slots__ = ("remaining", "reset_at")
+
+    def __init__(self):
+        self.remaining: int | None = None
+        self.reset_at = 0.0  # monotonic seconds
+
+
+class WebhookTransport:
+    """
+    Pooled keep-alive HTTP transport for Discord webhooks.
+      • One requests.Session per webhook host (connection reuse across posts/edits).
+      • Per-route rate-limit buckets fed by X-RateLimit-Remaining / X-RateLimit-Reset-After
+        (and X-RateLimit-Bucket, so routes Discord reports as sharing a bucket wait together).
+      • Before a request, waits only if the route's bucket is exhausted and not yet reset.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: dict[str, requests.Session] = {}
+        self._buckets: dict[str, _Bucket] = {}
+        self._route_bucket: dict[str, str] = {}
+
+    def _session(self, url: str) -> requests.Session:
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._sessions[host] = requests.Session()
+            return session
+
+    @staticmethod
+    def route_key(method: str, url: str) -> str:
+        """Route = method + webhook path without query; message ids collapse into one route."""
+        path = urlsplit(url).path
+        return f"{method.upper()} {_MESSAGE_ID_RE.sub('/messages/:id', path)}"
+
+    def _bucket(self, route: str) -> _Bucket:
+        with self._lock:
+            key = self._route_bucket.get(route, route)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket()
+            return bucket
+
+    def wait_time(self, route: str) -> float:
+        bucket = self._bucket(route)
+        if bucket.remaining == 0:
+            return max(0.0, bucket.reset_at - time.monotonic())
+        return 0.0
+
+    def _update(self, route: str, headers) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        bucket_id = headers.get("X-RateLimit-Bucket")
+        if remaining is None and reset_after is None:
+            return
+
+        with self._lock:
+            if bucket_id:
+                key = f"bucket:{bucket_id}"
+                if self._route_bucket.get(route) != key:
+                    self._route_bucket[route] = key
+                    # Adopt the route's own bucket the first time Discord names it
+                    own = self._buckets.pop(route, None)
+                    if key not in self._buckets:
+                        self._buckets[key] = own or _Bucket()
+            bucket = self._buckets.setdefault(self._route_bucket.get(route, route), _Bucket())
+            try:
+                if remaining is not None:
+                    bucket.remaining = int(float(remaining))
+                if reset_after is not None:
+                    bucket.reset_at = time.monotonic() + max(0.0, float(reset_after))
+            except (TypeError, ValueError):
+                pass
+
+    def request(self, method: str, url: str, json: dict, timeout: int = 10) -> requests.Response:
+        """Send one webhook request on the pooled session, pacing by the route's bucket."""
+        route = self.route_key(method, url)
+        wait = self.wait_time(route)
+        if wait > 0:
+            time.sleep(wait)
+        response = self._session(url).request(method, url, json=json, timeout=timeout)
+        self._update(route, response.headers)
+        return response
+
+
+_TRANSPORT = WebhookTransport()
+
+
+def get_webhook_transport() -> WebhookTransport:
+    return _TRANSPORT
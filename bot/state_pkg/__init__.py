@@ -0,0 +1,29 @@
+# bot/state_pkg/__init__.py
+
+from .backend import (
+    GistStateBackend,
+    get_state_backend,
+    load_state,
+    save_state,
+)
+
+from .sqlite_backend import (
+    SqliteStateBackend,
+)
+
+from .legacy import (
+    migrate_pending_keys,
+)
+
+from .journal import (
+    StateJournal,
+    get_state_journal,
+)
+
+from .mutations import (
+    record_posted,
+    put_pending,
+    drop_pending,
+    park_post,
+    unpark_post,
+)
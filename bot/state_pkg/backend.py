@@ -0,0 +1,86 @@
+# bot/state_pkg/backend.py
+
+import os
+import threading
+
+from bot.config import RUNTIME_DIR
+from .sqlite_backend import SqliteStateBackend
+from .journal import get_state_journal
+
+# State backends expose `label`, `load() -> dict` and `save(state) -> bool`
+# (True when something was written). Select with env STATE_BACKEND:
+#   gist   (default) — the whole state as one JSON file in a GitHub gist (bot.gist_state)
+#   sqlite           — local SQLite at STATE_DB_PATH (default <runtime dir>/state.sqlite3)
+# load_state/save_state add the write-ahead journal on top: mutations journaled since the
+# last save are replayed after a load, and the journal is truncated once a save succeeds.
+# Backends that write per row (SQLite) also get load(keys) to read only the rows a run
+# needs, and touch(table, key) from touch_row() for every mutation, so save() encodes and
+# writes only those rows.
+
+
+class GistStateBackend:
+    label = "GitHub Gist"
+
+    def load(self, keys=None) -> dict:
+        # The gist is one JSON document: it is always read (and written) whole
+        from bot.gist_state import load_state
+        return load_state()
+
+    def save(self, state: dict) -> bool:
+        from bot.gist_state import save_state
+        return save_state(state)
+
+
+def state_db_path() -> str:
+    return os.getenv("STATE_DB_PATH") or os.path.join(RUNTIME_DIR, "state.sqlite3")
+
+
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def get_state_backend():
+    global _BACKEND
+    with _BACKEND_LOCK:
+        if _BACKEND is None:
+            name = (os.getenv("STATE_BACKEND") or "gist").strip().lower()
+            if name == "sqlite":
+                _BACKEND = SqliteStateBackend(state_db_path())
+            else:
+                if name != "gist":
+                    print(f"⚠️ Unknown STATE_BACKEND={name!r} — using the gist.")
+                _BACKEND = GistStateBackend()
+        return _BACKEND
+
+
+def touch_row(op: dict) -> None:
+    """Tell a per-row backend which row a journaled mutation changed."""
+    touch = getattr(get_state_backend(), "touch", None)
+    if touch is None:
+        return
+    kind = op.get("op")
+    if kind in ("pending_put", "pending_del"):
+        touch("pending", op.get("key"))
+    elif kind in ("outbox_put", "outbox_del"):
+        touch("state_kv", "outbox")
+    else:
+        touch("state_kv", op.get("key"))
+
+
+def load_state(keys=None) -> dict:
+    """
+    Load the state (+ journal replay). `keys` names the top-level keys the run needs (the
+    roster's steam ids); per-row backends read only those plus pending/outbox.
+    """
+    state = get_state_backend().load(keys)
+    replayed = get_state_journal().replay(state, on_apply=touch_row)
+    if replayed:
+        print(f"📒 Replayed {replayed} journaled state changes from an unfinished run")
+    return state
+
+
+def save_state(state: dict) -> bool:
+    journal = get_state_journal()
+    written = get_state_backend().save(state)
+    journal.truncate()
+    return written
@@ -0,0 +1,128 @@
+# bot/state_pkg/journal.py
+
+import json
+import os
+import threading
+
+try:
+    import fcntl  # POSIX only; elsewhere the single-writer rule below is not enforced
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from bot.config import RUNTIME_DIR
+
+# Append-only write-ahead journal of state mutations made during a run, one JSON line each:
+#   {"op": "set", "key": "<steamId>", "value": <matchId>}
+#   {"op": "pending_put", "key": "<matchId>:<steamId>", "entry": {...}}
+#   {"op": "pending_del", "key": "<matchId>:<steamId>"}
+#   {"op": "outbox_put", "key": "<matchId>:<steamId>", "entry": {...}}
+#   {"op": "outbox_del", "key": "<matchId>:<steamId>"}
+# Each line is flushed as soon as the post it records succeeds, replayed on top of the
+# backend state at load, and truncated once the state has been saved (compacted).
+#
+# The journal has a single writer: the first append takes an exclusive, non-blocking flock
+# held until truncate, so a second process (e.g. a manual run beside the Flask server) gets
+# an OSError on append (its mutations then only reach the backend at its final save) and
+# leaves the owner's journal in place instead of deleting it on compaction.
+
+
+def journal_path() -> str:
+    return os.getenv("STATE_JOURNAL_PATH") or os.path.join(RUNTIME_DIR, "state_journal.jsonl")
+
+
+def apply_op(state: dict, op: dict) -> None:
+    kind = op.get("op")
+    key = str(op.get("key"))
+    if kind == "set":
+        state[key] = op.get("value")
+    elif kind in ("pending_put", "outbox_put"):
+        state.setdefault(kind[:-4], {})[key] = op.get("entry")
+    elif kind in ("pending_del", "outbox_del"):
+        state.setdefault(kind[:-4], {}).pop(key, None)
+
+
+class StateJournal:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self.entries = 0  # lines appended since the last truncate
+        self.compact_after = 0  # after a failed compaction: entry count at which to retry
+
+    def _open_locked(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        f = open(self.path, "a", encoding="utf-8")
+        if fcntl is not None:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                raise OSError(f"state journal {self.path} is in use by another process")
+        return f
+
+    def append(self, op: dict) -> int:
+        """Durably append one mutation. Returns the number of entries since the last compaction."""
+        line = json.dumps(op, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = self._open_locked()
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.entries += 1
+            return self.entries
+
+    def replay(self, state: dict, on_apply=None) -> int:
+        """
+        Apply journaled mutations to `state` (calling on_apply(op) after each one).
+        A torn trailing line (crash mid-write) is ignored.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return 0
+
+        applied = 0
+        for line in lines:
+            try:
+                op = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(op, dict):
+                apply_op(state, op)
+                if on_apply is not None:
+                    on_apply(op)
+                applied += 1
+        with self._lock:
+            self.entries = applied
+        return applied
+
+    def truncate(self) -> None:
+        with self._lock:
+            if self._file is None:
+                try:
+                    self._file = self._open_locked()
+                except OSError as e:
+                    print(f"⚠️ Not truncating the state journal: {e}")
+                    return
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self._file.close()  # releases the flock
+            self._file = None
+            self.entries = 0
+            self.compact_after = 0
+
+
+_JOURNAL: StateJournal | None = None
+_JOURNAL_LOCK = threading.Lock()
+
+
+def get_state_journal() -> StateJournal:
+    global _JOURNAL
+    with _JOURNAL_LOCK:
+        if _JOURNAL is None:
+            _JOURNAL = StateJournal(journal_path())
+        return _JOURNAL
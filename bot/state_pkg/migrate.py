@@ -0,0 +1,31 @@
+# bot/state_pkg/migrate.py
+#
+# One-shot copy of the gist state into the local SQLite backend:
+#   python -m bot.state_pkg.migrate [--force]
+# The gist load already applies the legacy matchId → matchId:steamId pending-key migration.
+
+import sys
+
+from .backend import state_db_path
+from .sqlite_backend import SqliteStateBackend
+
+
+def migrate_gist_to_sqlite(path: str | None = None, force: bool = False) -> bool:
+    """Copy the gist state into SQLite. Refuses to overwrite a non-empty database unless forced."""
+    from bot.gist_state import load_state as load_gist_state
+
+    target = SqliteStateBackend(path or state_db_path())
+    if not target.is_empty() and not force:
+        print(f"⚠️ {target.path} already has state — pass --force to overwrite.")
+        return False
+
+    state = load_gist_state()
+    rows = target.replace_all(state)
+    pending = len(state.get("pending") or {})
+    print(f"✅ Migrated gist state → {target.path} ({rows} rows, {pending} pending)")
+    return True
+
+
+if __name__ == "__main__":
+    ok = migrate_gist_to_sqlite(force="--force" in sys.argv[1:])
+    sys.exit(0 if ok else 1)
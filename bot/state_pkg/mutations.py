@@ -0,0 +1,74 @@
+# bot/state_pkg/mutations.py
+
+import os
+
+from .backend import save_state, touch_row
+from .journal import get_state_journal
+
+# State mutations made after a successful post. Each one updates the in-memory state and
+# is appended to the write-ahead journal, so a crash mid-run cannot lose the bookkeeping
+# for messages already on Discord. Every STATE_COMPACT_EVERY journal entries (default 20;
+# 0 disables) the state is saved to the backend and the journal truncated. A failed
+# compaction (e.g. gist outage) is retried only after another STATE_COMPACT_EVERY entries,
+# not on every post; the end-of-run save_state covers the rest.
+_DEFAULT_COMPACT_EVERY = 20
+
+
+def _compact_every() -> int:
+    raw = (os.getenv("STATE_COMPACT_EVERY") or "").strip()
+    if raw.isdigit():
+        return int(raw)
+    return _DEFAULT_COMPACT_EVERY
+
+
+def _journal(state: dict, op: dict) -> None:
+    touch_row(op)
+    journal = get_state_journal()
+    try:
+        entries = journal.append(op)
+    except OSError as e:
+        print(f"⚠️ State journal append failed: {e}")
+        return
+    every = _compact_every()
+    if every and entries >= max(every, journal.compact_after):
+        try:
+            save_state(state)
+            print(f"🗜️ Compacted {entries} journaled state changes into the state backend")
+        except Exception as e:
+            journal.compact_after = entries + every
+            print(f"⚠️ State compaction failed (journal kept, retrying after {every} more changes): {type(e).__name__}: {e}")
+
+
+def record_posted(state: dict, steam_id, match_id) -> None:
+    """state[str(steam_id)] = match_id, journaled."""
+    state[str(steam_id)] = match_id
+    _journal(state, {"op": "set", "key": str(steam_id), "value": match_id})
+
+
+def put_pending(state: dict, key: str, entry: dict) -> None:
+    """state["pending"][key] = entry, journaled."""
+    state.setdefault("pending", {})[str(key)] = entry
+    _journal(state, {"op": "pending_put", "key": str(key), "entry": entry})
+
+
+def park_post(state: dict, key: str, record: dict) -> None:
+    """state["outbox"][key] = record (a built post waiting for the webhook), journaled."""
+    state.setdefault("outbox", {})[str(key)] = record
+    _journal(state, {"op": "outbox_put", "key": str(key), "entry": record})
+
+
+def unpark_post(state: dict, key: str) -> None:
+    """Remove a parked post once it has been sent (or given up on), journaled."""
+    outbox = state.setdefault("outbox", {})
+    if str(key) in outbox:
+        outbox.pop(str(key), None)
+        _journal(state, {"op": "outbox_del", "key": str(key)})
+
+
+def drop_pending(state: dict, *keys: str) -> None:
+    """Remove pending entries (missing keys are ignored), journaled."""
+    pending_map = state.setdefault("pending", {})
+    for key in keys:
+        if str(key) in pending_map:
+            pending_map.pop(str(key), None)
+            _journal(state, {"op": "pending_del", "key": str(key)})
@@ -0,0 +1,162 @@
+# bot/state_pkg/sqlite_backend.py
+
+import json
+import os
+import sqlite3
+import threading
+
+from .legacy import migrate_pending_keys
+
+# Local run state in SQLite (WAL). Top-level keys (per-player last posted match id, the
+# parked outbox, …) are rows in `state_kv`; the pending map is one row per
+# "<matchId>:<steamId>" entry. Values are stored as compact JSON.
+#
+# A run only touches the rows it needs: load(keys) reads just those state_kv rows (the
+# roster's steam ids) plus the outbox and the pending rows, and save() encodes and upserts
+# only rows the state mutation helpers reported through touch() (or keys that appeared),
+# deleting rows whose keys disappeared. Code that edits a value in place without going
+# through bot.state_pkg's mutation helpers must call touch() itself.
+
+# state_kv rows every run needs besides the roster's keys
+_ALWAYS_LOADED = ("outbox",)
+# SQLite's default bound-parameter limit is 999; stay under it per IN (...) query
+_IN_CHUNK = 500
+
+
+def _encode(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _rows(state: dict) -> dict:
+    """Flatten a state dict into {(table, key): json} rows."""
+    rows = {}
+    for key, value in state.items():
+        if key == "pending" and isinstance(value, dict):
+            for pending_key, entry in value.items():
+                rows[("pending", str(pending_key))] = _encode(entry)
+        else:
+            rows[("state_kv", str(key))] = _encode(value)
+    return rows
+
+
+class SqliteStateBackend:
+    def __init__(self, path: str):
+        self.path = path
+        self.label = f"SQLite ({path})"
+        self._lock = threading.Lock()
+        self._conn = None
+        self._loaded: dict = {}  # (table, key) → JSON as last loaded/saved, for loaded rows only
+        self._dirty: set = set()  # (table, key) rows mutated since the last load/save
+
+    def touch(self, table: str, key) -> None:
+        """Mark one row as changed so the next save() re-encodes and writes it."""
+        with self._lock:
+            self._dirty.add((table, str(key)))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS state_kv (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS pending (key TEXT PRIMARY KEY, entry TEXT NOT NULL)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            conn = self._connect()
+            kv = conn.execute("SELECT COUNT(*) FROM state_kv").fetchone()[0]
+            pending = conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        return kv == 0 and pending == 0
+
+    def load(self, keys=None) -> dict:
+        """
+        Load the pending rows plus the state_kv rows named in `keys` (and the outbox);
+        every state_kv row when `keys` is None.
+        """
+        with self._lock:
+            conn = self._connect()
+            if keys is None:
+                kv = conn.execute("SELECT key, value FROM state_kv").fetchall()
+            else:
+                wanted = sorted({str(k) for k in keys} | set(_ALWAYS_LOADED))
+                kv = []
+                for start in range(0, len(wanted), _IN_CHUNK):
+                    chunk = wanted[start:start + _IN_CHUNK]
+                    marks = ",".join("?" * len(chunk))
+                    kv += conn.execute(f"SELECT key, value FROM state_kv WHERE key IN ({marks})", chunk).fetchall()
+            pending = conn.execute("SELECT key, entry FROM pending").fetchall()
+            self._dirty = set()
+
+        self._loaded = {("state_kv", k): v for k, v in kv}
+        self._loaded.update({("pending", k): v for k, v in pending})
+
+        state = {k: json.loads(v) for k, v in kv}
+        state["pending"] = {k: json.loads(v) for k, v in pending}
+        return migrate_pending_keys(state)
+
+    def _changed_rows(self, state: dict) -> tuple[list, list, set]:
+        """(upserts, deletes, touched rows considered) from touched rows plus keys that appeared or disappeared."""
+        pending = state.get("pending")
+        pending = pending if isinstance(pending, dict) else {}
+        current = {("state_kv", str(k)) for k in state if k != "pending"}
+        current |= {("pending", str(k)) for k in pending}
+
+        with self._lock:
+            touched = set(self._dirty)
+        candidates = (touched | (current - self._loaded.keys())) & current
+
+        upserts = []
+        for table, key in candidates:
+            value = _encode(pending[key] if table == "pending" else state[key])
+            if self._loaded.get((table, key)) != value:
+                upserts.append((table, key, value))
+        deletes = [row for row in self._loaded if row not in current]
+        return upserts, deletes, touched
+
+    def save(self, state: dict) -> bool:
+        """Write only touched/added rows that differ, and delete removed ones. True if anything changed."""
+        upserts, deletes, touched = self._changed_rows(state)
+        if not upserts and not deletes:
+            self._forget(touched)
+            print("🟰 State unchanged — nothing to write")
+            return False
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for table, key, value in upserts:
+                    column = "entry" if table == "pending" else "value"
+                    conn.execute(f"INSERT OR REPLACE INTO {table} (key, {column}) VALUES (?, ?)", (key, value))
+                for table, key in deletes:
+                    conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+
+        self._forget(touched)  # only once written: a failed save keeps them for the next one
+        for table, key, value in upserts:
+            self._loaded[(table, key)] = value
+        for row in deletes:
+            self._loaded.pop(row, None)
+        print(f"💾 State saved to SQLite ({len(upserts)} upserted, {len(deletes)} deleted)")
+        return True
+
+    def _forget(self, touched: set) -> None:
+        with self._lock:
+            self._dirty -= touched
+
+    def replace_all(self, state: dict) -> int:
+        """Overwrite every row with `state` (used by the gist migrator). Returns rows written."""
+        rows = _rows(state)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM state_kv")
+                conn.execute("DELETE FROM pending")
+                for (table, key), value in rows.items():
+                    column = "entry" if table == "pending" else "value"
+                    conn.execute(f"INSERT INTO {table} (key, {column}) VALUES (?, ?)", (key, value))
+            self._dirty = set()
+        self._loaded = rows
+        return len(rows)
@@ -2,8 +2,10 @@
 
 import json
 import os
+import threading
 import requests
 from bot.throttle import throttle  # ✅ Enforce rate limit before each request
+from bot.match_store import load_match, save_match
 
 STRATZ_URL = "https://api.stratz.com/graphql"
 
@@ -21,75 +23,98 @@ def _debug_level() -> int:
     except Exception:
         return 1 if raw in {"1", "true", "yes", "on"} else 0
 
-# --- Shared Stratz query runner ---
-def post_stratz_query(query: str, variables: dict, timeout: int = 10) -> dict | str | None:
-    """
-    POST a GraphQL query to Stratz and return the 'data' object on success.
-    On quota exhaustion: return the string 'quota_exceeded'.
-    On other failures: return None (callers handle skip/continue logic).
-    """
+# --- Shared HTTP session (keep-alive connection pool to api.stratz.com) ---
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
 
+
+def _session() -> requests.Session:
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = requests.Session()
+        return _SESSION
+
+
+def _stratz_headers() -> dict | None:
     token = os.getenv("STRATZ_TOKEN") or os.getenv("TOKEN")
     if not token:
         print("❌ No STRATZ_TOKEN or TOKEN found in environment — cannot query Stratz.")
         return None
-
-    headers = {
+    return {
         "User-Agent": "STRATZ_API",
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
         "Accept": "application/json",
     }
 
+
+def _handle_response(status_code: int, headers, text: str, load_json) -> dict | str | None:
+    """
+    Shared response handling for the sync and async clients.
+    Returns the 'data' object, 'quota_exceeded', or None.
+    """
+    # Explicit quota handling
+    if status_code == 429:
+        print("🛑 Stratz API returned 429 Too Many Requests")
+        return "quota_exceeded"
+
+    # Cloudflare/WAF HTML challenge detection
+    if status_code == 403 and "text/html" in headers.get("Content-Type", ""):
+        snippet = (text or "")[:300].replace("\n", " ").strip()
+        print(f"⚠️ HTTP 403 HTML challenge from Stratz/Cloudflare | body[:300]={snippet}")
+        return None
+
+    # Better diagnostics for any non-200
+    if status_code != 200:
+        safe_headers = {
+            "status": status_code,
+            "server": headers.get("server"),
+            "cf-ray": headers.get("cf-ray"),
+            "content-type": headers.get("Content-Type"),
+            "date": headers.get("Date"),
+        }
+        snippet = (text or "")[:300].replace("\n", " ").strip()
+        print(f"⚠️ Stratz non-200: {safe_headers} | body[:300]={snippet}")
+        if status_code >= 400:
+            print(f"❌ Stratz query failed: HTTP {status_code}")
+            return None
+
+    try:
+        payload = load_json()
+    except Exception as je:
+        print(f"❌ Failed to parse JSON from Stratz: {je}")
+        text_snippet = (text or "")[:200].replace("\n", " ").strip()
+        print(f"📎 Body[:200]={text_snippet}")
+        return None
+
+    return (payload or {}).get("data")
+
+
+# --- Shared Stratz query runner ---
+def post_stratz_query(query: str, variables: dict, timeout: int = 10) -> dict | str | None:
+    """
+    POST a GraphQL query to Stratz and return the 'data' object on success.
+    On quota exhaustion: return the string 'quota_exceeded'.
+    On other failures: return None (callers handle skip/continue logic).
+    Requests reuse one pooled keep-alive session.
+    """
+
+    headers = _stratz_headers()
+    if not headers:
+        return None
+
     throttle()  # ✅ Rate-limit per second/minute/hour caps
 
     try:
-        response = requests.post(
+        response = _session().post(
             STRATZ_URL,
             headers=headers,
             json={"query": query, "variables": variables},
             timeout=timeout
         )
+        return _handle_response(response.status_code, response.headers, response.text, response.json)
 
-        # Explicit quota handling
-        if response.status_code == 429:
-            print("🛑 Stratz API returned 429 Too Many Requests")
-            return "quota_exceeded"
-
-        # Cloudflare/WAF HTML challenge detection
-        if response.status_code == 403 and "text/html" in response.headers.get("Content-Type", ""):
-            snippet = (response.text or "")[:300].replace("\n", " ").strip()
-            print(f"⚠️ HTTP 403 HTML challenge from Stratz/Cloudflare | body[:300]={snippet}")
-            return None
-
-        # Better diagnostics for any non-200
-        if response.status_code != 200:
-            safe_headers = {
-                "status": response.status_code,
-                "server": response.headers.get("server"),
-                "cf-ray": response.headers.get("cf-ray"),
-                "content-type": response.headers.get("Content-Type"),
-                "date": response.headers.get("Date"),
-            }
-            snippet = (response.text or "")[:300].replace("\n", " ").strip()
-            print(f"⚠️ Stratz non-200: {safe_headers} | body[:300]={snippet}")
-            response.raise_for_status()
-
-        try:
-            payload = response.json()
-        except Exception as je:
-            print(f"❌ Failed to parse JSON from Stratz: {je}")
-            text_snippet = (response.text or "")[:200].replace("\n", " ").strip()
-            print(f"📎 Body[:200]={text_snippet}")
-            return None
-
-        return (payload or {}).get("data")
-
-    except requests.HTTPError as e:
-        print(f"❌ Stratz query failed: {e}")
-        if "429" in str(e):
-            return "quota_exceeded"
-        return None
     except Exception as e:
         print(f"❌ Stratz query failed: {e}")
         if "quota" in str(e).lower():
@@ -97,12 +122,7 @@ def post_stratz_query(query: str, variables: dict, timeout: int = 10) -> dict |
         return None
 
 # --- Minimal match summary: for checking most recent match ID ---
-def fetch_latest_match(steam_id: int) -> dict | None:
-    """
-    Fetch the most recent match ID for a given Steam32 ID.
-    Used for polling latest match played.
-    """
-    query = """
+LATEST_MATCH_QUERY = """
     query ($steamId: Long!) {
       player(steamAccountId: $steamId) {
         matches(request: { take: 1 }) {
@@ -111,9 +131,18 @@ def fetch_latest_match(steam_id: int) -> dict | None:
       }
     }
     """
-    variables = {"steamId": steam_id}
-    data = post_stratz_query(query, variables)
 
+
+def fetch_latest_match(steam_id: int) -> dict | None:
+    """
+    Fetch the most recent match ID for a given Steam32 ID.
+    Used for polling latest match played.
+    """
+    data = post_stratz_query(LATEST_MATCH_QUERY, {"steamId": steam_id})
+    return _parse_latest_match(data)
+
+
+def _parse_latest_match(data) -> dict | None:
     if data == "quota_exceeded":
         return {"error": "quota_exceeded"}
 
@@ -122,12 +151,144 @@ def fetch_latest_match(steam_id: int) -> dict | None:
 
     return {"match_id": data["player"]["matches"][0]["id"]}
 
-# --- Full match payload including extended stats and timeline ---
-def fetch_full_match(match_id: int) -> dict | None:
+# --- Batched latest-match polling: one aliased query per chunk of players ---
+_DEFAULT_LATEST_BATCH_SIZE = 25
+
+
+def _latest_batch_size() -> int:
     """
-    Full match data query with extended player + stat info (v4-ready).
+    Players per aliased latest-match query (env STRATZ_LATEST_BATCH_SIZE).
+    Bounded to 1..100 to stay well under Stratz query complexity limits.
+    """
+    raw = (os.getenv("STRATZ_LATEST_BATCH_SIZE") or "").strip()
+    if raw.isdigit():
+        return max(1, min(100, int(raw)))
+    return _DEFAULT_LATEST_BATCH_SIZE
+
+
+def _build_latest_batch_query(count: int) -> str:
+    """
+    Build an aliased GraphQL query polling `count` players at once:
+      p0: player(steamAccountId: $p0) { matches(request: { take: 1 }) { id } }
+      p1: ...
+    """
+    params = ", ".join(f"$p{i}: Long!" for i in range(count))
+    fields = "\n".join(
+        f"      p{i}: player(steamAccountId: $p{i}) {{ matches(request: {{ take: 1 }}) {{ id }} }}"
+        for i in range(count)
+    )
+    return f"query ({params}) {{\n{fields}\n    }}"
+
+
+def fetch_latest_matches(
+    steam_ids: list[int], chunk_size: int | None = None, failed: list | None = None
+) -> dict:
+    """
+    Fetch the most recent match ID for many players using one aliased query per chunk.
+    Returns {steam_id: match_id} for every player with at least one match.
+    Players with no matches (or private/failed lookups) are simply absent from the map;
+    pass `failed` to collect the steam IDs whose chunk query failed outright.
+    On quota exhaustion: returns {"error": "quota_exceeded"}.
+    """
+    latest: dict = {}
+    for start, chunk in _latest_chunks(steam_ids, chunk_size):
+        query = _build_latest_batch_query(len(chunk))
+        variables = {f"p{i}": sid for i, sid in enumerate(chunk)}
+        data = post_stratz_query(query, variables)
+        if data == "quota_exceeded":
+            return {"error": "quota_exceeded"}
+        if not _merge_latest_batch(latest, data, chunk, start) and failed is not None:
+            failed.extend(chunk)
+    return latest
+
+
+def _latest_chunks(steam_ids, chunk_size: int | None):
+    size = chunk_size or _latest_batch_size()
+    ids = [int(s) for s in steam_ids]
+    for start in range(0, len(ids), size):
+        yield start, ids[start:start + size]
+
+
+def _merge_latest_batch(latest: dict, data, chunk: list[int], start: int) -> bool:
+    if not isinstance(data, dict):
+        print(f"⚠️ Batched latest-match poll failed for {len(chunk)} players (offset {start})")
+        return False
+
+    for i, sid in enumerate(chunk):
+        player = data.get(f"p{i}") or {}
+        matches = player.get("matches") or []
+        if matches and matches[0].get("id") is not None:
+            latest[sid] = matches[0]["id"]
+    return True
+
+# --- Batched IMP-readiness probe: which players of which matches have IMP yet ---
+_DEFAULT_IMP_BATCH_SIZE = 25
+
+
+def _imp_batch_size() -> int:
+    """Matches per aliased IMP probe (env STRATZ_IMP_BATCH_SIZE, bounded 1..100)."""
+    raw = (os.getenv("STRATZ_IMP_BATCH_SIZE") or "").strip()
+    if raw.isdigit():
+        return max(1, min(100, int(raw)))
+    return _DEFAULT_IMP_BATCH_SIZE
+
+
+def _build_imp_batch_query(count: int) -> str:
+    """
+    Build an aliased GraphQL query probing `count` matches at once:
+      m0: match(id: $m0) { players { steamAccountId imp } }
+      m1: ...
+    """
+    params = ", ".join(f"$m{i}: Long!" for i in range(count))
+    fields = "\n".join(
+        f"      m{i}: match(id: $m{i}) {{ players {{ steamAccountId imp }} }}"
+        for i in range(count)
+    )
+    return f"query ({params}) {{\n{fields}\n    }}"
+
+
+def _imp_by_player(match: dict) -> dict:
+    return {
+        p.get("steamAccountId"): p.get("imp")
+        for p in (match.get("players") or [])
+        if isinstance(p, dict) and p.get("steamAccountId") is not None
+    }
+
+
+def fetch_imp_readiness(match_ids: list[int], chunk_size: int | None = None) -> dict:
     """
-    query = """
+    Probe IMP for many matches with one lightweight aliased query per chunk.
+    Returns {match_id: {steam_id: imp_or_None}}; a match Stratz returned nothing for maps to {},
+    and matches in a chunk whose query failed are absent (not probed this run).
+    Matches already in the local match store are answered from it without a query.
+    On quota exhaustion: returns {"error": "quota_exceeded"}.
+    """
+    readiness: dict = {}
+    to_probe = []
+    for mid in dict.fromkeys(int(m) for m in match_ids):
+        stored = load_match(mid)
+        if stored is not None:
+            readiness[mid] = _imp_by_player(stored)
+        else:
+            to_probe.append(mid)
+
+    size = chunk_size or _imp_batch_size()
+    for start in range(0, len(to_probe), size):
+        chunk = to_probe[start:start + size]
+        variables = {f"m{i}": mid for i, mid in enumerate(chunk)}
+        data = post_stratz_query(_build_imp_batch_query(len(chunk)), variables)
+        if data == "quota_exceeded":
+            return {"error": "quota_exceeded"}
+        if not isinstance(data, dict):
+            print(f"⚠️ Batched IMP probe failed for {len(chunk)} matches (offset {start})")
+            continue
+        for i, mid in enumerate(chunk):
+            match = data.get(f"m{i}")
+            readiness[mid] = _imp_by_player(match) if isinstance(match, dict) else {}
+    return readiness
+
+# --- Full match payload including extended stats and timeline ---
+FULL_MATCH_QUERY = """
     query ($matchId: Long!) {
       match(id: $matchId) {
         id
@@ -189,9 +350,23 @@ def fetch_full_match(match_id: int) -> dict | None:
       }
     }
     """
-    variables = {"matchId": match_id}
-    data = post_stratz_query(query, variables, timeout=15)
 
+
+def fetch_full_match(match_id: int) -> dict | None:
+    """
+    Full match data query with extended player + stat info (v4-ready).
+    Final payloads (IMP populated for every player) are served from / written to the
+    local match store, so re-fetching a parsed match costs no Stratz quota.
+    """
+    stored = load_match(match_id)
+    if stored is not None:
+        return stored
+
+    data = post_stratz_query(FULL_MATCH_QUERY, {"matchId": match_id}, timeout=15)
+    return _finish_full_match(match_id, data)
+
+
+def _finish_full_match(match_id: int, data) -> dict | None:
     if data == "quota_exceeded":
         return {"error": "quota_exceeded"}
 
@@ -203,4 +378,6 @@ def fetch_full_match(match_id: int) -> dict | None:
         print("🔎 Full match response:")
         print(json.dumps(data, indent=2))
 
-    return data.get("match")
+    match = data.get("match")
+    save_match(match_id, match)
+    return match
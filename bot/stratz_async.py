@@ -0,0 +1,140 @@
+# bot/stratz_async.py
+
+import asyncio
+import weakref
+
+try:
+    import httpx  # optional dependency: only needed for the async client
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from bot.match_store import load_match
+from bot.throttle import athrottle
+from bot.stratz import (
+    STRATZ_URL,
+    LATEST_MATCH_QUERY,
+    FULL_MATCH_QUERY,
+    _stratz_headers,
+    _handle_response,
+    _parse_latest_match,
+    _build_latest_batch_query,
+    _latest_chunks,
+    _merge_latest_batch,
+    _finish_full_match,
+)
+
+
+class AsyncStratzClient:
+    """
+    asyncio Stratz client sharing one pooled keep-alive connection set.
+    Every method keeps the sync contract from bot.stratz: dict | "quota_exceeded" | None
+    for queries, {"error": "quota_exceeded"} from the fetch helpers.
+    Use as `async with AsyncStratzClient() as client: ...` or call aclose() when done.
+    """
+
+    def __init__(self, max_connections: int = 10, transport=None):
+        if httpx is None:
+            raise RuntimeError("httpx is not installed — the async Stratz client is unavailable.")
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def post_query(self, query: str, variables: dict, timeout: int = 10) -> dict | str | None:
+        """Async twin of bot.stratz.post_stratz_query."""
+        headers = _stratz_headers()
+        if not headers:
+            return None
+
+        await athrottle()  # ✅ Same shared per second/minute/hour budget as the sync client
+
+        try:
+            response = await self._client.post(
+                STRATZ_URL,
+                headers=headers,
+                json={"query": query, "variables": variables},
+                timeout=timeout,
+            )
+            return _handle_response(response.status_code, response.headers, response.text, response.json)
+        except Exception as e:
+            print(f"❌ Stratz query failed: {e}")
+            if "quota" in str(e).lower():
+                return "quota_exceeded"
+            return None
+
+    async def fetch_latest_match(self, steam_id: int) -> dict | None:
+        data = await self.post_query(LATEST_MATCH_QUERY, {"steamId": steam_id})
+        return _parse_latest_match(data)
+
+    async def fetch_latest_matches(
+        self, steam_ids: list[int], chunk_size: int | None = None, failed: list | None = None
+    ) -> dict:
+        """
+        Batched latest-match poll; chunks are issued concurrently. Same contract as the sync
+        fetch_latest_matches, including `failed` collecting the IDs of chunks that failed.
+        """
+        chunks = list(_latest_chunks(steam_ids, chunk_size))
+        results = await asyncio.gather(*(
+            self.post_query(_build_latest_batch_query(len(chunk)), {f"p{i}": sid for i, sid in enumerate(chunk)})
+            for _, chunk in chunks
+        ))
+        latest: dict = {}
+        for (start, chunk), data in zip(chunks, results):
+            if data == "quota_exceeded":
+                return {"error": "quota_exceeded"}
+            if not _merge_latest_batch(latest, data, chunk, start) and failed is not None:
+                failed.extend(chunk)
+        return latest
+
+    async def fetch_full_match(self, match_id: int) -> dict | None:
+        # The match store is blocking SQLite: keep it off the event loop
+        stored = await asyncio.to_thread(load_match, match_id)
+        if stored is not None:
+            return stored
+        data = await self.post_query(FULL_MATCH_QUERY, {"matchId": match_id}, timeout=15)
+        return await asyncio.to_thread(_finish_full_match, match_id, data)
+
+
+# --- Module-level twins of the bot.stratz fetch helpers ---------------------------
+# One shared client per running event loop, so callers get connection reuse for free.
+# Keyed weakly on the loop object itself: a loop that is gone drops its entry, and a new
+# loop can never pick up a client bound to a dead one (as an id() key could on reuse).
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncStratzClient]" = weakref.WeakKeyDictionary()
+
+
+def _default_client() -> AsyncStratzClient:
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None:
+        client = _CLIENTS[loop] = AsyncStratzClient()
+    return client
+
+
+async def aclose_default_client() -> None:
+    """Close the shared client of the running loop (call before the loop shuts down)."""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def fetch_latest_match_async(steam_id: int, client: AsyncStratzClient | None = None) -> dict | None:
+    return await (client or _default_client()).fetch_latest_match(steam_id)
+
+
+async def fetch_latest_matches_async(steam_ids: list[int], chunk_size: int | None = None,
+                                     client: AsyncStratzClient | None = None,
+                                     failed: list | None = None) -> dict:
+    return await (client or _default_client()).fetch_latest_matches(steam_ids, chunk_size, failed)
+
+
+async def fetch_full_match_async(match_id: int, client: AsyncStratzClient | None = None) -> dict | None:
+    return await (client or _default_client()).fetch_full_match(match_id)
@@ -1,10 +1,17 @@
+import asyncio
+import mmap
+import os
+import struct
 import time
 import threading
-from collections import deque
+from contextlib import contextmanager
 
-# Rolling tracker of timestamps for API calls (monotonic seconds)
-api_calls = deque()
-_lock = threading.Lock()
+try:
+    import fcntl  # POSIX only; without it the state file is shared without cross-process locking
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+from bot.config import RUNTIME_DIR
 
 # Stratz Free Tier Limits
 MAX_CALLS_PER_SECOND = 20
@@ -14,8 +21,6 @@ MAX_CALLS_PER_HOUR = 2000
 
 # Discord webhook limits (per webhook, not per bot user)
 # Ref: ~30 requests/minute hard limit per webhook, but we stay well under
-discord_posts = deque()
-_webhook_lock = threading.Lock()
 MAX_DISCORD_POSTS_PER_MINUTE = 25  # keep a safe buffer below 30/minute
 MAX_DISCORD_POSTS_PER_SECOND = 1   # small-burst gate to avoid bucket trips
 
@@ -25,59 +30,263 @@ def _now() -> float:
     return time.monotonic()
 
 
+class SlidingWindowLimiter:
+    """
+    Multi-window sliding-log rate limiter with O(1) acquisition.
+
+    Keeps a ring buffer of the last N acquisition timestamps, where N is the largest cap.
+    For a window (span, cap), the only timestamp that matters is the one `cap` slots
+    behind the head: if it is still inside the window, `cap` calls already happened
+    within `span` seconds and the caller must wait until it ages out. Every check is
+    therefore a fixed number of index lookups, regardless of how full the windows are.
+    """
+
+    def __init__(self, windows, clock=_now, sleep_pad: float = 0.005, max_sleep: float = 5.0):
+        self.windows = tuple((float(span), int(cap)) for span, cap in windows)
+        self._clock = clock
+        self._sleep_pad = sleep_pad
+        self._max_sleep = max_sleep
+        self._size = max(cap for _, cap in self.windows)
+        self._lock = threading.Lock()
+        self._init_storage()
+
+    def _init_storage(self) -> None:
+        self._ring = [float("-inf")] * self._size
+        self._head = 0  # next slot to write (oldest recorded timestamp)
+
+    @contextmanager
+    def _guard(self):
+        with self._lock:
+            yield
+
+    def _wait_time(self, now: float) -> float:
+        wait = 0.0
+        for span, cap in self.windows:
+            oldest_in_cap = self._ring[(self._head - cap) % self._size]
+            # Never wait longer than the window itself (guards against wall-clock jumps)
+            wait = max(wait, min(span, (oldest_in_cap + span) - now))
+        return wait
+
+    def _record(self, now: float) -> None:
+        self._ring[self._head] = now
+        self._head = (self._head + 1) % self._size
+
+    def try_acquire(self) -> float:
+        """
+        Non-blocking acquire. Returns 0.0 if a slot was taken, otherwise the number of
+        seconds until one may become available (nothing is recorded in that case).
+        """
+        with self._guard():
+            now = self._clock()
+            wait = self._wait_time(now)
+            if wait <= 0:
+                self._record(now)
+                return 0.0
+            return wait
+
+    def acquire(self) -> None:
+        """Block until a slot is available, then take it."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(min(wait + self._sleep_pad, self._max_sleep))
+
+
+class PersistentWindowLimiter(SlidingWindowLimiter):
+    """
+    SlidingWindowLimiter whose ring lives in a memory-mapped file, so the budget survives
+    process restarts and is shared by every process using the same file.
+
+    File layout: 4-byte magic, uint32 ring size, int64 head index, then `size` float64
+    wall-clock timestamps. Each acquisition holds an exclusive flock on the file.
+
+    A file with a different ring size (caps changed) or a corrupt one is never resized in
+    place, since other processes may still have it mapped and would fault on a shrink:
+    a fresh file is written beside it and atomically swapped in under the flock.
+    """
+
+    _MAGIC = b"GBRL"
+    _HEADER = struct.Struct("<4sIq")
+
+    def __init__(self, windows, path: str, clock=time.time, **kwargs):
+        self.path = path
+        super().__init__(windows, clock=clock, **kwargs)
+
+    def _init_storage(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        length = self._HEADER.size + 8 * self._size
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._flock(True)
+        try:
+            existing = os.fstat(self._fd).st_size
+            if existing == 0:
+                # Brand-new file: nobody can have it mapped yet, so grow it in place
+                os.ftruncate(self._fd, length)
+                os.pwrite(self._fd, self._blank(), 0)
+            elif existing != length or self._read_existing() is None:
+                self._swap_in_fresh_file(length)
+            self._map = mmap.mmap(self._fd, length)
+            self._head_view = memoryview(self._map)[8:16].cast("q")
+            self._ring = memoryview(self._map)[self._HEADER.size:].cast("d")
+        finally:
+            self._flock(False)
+
+    def close(self) -> None:
+        """Unmap and close the state file (the limiter is unusable afterwards)."""
+        self._ring.release()
+        self._head_view.release()
+        self._map.close()
+        os.close(self._fd)
+
+    def _blank(self, stamps=()) -> bytes:
+        """File contents for an empty ring, seeded with the newest `stamps` (oldest first)."""
+        ring = [float("-inf")] * self._size
+        kept = list(stamps)[-self._size:]
+        ring[:len(kept)] = kept
+        head = len(kept) % self._size
+        return self._HEADER.pack(self._MAGIC, self._size, head) + struct.pack(f"<{self._size}d", *ring)
+
+    def _swap_in_fresh_file(self, length: int) -> None:
+        """
+        Replace a mismatched/corrupt state file atomically (caller holds the old file's flock),
+        carrying over its newest timestamps, then re-open and lock the new one.
+        """
+        stamps = self._read_existing() or []
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self._blank(stamps))
+        os.replace(tmp, self.path)
+        old_fd = self._fd
+        self._fd = os.open(self.path, os.O_RDWR)
+        self._flock(True)
+        os.close(old_fd)  # releases the old file's lock
+        if os.fstat(self._fd).st_size != length:
+            raise OSError(f"rate-limit state file {self.path} changed while being replaced")
+
+    def _read_existing(self) -> list[float] | None:
+        """Timestamps (oldest first) from a valid state file, or None if it is unreadable."""
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        if len(raw) < self._HEADER.size:
+            return None
+        magic, size, head = self._HEADER.unpack_from(raw)
+        if magic != self._MAGIC or len(raw) != self._HEADER.size + 8 * size or not 0 <= head < max(size, 1):
+            return None
+        ring = struct.unpack_from(f"<{size}d", raw, self._HEADER.size)
+        return [t for t in ring[head:] + ring[:head] if t != float("-inf")]
+
+    def _flock(self, lock: bool) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if lock else fcntl.LOCK_UN)
+
+    @property
+    def _head(self) -> int:
+        return self._head_view[0]
+
+    @_head.setter
+    def _head(self, value: int) -> None:
+        self._head_view[0] = value
+
+    @contextmanager
+    def _guard(self):
+        with self._lock:
+            self._flock(True)
+            try:
+                yield
+            finally:
+                self._flock(False)
+
+
+def _state_dir() -> str:
+    """Directory for persisted limiter state (env THROTTLE_STATE_DIR, defaults to the runtime dir)."""
+    return os.getenv("THROTTLE_STATE_DIR") or RUNTIME_DIR
+
+
+def _make_limiter(name: str, windows, sleep_pad: float) -> SlidingWindowLimiter:
+    """
+    Build a limiter persisted under _state_dir() so back-to-back runs (cron, /run) share one
+    budget. Falls back to an in-memory limiter if the state file cannot be used.
+    """
+    path = os.path.join(_state_dir(), f"throttle_{name}.bin")
+    try:
+        return PersistentWindowLimiter(windows, path, sleep_pad=sleep_pad)
+    except Exception as e:
+        print(f"⚠️ Could not persist {name} rate-limit state at {path} ({type(e).__name__}: {e}) — using in-memory limiter.")
+        return SlidingWindowLimiter(windows, sleep_pad=sleep_pad)
+
+
+_LIMITER_SPECS = {
+    "stratz": (
+        [
+            (1.0, MAX_CALLS_PER_SECOND),
+            (60.0, MAX_CALLS_PER_MINUTE),
+            (3600.0, MAX_CALLS_PER_HOUR),
+        ],
+        0.005,
+    ),
+    "webhook": (
+        [
+            (1.0, MAX_DISCORD_POSTS_PER_SECOND),
+            (60.0, MAX_DISCORD_POSTS_PER_MINUTE),
+        ],
+        0.02,
+    ),
+}
+
+# Built on first use rather than at import, so importing this module never opens (or
+# spends) the persisted budget and THROTTLE_STATE_DIR can still be set beforehand.
+_limiters: dict[str, SlidingWindowLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter(name: str) -> SlidingWindowLimiter:
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                windows, sleep_pad = _LIMITER_SPECS[name]
+                limiter = _limiters[name] = _make_limiter(name, windows, sleep_pad=sleep_pad)
+    return limiter
+
+
+def reset_limiters() -> None:
+    """Drop the process's limiters; the next call re-opens them under the current _state_dir()."""
+    with _limiters_lock:
+        for limiter in _limiters.values():
+            if isinstance(limiter, PersistentWindowLimiter):
+                limiter.close()
+        _limiters.clear()
+
+
 def throttle():
     """
-    Global, process-wide rate limiter for Stratz API calls.
+    Global rate limiter for Stratz API calls, persisted under THROTTLE_STATE_DIR so the
+    caps hold across restarts and concurrent processes.
     Blocks until issuing another Stratz API call would respect all caps:
       - 20 per 1 second (sliding window)
       - 250 per 60 seconds (sliding window)
       - 2000 per 3600 seconds (sliding window)
     """
+    _limiter("stratz").acquire()
+
+
+async def athrottle():
+    """
+    Async twin of throttle(): same shared budget, but waits with asyncio.sleep so
+    other coroutines keep running while this one is paced.
+    """
     while True:
-        # Compute inside a lock to keep the deque consistent under concurrency
-        with _lock:
-            now = _now()
-
-            # Trim anything older than 1 hour (we only enforce up to hourly)
-            cutoff_hour = now - 3600.0
-            while api_calls and api_calls[0] < cutoff_hour:
-                api_calls.popleft()
-
-            sleep_for = 0.0
-
-            # --- Per-second window (20/sec)
-            threshold_1s = now - 1.0
-            count_1s = 0
-            earliest_1s = None
-            for t in api_calls:
-                if t >= threshold_1s:
-                    earliest_1s = t if earliest_1s is None else earliest_1s
-                    count_1s += 1
-            if count_1s >= MAX_CALLS_PER_SECOND and earliest_1s is not None:
-                sleep_for = max(sleep_for, (earliest_1s + 1.0) - now)
-
-            # --- Per-minute window (250/min)
-            threshold_60s = now - 60.0
-            count_60s = 0
-            earliest_60s = None
-            for t in api_calls:
-                if t >= threshold_60s:
-                    earliest_60s = t if earliest_60s is None else earliest_60s
-                    count_60s += 1
-            if count_60s >= MAX_CALLS_PER_MINUTE and earliest_60s is not None:
-                sleep_for = max(sleep_for, (earliest_60s + 60.0) - now)
-
-            # --- Per-hour window (2000/hr)
-            count_3600 = len(api_calls)  # already trimmed to last hour
-            if count_3600 >= MAX_CALLS_PER_HOUR and api_calls:
-                earliest_3600 = api_calls[0]
-                sleep_for = max(sleep_for, (earliest_3600 + 3600.0) - now)
-
-            if sleep_for <= 0:
-                api_calls.append(now)
-                return
+        wait = _limiter("stratz").try_acquire()
+        if wait <= 0:
+            return
+        await asyncio.sleep(min(wait + 0.005, 5.0))
+
 
-        time.sleep(min(sleep_for + 0.005, 5.0))
+def try_throttle() -> float:
+    """Non-blocking variant of throttle(): 0.0 if a Stratz slot was taken, else seconds to wait."""
+    return _limiter("stratz").try_acquire()
 
 
 def throttle_webhook(webhook_url: str | None = None):
@@ -91,36 +300,4 @@ def throttle_webhook(webhook_url: str | None = None):
     Discord enforces a hard cap of ~30 requests/minute per webhook, and small burst buckets.
     We gate both per-minute and per-second to avoid tripping long cooldowns.
     """
-    while True:
-        with _webhook_lock:
-            now = _now()
-
-            # Trim anything older than 60 seconds
-            cutoff_minute = now - 60.0
-            while discord_posts and discord_posts[0] < cutoff_minute:
-                discord_posts.popleft()
-
-            sleep_for = 0.0
-
-            # --- Per-second window (small burst bucket)
-            threshold_1s = now - 1.0
-            count_1s = 0
-            earliest_1s = None
-            for t in discord_posts:
-                if t >= threshold_1s:
-                    earliest_1s = t if earliest_1s is None else earliest_1s
-                    count_1s += 1
-            if count_1s >= MAX_DISCORD_POSTS_PER_SECOND and earliest_1s is not None:
-                sleep_for = max(sleep_for, (earliest_1s + 1.0) - now)
-
-            # --- Per-minute window
-            count_60s = len(discord_posts)
-            if count_60s >= MAX_DISCORD_POSTS_PER_MINUTE and discord_posts:
-                earliest_60s = discord_posts[0]
-                sleep_for = max(sleep_for, (earliest_60s + 60.0) - now)
-
-            if sleep_for <= 0:
-                discord_posts.append(now)
-                return
-
-        time.sleep(min(sleep_for + 0.02, 5.0))
+    _limiter("webhook").acquire()
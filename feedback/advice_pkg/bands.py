@@ -1,6 +1,7 @@
 # feedback/advice_pkg/bands.py
-from typing import Any, Optional
-from feedback.catalog import PHRASE_BOOK  # uses existing catalog.py module
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Optional, Tuple
+from feedback.catalog import PHRASE_BOOK, BAND_TABLE  # uses existing catalog.py module
 
 def safe_num(x: Any, default: float | None = None) -> Optional[float]:
     try:
@@ -31,123 +32,53 @@ def value_from_context(stat: str, ctx: dict) -> Optional[float]:
         return safe_num(ctx.get("killParticipation"))
     return safe_num(ctx.get(stat))
 
-def band_for_stat(stat: str, value: Optional[float], polarity: str) -> str:
+def _compile_band_rule(rule: dict) -> Tuple[str, Tuple[float, ...], Tuple[str, ...]]:
     """
-    Map a numeric value to a band for the given stat and polarity.
-    Thresholds are copied 1:1 from legacy advice.py.
+    Turn one declarative rule into (direction, ascending thresholds, labels) for bisect.
+      ge: labels[bisect_right(thresholds, v)] — count of thresholds <= v picks the band
+      le: labels[bisect_left(thresholds, v)]  — count of thresholds <  v picks the band
     """
-    if value is None:
-        return "moderate"
+    direction = rule["direction"]
+    pairs = [(float(t), str(band)) for t, band in rule["bands"]]
+    fallback = str(rule["else"])
+    if direction == "ge":
+        pairs.sort(key=lambda p: p[0])
+        return "ge", tuple(t for t, _ in pairs), (fallback,) + tuple(b for _, b in pairs)
+    if direction == "le":
+        pairs.sort(key=lambda p: p[0])
+        return "le", tuple(t for t, _ in pairs), tuple(b for _, b in pairs) + (fallback,)
+    raise ValueError(f"unknown band direction {direction!r}")
 
-    # IMP (for stat phrasing only; title bands handled elsewhere)
-    if stat == "imp":
-        if polarity == "positive":
-            if value >= 15: return "extreme"
-            if value >= 8:  return "high"
-            if value >= 3:  return "moderate"
-            return "light"
-        else:
-            if value <= -15: return "critical"
-            if value <= -8:  return "severe"
-            if value <= -3:  return "moderate"
-            return "light"
 
-    if stat == "kills":
-        if polarity == "positive":
-            if value >= 18: return "extreme"
-            if value >= 12: return "high"
-            if value >= 6:  return "moderate"
-            return "light"
-        else:
-            if value <= 0:  return "critical"
-            if value <= 2:  return "severe"
-            if value <= 4:  return "moderate"
-            return "light"
+def _compile_band_table(table: dict) -> Dict[Tuple[str, str], Tuple[str, Tuple[float, ...], Tuple[str, ...]]]:
+    return {
+        (stat, polarity): _compile_band_rule(rule)
+        for stat, rules in table.items()
+        for polarity, rule in rules.items()
+    }
 
-    if stat == "deaths":
-        if polarity == "positive":
-            if value <= 0:  return "extreme"
-            if value <= 2:  return "high"
-            if value <= 5:  return "moderate"
-            return "light"
-        else:
-            if value >= 12: return "critical"
-            if value >= 9:  return "severe"
-            if value >= 6:  return "moderate"
-            return "light"
 
-    if stat == "assists":
-        if polarity == "positive":
-            if value >= 24: return "extreme"
-            if value >= 16: return "high"
-            if value >= 10: return "moderate"
-            return "light"
-        else:
-            if value <= 1:  return "critical"
-            if value <= 3:  return "severe"
-            if value <= 6:  return "moderate"
-            return "light"
-
-    if stat == "level":
-        if polarity == "positive":
-            if value >= 26: return "extreme"
-            if value >= 23: return "high"
-            if value >= 18: return "moderate"
-            return "light"
-        else:
-            if value <= 12: return "critical"
-            if value <= 16: return "severe"
-            if value <= 18: return "moderate"
-            return "light"
-
-    if stat == "killParticipation":
-        if polarity == "positive":
-            if value >= 0.80: return "extreme"
-            if value >= 0.65: return "high"
-            if value >= 0.50: return "moderate"
-            return "light"
-        else:
-            if value <= 0.20: return "critical"
-            if value <= 0.30: return "severe"
-            if value <= 0.45: return "moderate"
-            return "light"
+# Compiled once at import: (stat, polarity) → (direction, thresholds, labels)
+_BANDS = _compile_band_table(BAND_TABLE)
 
-    # Economy metrics (NON_TURBO only; gating handled by stat_allowed)
-    if stat == "gpm":
-        if polarity == "positive":
-            if value >= 650: return "extreme"
-            if value >= 550: return "high"
-            if value >= 450: return "moderate"
-            return "light"
-        else:
-            if value <= 250: return "critical"
-            if value <= 320: return "severe"
-            if value <= 400: return "moderate"
-            return "light"
 
-    if stat == "xpm":
-        if polarity == "positive":
-            if value >= 700: return "extreme"
-            if value >= 600: return "high"
-            if value >= 500: return "moderate"
-            return "light"
-        else:
-            if value <= 300: return "critical"
-            if value <= 380: return "severe"
-            if value <= 460: return "moderate"
-            return "light"
+def band_for_stat(stat: str, value: Optional[float], polarity: str) -> str:
+    """
+    Map a numeric value to a band for the given stat and polarity.
+    Thresholds come from feedback.catalog.BAND_TABLE (copied 1:1 from legacy advice.py).
+    Any polarity other than "positive" uses the stat's "negative" bands.
+    """
+    if value is None:
+        return "moderate"
 
-    # Vision/utility
-    if stat == "campStack":
-        if polarity == "positive":
-            if value >= 10: return "extreme"
-            if value >= 7:  return "high"
-            if value >= 4:  return "moderate"
-            return "light"
-        else:
-            if value <= 0:  return "critical"
-            if value <= 1:  return "severe"
-            if value <= 3:  return "moderate"
-            return "light"
+    compiled = _BANDS.get((stat, "positive" if polarity == "positive" else "negative"))
+    if compiled is None:
+        return "moderate"
 
-    return "moderate"
+    direction, thresholds, labels = compiled
+    if value != value:
+        # NaN never satisfies a threshold → the rule's "else" band
+        return labels[0] if direction == "ge" else labels[-1]
+    if direction == "ge":
+        return labels[bisect_right(thresholds, value)]
+    return labels[bisect_left(thresholds, value)]
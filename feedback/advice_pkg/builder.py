@@ -1,5 +1,6 @@
 # feedback/advice_pkg/builder.py
 from typing import Dict, List, Optional
+from random import Random
 from .bands import stat_allowed
 from .selectors import choose_banded_line, choose_banded_tip
 from .flags import select_flag_phrase
@@ -8,11 +9,14 @@ def generate_advice(
     tags: Dict,
     context: Dict[str, float],
     ignore_stats: Optional[List[str]] = None,
-    mode: str = "NON_TURBO"
+    mode: str = "NON_TURBO",
+    rng: Optional[Random] = None,
 ) -> Dict[str, List[str]]:
     """
     Orchestrates selection of positives, negatives, flags, and tips.
     Move-only refactor from legacy advice.py with identical behavior.
+    Pass a per-call `rng` (seeded per match:player) to keep selection deterministic when
+    several players are analyzed concurrently; without one, the global RNG is used.
     """
     if ignore_stats is None:
         ignore_stats = []
@@ -36,7 +40,7 @@ def generate_advice(
             continue
         if not stat_allowed(stat, mode) or stat in ignore_stats:
             continue
-        line = choose_banded_line(stat, "positive", context)
+        line = choose_banded_line(stat, "positive", context, rng)
         if line:
             positives.append(line)
             used.add(stat)
@@ -49,14 +53,14 @@ def generate_advice(
             continue
         if not stat_allowed(stat, mode) or stat in ignore_stats or stat in used:
             continue
-        line = choose_banded_line(stat, "negative", context)
+        line = choose_banded_line(stat, "negative", context, rng)
         if line:
             negatives.append(line)
             used.add(stat)
             break
 
     # --- Flag (first match wins) ---
-    flag_line = select_flag_phrase(compound_flags, mode)
+    flag_line = select_flag_phrase(compound_flags, mode, rng)
     if flag_line:
         flags.append(flag_line)
 
@@ -66,7 +70,7 @@ def generate_advice(
             continue
         if stat in ignore_stats:
             continue
-        tip_line = choose_banded_tip(stat, context, mode)
+        tip_line = choose_banded_tip(stat, context, mode, rng)
         if tip_line:
             tips.append(tip_line)
             break
@@ -1,23 +1,21 @@
 # feedback/advice_pkg/flags.py
 import random
 from typing import List, Optional
-from feedback.catalog import COMPOUND_FLAGS
+from random import Random
+from feedback.catalog import FLAG_INDEX, INDEXED_MODES, OTHER_MODE
 
-def select_flag_phrase(flags: List[str], mode: str) -> Optional[str]:
+def select_flag_phrase(flags: List[str], mode: str, rng: Optional[Random] = None) -> Optional[str]:
     """
-    First matching flag wins. Honors catalog 'modes' gating.
-    Determinism is preserved via global RNG seeded upstream (formatter.py).
+    First matching flag wins. Honors catalog 'modes' gating (resolved in the catalog index).
+    Determinism comes from `rng`, seeded per match:player upstream (formatter.py);
+    without one, the global RNG is used.
     """
+    rng = rng or random
+    mode_key = mode if mode in INDEXED_MODES else OTHER_MODE
     for flag in flags:
         if not isinstance(flag, str):
             continue
-        entry = COMPOUND_FLAGS.get(flag)
-        if not isinstance(entry, dict):
-            continue
-        allowed = entry.get("modes", ["ALL"])
-        if "ALL" not in allowed and mode not in allowed:
-            continue
-        lines = entry.get("lines", [])
+        lines = FLAG_INDEX.get((flag, mode_key))
         if lines:
-            return random.choice(lines)
+            return rng.choice(lines)
     return None
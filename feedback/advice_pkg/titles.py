@@ -1,6 +1,7 @@
 # feedback/advice_pkg/titles.py
 import random
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+from random import Random
 from feedback.catalog import TITLE_BOOK
 
 def _pick_title_bank(result_side: str, tier: str) -> List[str]:
@@ -18,12 +19,14 @@ def _pick_title_bank(result_side: str, tier: str) -> List[str]:
         return side_book.get("negative", []) or []
     return lines or []
 
-def get_title_phrase(score: float, won: bool, compound_flags: list[str]) -> Tuple[str, str]:
+def get_title_phrase(score: float, won: bool, compound_flags: list[str], rng: Optional[Random] = None) -> Tuple[str, str]:
     """
     Return (emoji, phrase) for the title line based on performance score,
     win/loss, and important flags. Preserves legacy tiering and emojis,
     with a bugfix: loss-only snark cannot appear on wins.
+    Phrases are drawn from `rng` (the global RNG when omitted).
     """
+    rng = rng or random
     try:
         score_val = float(score)
     except (ValueError, TypeError):
@@ -46,7 +49,7 @@ def get_title_phrase(score: float, won: bool, compound_flags: list[str]) -> Tupl
         tier = "very_low"
         bank = _pick_title_bank("win" if won else "loss", tier)
         emoji = "🎲" if won else "💀"
-        phrase = random.choice(bank) if bank else "played a game"
+        phrase = rng.choice(bank) if bank else "played a game"
         return emoji, phrase
 
     # Positive bands
@@ -72,5 +75,5 @@ def get_title_phrase(score: float, won: bool, compound_flags: list[str]) -> Tupl
 
     bank = _pick_title_bank("win" if won else "loss", tier)
     emoji = win_emoji if won else loss_emoji
-    phrase = random.choice(bank) if bank else "played a game"
+    phrase = rng.choice(bank) if bank else "played a game"
     return emoji, phrase
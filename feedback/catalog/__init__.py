@@ -5,10 +5,17 @@ Aggregator for the phrase catalog. Keeps the public API identical:
   - COMPOUND_FLAGS
   - TIP_LINES
   - TITLE_BOOK
+  - BAND_TABLE (declarative stat band thresholds)
+  - CATALOG_VERSION (content digest of the above, computed at import)
+  - ENGINE_VERSION (hand-bumped version of the analysis code)
+  - PHRASE_INDEX / TIP_INDEX / FLAG_INDEX / INDEXED_MODES (read-only selection index, see index.py)
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+
 # Import fragments
 from .stats_core import PHRASE_BOOK as _PHRASES_CORE
 from .stats_economy import PHRASE_BOOK as _PHRASES_ECON
@@ -17,6 +24,8 @@ from .stats_vision import PHRASE_BOOK as _PHRASES_VISION
 from .flags import COMPOUND_FLAGS as _FLAGS
 from .tips import TIP_LINES as _TIPS
 from .titles import TITLE_BOOK as _TITLES
+from .bands import BAND_TABLE as _BANDS
+from .index import build_catalog_index, OTHER_MODE
 
 
 def _merge_dicts(*parts: dict) -> dict:
@@ -32,5 +41,23 @@ PHRASE_BOOK = _merge_dicts(_PHRASES_CORE, _PHRASES_ECON, _PHRASES_VISION)
 COMPOUND_FLAGS = dict(_FLAGS)
 TIP_LINES = dict(_TIPS)
 TITLE_BOOK = dict(_TITLES)
-
-__all__ = ["PHRASE_BOOK", "COMPOUND_FLAGS", "TIP_LINES", "TITLE_BOOK"]
+BAND_TABLE = dict(_BANDS)
+
+# Changes whenever any phrase, tip, flag, title or band threshold changes (used to key cached analyses)
+CATALOG_VERSION = hashlib.sha256(
+    json.dumps([PHRASE_BOOK, COMPOUND_FLAGS, TIP_LINES, TITLE_BOOK, BAND_TABLE], sort_keys=True, ensure_ascii=False).encode("utf-8")
+).hexdigest()[:12]
+
+# Bump whenever a change to the analysis code (engine, stats extraction, advice, title or
+# formatter logic) changes what a cached analysis would contain; catalog data is covered above
+ENGINE_VERSION = "1"
+
+# Built once from the merged books; selectors do one lookup per call
+PHRASE_INDEX, TIP_INDEX, FLAG_INDEX, INDEXED_MODES = build_catalog_index(
+    PHRASE_BOOK, TIP_LINES, COMPOUND_FLAGS, BAND_TABLE
+)
+
+__all__ = [
+    "PHRASE_BOOK", "COMPOUND_FLAGS", "TIP_LINES", "TITLE_BOOK", "BAND_TABLE", "CATALOG_VERSION", "ENGINE_VERSION",
+    "PHRASE_INDEX", "TIP_INDEX", "FLAG_INDEX", "INDEXED_MODES", "OTHER_MODE",
+]
@@ -0,0 +1,50 @@
+# feedback/catalog/bands.py
+# Declarative band thresholds for stat phrasing (copied 1:1 from the legacy if-ladders).
+#
+# Per stat and polarity:
+#   "direction": "ge" → first band whose threshold is <= value (thresholds descending)
+#                "le" → first band whose threshold is >= value (thresholds ascending)
+#   "bands":     [[threshold, band], ...] checked in order
+#   "else":      band when no threshold matches (also for NaN)
+# Stats without an entry map to "moderate". New stats only need a row here.
+BAND_TABLE = {
+    # IMP (for stat phrasing only; title bands handled elsewhere)
+    "imp": {
+        "positive": {"direction": "ge", "bands": [[15, "extreme"], [8, "high"], [3, "moderate"]], "else": "light"},
+        "negative": {"direction": "le", "bands": [[-15, "critical"], [-8, "severe"], [-3, "moderate"]], "else": "light"},
+    },
+    "kills": {
+        "positive": {"direction": "ge", "bands": [[18, "extreme"], [12, "high"], [6, "moderate"]], "else": "light"},
+        "negative": {"direction": "le", "bands": [[0, "critical"], [2, "severe"], [4, "moderate"]], "else": "light"},
+    },
+    "deaths": {
+        "positive": {"direction": "le", "bands": [[0, "extreme"], [2, "high"], [5, "moderate"]], "else": "light"},
+        "negative": {"direction": "ge", "bands": [[12, "critical"], [9, "severe"], [6, "moderate"]], "else": "light"},
+    },
+    "assists": {
+        "positive": {"direction": "ge", "bands": [[24, "extreme"], [16, "high"], [10, "moderate"]], "else": "light"},
+        "negative": {"direction": "le", "bands": [[1, "critical"], [3, "severe"], [6, "moderate"]], "else": "light"},
+    },
+    "level": {
+        "positive": {"direction": "ge", "bands": [[26, "extreme"], [23, "high"], [18, "moderate"]], "else": "light"},
+        "negative": {"direction": "le", "bands": [[12, "critical"], [16, "severe"], [18, "moderate"]], "else": "light"},
+    },
+    "killParticipation": {
+        "positive": {"direction": "ge", "bands": [[0.80, "extreme"], [0.65, "high"], [0.50, "moderate"]], "else": "light"},
+        "negative": {"direction": "le", "bands": [[0.20, "critical"], [0.30, "severe"], [0.45, "moderate"]], "else": "light"},
+    },
+    # Economy metrics (NON_TURBO only; gating handled by stat_allowed)
+    "gpm": {
+        "positive": {"direction": "ge", "bands": [[650, "extreme"], [550, "high"], [450, "moderate"]], "else": "light"},
+        "negative": {"direction": "le", "bands": [[250, "critical"], [320, "severe"], [400, "moderate"]], "else": "light"},
+    },
+    "xpm": {
+        "positive": {"direction": "ge", "bands": [[700, "extreme"], [600, "high"], [500, "moderate"]], "else": "light"},
+        "negative": {"direction": "le", "bands": [[300, "critical"], [380, "severe"], [460, "moderate"]], "else": "light"},
+    },
+    # Vision/utility
+    "campStack": {
+        "positive": {"direction": "ge", "bands": [[10, "extreme"], [7, "high"], [4, "moderate"]], "else": "light"},
+        "negative": {"direction": "le", "bands": [[0, "critical"], [1, "severe"], [3, "moderate"]], "else": "light"},
+    },
+}
@@ -0,0 +1,130 @@
+# feedback/catalog/index.py
+"""
+Immutable lookup index over the merged catalog, built once at import.
+
+Selectors in feedback.advice_pkg resolve a line pool with a single lookup instead of
+walking PHRASE_BOOK / TIP_LINES / COMPOUND_FLAGS (isinstance checks, mode gating,
+fallback flattening) on every call:
+
+  PHRASE_INDEX[(stat, polarity, band)]  → tuple of lines (band pool, or the flattened
+                                          fallback when the band is missing/empty)
+  TIP_INDEX[(stat, mode)]               → tip text (str), or {band: tuple of lines} for
+                                          banded tips; absent when gated out for the mode
+  FLAG_INDEX[(flag, mode)]              → tuple of lines; absent when gated out or empty
+
+Modes named anywhere in the catalog (plus TURBO / NON_TURBO) are indexed directly;
+any other mode string is looked up as OTHER_MODE, which only holds "ALL"-gated entries.
+Pools keep the catalog's order and length so rng.choice draws exactly as before.
+Tips are keyed by mode first so gated-out and plain-text tips skip the band lookup.
+"""
+
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+OTHER_MODE = "*"
+
+
+def _flatten_bands(lines_def: Any) -> Tuple[str, ...]:
+    """Accept either a flat list or a dict-of-bands and return a flat tuple of lines."""
+    if isinstance(lines_def, list):
+        return tuple(s for s in lines_def if isinstance(s, str) and s.strip())
+    if isinstance(lines_def, dict):
+        out: list = []
+        for v in lines_def.values():
+            if isinstance(v, list):
+                out.extend([s for s in v if isinstance(s, str) and s.strip()])
+        return tuple(out)
+    return ()
+
+
+def _band_labels(band_table: dict) -> Tuple[str, ...]:
+    # Every band band_for_stat can return: table labels plus "moderate" (None / unknown stat)
+    labels = {"moderate"}
+    for rules in band_table.values():
+        for rule in rules.values():
+            labels.add(rule["else"])
+            labels.update(band for _, band in rule["bands"])
+    return tuple(sorted(labels))
+
+
+def _mode_keys(*books: dict) -> Tuple[str, ...]:
+    modes = {"TURBO", "NON_TURBO"}
+    for book in books:
+        for entry in book.values():
+            if isinstance(entry, dict):
+                modes.update(entry.get("modes", []))
+    modes.discard("ALL")
+    return tuple(sorted(modes)) + (OTHER_MODE,)
+
+
+def _allowed(entry: dict, mode: str) -> bool:
+    allowed = entry.get("modes", ["ALL"])
+    return "ALL" in allowed or (mode != OTHER_MODE and mode in allowed)
+
+
+def _build_phrase_index(phrase_book: dict, bands: Tuple[str, ...]) -> Dict[tuple, Tuple[str, ...]]:
+    index: Dict[tuple, Tuple[str, ...]] = {}
+    for stat, entry in phrase_book.items():
+        for polarity, lines_def in entry.items():
+            if isinstance(lines_def, list):
+                # Legacy flat list: same pool whatever the band
+                flat = _flatten_bands(lines_def)
+                for band in bands:
+                    index[(stat, polarity, band)] = flat
+            elif isinstance(lines_def, dict):
+                fallback = _flatten_bands(lines_def)
+                for band in bands:
+                    lines = lines_def.get(band) or []
+                    index[(stat, polarity, band)] = tuple(lines) if lines else fallback
+    return index
+
+
+def _build_tip_index(tip_lines: dict, bands: Tuple[str, ...], modes: Tuple[str, ...]) -> Dict[tuple, Any]:
+    index: Dict[tuple, Any] = {}
+    for stat, entry in tip_lines.items():
+        if not isinstance(entry, dict):
+            continue
+        text = entry.get("text")
+        if isinstance(text, str):
+            pools: Any = text
+        elif isinstance(text, dict):
+            pools = MappingProxyType({
+                band: tuple(text[band]) for band in bands
+                if text.get(band) and isinstance(text.get(band), list)
+            })
+        else:
+            continue
+        for mode in modes:
+            if _allowed(entry, mode):
+                index[(stat, mode)] = pools
+    return index
+
+
+def _build_flag_index(compound_flags: dict, modes: Tuple[str, ...]) -> Dict[tuple, Tuple[str, ...]]:
+    index: Dict[tuple, Tuple[str, ...]] = {}
+    for flag, entry in compound_flags.items():
+        if not isinstance(entry, dict):
+            continue
+        lines = entry.get("lines", [])
+        if not lines:
+            continue
+        for mode in modes:
+            if _allowed(entry, mode):
+                index[(flag, mode)] = tuple(lines)
+    return index
+
+
+def build_catalog_index(
+    phrase_book: dict, tip_lines: dict, compound_flags: dict, band_table: dict
+) -> Tuple[Mapping, Mapping, Mapping, frozenset]:
+    """Return read-only (PHRASE_INDEX, TIP_INDEX, FLAG_INDEX, INDEXED_MODES)."""
+    bands = _band_labels(band_table)
+    modes = _mode_keys(phrase_book, tip_lines, compound_flags)
+    return (
+        MappingProxyType(_build_phrase_index(phrase_book, bands)),
+        MappingProxyType(_build_tip_index(tip_lines, bands, modes)),
+        MappingProxyType(_build_flag_index(compound_flags, modes)),
+        frozenset(modes),
+    )
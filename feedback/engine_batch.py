@@ -0,0 +1,172 @@
+# feedback/engine_batch.py
+"""
+Columnar batch scoring for many player-matches at once (backfills, guild digests).
+
+Evaluates the same rule tables as the scalar engines (feedback/engine_pkg/rules.py) as
+NumPy masks over columns instead of one player at a time. Results are the same dicts
+analyze_player returns, in input order.
+
+Needs NumPy (listed in requirements.txt). The import is guarded so a deployment
+without it still imports this module; only calling it fails.
+"""
+
+from __future__ import annotations
+
+import operator
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # batch scoring only; the bot itself never needs NumPy
+    np = None
+
+from feedback.engine_pkg.core import SLOTS, build_record
+from feedback.engine_pkg.rules import RULES
+
+# analyze_columns keyword → stats-record slot the rule tables refer to
+COLUMN_SLOTS = {
+    "kills": "kills",
+    "deaths": "deaths",
+    "assists": "assists",
+    "imp": "imp",
+    "camp_stack": "campStack",
+    "level": "level",
+    "kill_participation": "killParticipation",
+    "duration": "durationSeconds",
+    "role_category": "roleCategory",
+    "lane": "lane",
+    "intentional_feeding": "intentionalFeeding",
+    "imp_early_avg": "impEarlyAvg",
+    "imp_late_avg": "impLateAvg",
+}
+_OBJECT_SLOTS = ("roleCategory", "lane")
+_BOOL_SLOTS = ("intentionalFeeding",)
+
+_OPS = {"ge": operator.ge, "gt": operator.gt, "le": operator.le, "lt": operator.lt, "eq": operator.eq}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("feedback.engine_batch needs NumPy (pip install numpy)")
+
+
+def _column(slot: str, values: Any) -> Any:
+    if slot in _OBJECT_SLOTS:
+        return np.asarray(values, dtype=object)
+    if slot in _BOOL_SLOTS:
+        return np.asarray(values, dtype=bool)
+    return np.asarray(values, dtype=np.float64)
+
+
+def player_columns(players: Sequence[Dict[str, Any]], team_kills: Sequence[Any]) -> Dict[str, Any]:
+    """
+    One Python pass over analyze_player-shaped stat dicts → the columns analyze_columns takes.
+    Rows are coerced by the scalar engine's own build_record, so both paths see identical values.
+    """
+    _require_numpy()
+    records = [build_record(stats, tk) for stats, tk in zip(players, team_kills)]
+    by_slot = dict(zip(SLOTS, zip(*records))) if records else {slot: () for slot in SLOTS}
+    return {col: _column(slot, by_slot[slot]) for col, slot in COLUMN_SLOTS.items()}
+
+
+def _condition_mask(cols: Dict[str, Any], cond: tuple) -> Any:
+    slot, op_name, operand = cond
+    col = cols[slot]
+    if op_name == "in":
+        mask = np.zeros(col.shape, dtype=bool)
+        for allowed in operand:
+            mask |= np.asarray(col == allowed, dtype=bool)
+        return mask
+    if isinstance(operand, dict):
+        operand = cols[operand["slot"]] + operand.get("plus", 0)
+    return np.asarray(_OPS[op_name](col, operand), dtype=bool)
+
+
+def _rule_rows(cols: Dict[str, Any], rules: Sequence[tuple], n: int) -> List[List[str]]:
+    """Fired rule names per row, in table order (all conditions of a rule AND-ed)."""
+    table = np.ones((n, len(rules)), dtype=bool)
+    for j, (_, conditions) in enumerate(rules):
+        for cond in conditions:
+            table[:, j] &= _condition_mask(cols, cond)
+    names = [name for name, _ in rules]
+    return [[names[j] for j in np.flatnonzero(row)] for row in table]
+
+
+def _first_extreme(columns: Sequence[Any], greater: bool) -> Any:
+    """Index of max()/min() over each row, replaying the builtin's left-to-right comparisons."""
+    best = columns[0]
+    idx = np.zeros(best.shape, dtype=np.intp)
+    for j, col in enumerate(columns[1:], start=1):
+        better = col > best if greater else col < best
+        best = np.where(better, col, best)
+        idx = np.where(better, j, idx)
+    return idx
+
+
+def analyze_columns(
+    *,
+    kills: Sequence[float],
+    deaths: Sequence[float],
+    assists: Sequence[float],
+    imp: Sequence[float],
+    camp_stack: Sequence[float],
+    level: Sequence[float],
+    kill_participation: Sequence[float],
+    duration: Sequence[float],
+    role_category: Sequence[str],
+    lane: Optional[Sequence[Any]] = None,
+    intentional_feeding: Optional[Sequence[bool]] = None,
+    imp_early_avg: Optional[Sequence[float]] = None,
+    imp_late_avg: Optional[Sequence[float]] = None,
+    mode: str = "NON_TURBO",
+) -> List[Dict[str, Any]]:
+    """
+    Score N player-matches from equal-length columns against RULES[mode]. Optional
+    columns default to "no signal" (empty lane, not feeding, no IMP timeline).
+    Returns [{"deltas": {}, "score": imp, "feedback_tags": {...}}, ...] in input order.
+    """
+    _require_numpy()
+    n = len(kills)
+    given = {
+        "kills": kills, "deaths": deaths, "assists": assists, "imp": imp,
+        "camp_stack": camp_stack, "level": level, "kill_participation": kill_participation,
+        "duration": duration, "role_category": role_category,
+        "lane": lane if lane is not None else [""] * n,
+        "intentional_feeding": intentional_feeding if intentional_feeding is not None else [False] * n,
+        "imp_early_avg": imp_early_avg if imp_early_avg is not None else [0.0] * n,
+        "imp_late_avg": imp_late_avg if imp_late_avg is not None else [0.0] * n,
+    }
+    cols = {slot: _column(slot, given[col]) for col, slot in COLUMN_SLOTS.items()}
+    table = RULES[mode]
+
+    ranked_names = [name for name, _, _ in table["ranked"]]
+    ranked = [-cols[slot] if sign < 0 else cols[slot] for _, slot, sign in table["ranked"]]
+    highlight = _first_extreme(ranked, greater=True)
+    lowlight = _first_extreme(ranked, greater=False)
+
+    praise_rows = _rule_rows(cols, table["praises"], n)
+    critique_rows = _rule_rows(cols, table["critiques"], n)
+    flag_rows = _rule_rows(cols, table["compound_flags"], n)
+    scores = cols["imp"]
+
+    return [
+        {
+            "deltas": {},
+            "score": float(scores[i]),
+            "feedback_tags": {
+                "highlight": ranked_names[highlight[i]],
+                "lowlight": ranked_names[lowlight[i]],
+                "praises": praise_rows[i],
+                "critiques": critique_rows[i],
+                "compound_flags": flag_rows[i],
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def analyze_players_batch(
+    players: Sequence[Dict[str, Any]], team_kills: Sequence[Any], mode: str = "NON_TURBO"
+) -> List[Dict[str, Any]]:
+    """Batch equivalent of [analyze_player(p, {}, role, tk) for p, tk in zip(players, team_kills)]."""
+    return analyze_columns(**player_columns(players, team_kills), mode=mode)
@@ -0,0 +1,7 @@
+# feedback/engine_pkg/__init__.py
+# Shared rule engine behind feedback.engine (NON_TURBO) and feedback.engine_turbo (TURBO)
+from .rules import RULES  # noqa: F401
+from .core import SLOTS, build_record, compile_rules, analyze_stats  # noqa: F401
+from .timeline import Timeline  # noqa: F401
+
+__all__ = ["RULES", "SLOTS", "build_record", "compile_rules", "analyze_stats", "Timeline"]
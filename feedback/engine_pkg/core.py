@@ -0,0 +1,157 @@
+# feedback/engine_pkg/core.py
+"""
+Compiled rule engine: RULES tables → flat predicate lists over a fixed-slot stats record.
+
+build_record() coerces a player's stats once (safe_num per slot, KP, role category, IMP
+trend); each compiled predicate then indexes the record directly instead of re-reading
+and re-coercing the stats dict per rule.
+"""
+import json
+import operator
+from typing import Any, Callable, Dict, List, Optional
+
+from .rules import RULES
+from .util import safe_num, get_role_category, compute_kp
+from .timeline import Timeline
+
+SLOTS = (
+    "imp", "kills", "assists", "deaths", "campStack", "level",
+    "killParticipation", "durationSeconds",
+    "roleCategory", "lane", "intentionalFeeding",
+    "impEarlyAvg", "impLateAvg",
+)
+SLOT_INDEX = {name: i for i, name in enumerate(SLOTS)}
+
+# Timeline-derived slots: slot → (statsBlock series, phase); segmented lazily per player
+TIMELINE_SLOTS = {
+    "impEarlyAvg": ("impPerMinute", "early"),
+    "impLateAvg": ("impPerMinute", "late"),
+}
+
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "ge": operator.ge,
+    "gt": operator.gt,
+    "le": operator.le,
+    "lt": operator.lt,
+    "eq": operator.eq,
+    "in": lambda value, allowed: value in allowed,
+}
+
+Predicate = Callable[[List[Any]], bool]
+
+
+def build_record(
+    player_stats: Dict[str, Any], team_kills: Any, role_category: Optional[str] = None
+) -> List[Any]:
+    """
+    One pass over the stats dict → values in SLOTS order. A precomputed `role_category`
+    (from the match context) is used as-is instead of deriving it from roleBasic/lane.
+    """
+    duration = safe_num(player_stats.get("durationSeconds"))
+    timeline = Timeline(player_stats.get("statsBlock", {}), duration)
+    return [
+        safe_num(player_stats.get("imp")),
+        safe_num(player_stats.get("kills")),
+        safe_num(player_stats.get("assists")),
+        safe_num(player_stats.get("deaths")),
+        safe_num(player_stats.get("campStack")),
+        safe_num(player_stats.get("level")),
+        compute_kp(player_stats.get("kills"), player_stats.get("assists"), team_kills),
+        duration,
+        role_category if role_category is not None
+        else get_role_category(player_stats.get("roleBasic", ""), player_stats.get("lane", "")),
+        player_stats.get("lane", ""),
+        bool(player_stats.get("intentionalFeeding", False)),
+        *(timeline.phase_average(key, phase) for key, phase in TIMELINE_SLOTS.values()),
+    ]
+
+
+def _compile_condition(cond: tuple) -> Predicate:
+    slot, op_name, operand = cond
+    op = _OPS[op_name]
+    i = SLOT_INDEX[slot]
+    if isinstance(operand, dict):
+        j, plus = SLOT_INDEX[operand["slot"]], operand.get("plus", 0)
+        return lambda r: op(r[i], r[j] + plus)
+    return lambda r: op(r[i], operand)
+
+
+def _compile_rule(conditions: List[tuple]) -> Predicate:
+    preds = [_compile_condition(c) for c in conditions]
+    if len(preds) == 1:
+        return preds[0]
+    if len(preds) == 2:
+        first, second = preds
+        return lambda r: first(r) and second(r)
+
+    def pred(r):
+        for p in preds:
+            if not p(r):
+                return False
+        return True
+    return pred
+
+
+class CompiledRules:
+    """One mode's rule table, compiled; tags(record) evaluates it."""
+
+    def __init__(self, table: Dict[str, Any]):
+        self.ranked = [(name, SLOT_INDEX[slot], sign < 0) for name, slot, sign in table["ranked"]]
+        self.praises = [(name, _compile_rule(conds)) for name, conds in table["praises"]]
+        self.critiques = [(name, _compile_rule(conds)) for name, conds in table["critiques"]]
+        self.flags = [(name, _compile_rule(conds)) for name, conds in table["compound_flags"]]
+
+    def _extremes(self, r: List[Any]) -> tuple:
+        # Replays max()/min() over the ranked dict: first stat wins ties
+        (first, i, negate), rest = self.ranked[0], self.ranked[1:]
+        hi = lo = first
+        hi_v = lo_v = -r[i] if negate else r[i]
+        for name, i, negate in rest:
+            v = -r[i] if negate else r[i]
+            if v > hi_v:
+                hi, hi_v = name, v
+            if v < lo_v:
+                lo, lo_v = name, v
+        return hi, lo
+
+    def tags(self, r: List[Any]) -> Dict[str, Any]:
+        highlight, lowlight = self._extremes(r)
+        return {
+            "highlight": highlight,
+            "lowlight": lowlight,
+            "praises": [name for name, pred in self.praises if pred(r)],
+            "critiques": [name for name, pred in self.critiques if pred(r)],
+            "compound_flags": [name for name, pred in self.flags if pred(r)],
+        }
+
+
+def compile_rules(rules: Dict[str, Dict[str, Any]] = RULES) -> Dict[str, CompiledRules]:
+    return {mode: CompiledRules(table) for mode, table in rules.items()}
+
+
+_COMPILED = compile_rules()
+
+
+def analyze_stats(
+    player_stats: Dict[str, Any], team_kills: Any, mode: str, debug_label: Optional[str] = None,
+    role_category: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Shared body of both engines' analyze_player."""
+    record = build_record(player_stats, team_kills, role_category)
+    tags = _COMPILED[mode].tags(record)
+
+    if debug_label:
+        lane = player_stats.get("lane", "")
+        role_basic = player_stats.get("roleBasic", "")
+        stats = dict(player_stats)
+        stats["killParticipation"] = record[SLOT_INDEX["killParticipation"]]
+        print(f"🧪 {debug_label} analyze_player debug:")
+        print("  Role:", role_basic, "| Lane:", lane, "→", record[SLOT_INDEX["roleCategory"]])
+        print("  Stats:", json.dumps(stats, indent=2))
+        print("  Tags:", json.dumps(tags, indent=2))
+
+    return {
+        "deltas": {},
+        "score": record[SLOT_INDEX["imp"]],
+        "feedback_tags": tags
+    }
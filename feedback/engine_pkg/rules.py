@@ -0,0 +1,51 @@
+# feedback/engine_pkg/rules.py
+"""
+Declarative feedback rules per game mode. Compiled once by core.compile_rules.
+
+Every condition reads a slot of the stats record (see core.SLOTS):
+  (slot, op, operand)    op ∈ ge | gt | le | lt | eq | in
+  operand                a constant, a tuple of allowed values for "in", or
+                         {"slot": name, "plus": offset} → another slot's value + offset
+A rule fires when all of its conditions hold. List order is output order.
+
+ranked: (stat name, slot, sign) — highlight is the first max of sign*value, lowlight the first min.
+"""
+
+_BASE_RULES = {
+    "ranked": [
+        ("imp", "imp", 1),
+        ("kills", "kills", 1),
+        ("assists", "assists", 1),
+        ("campStack", "campStack", 1),
+        ("killParticipation", "killParticipation", 1),
+        ("deaths", "deaths", -1),
+    ],
+    "praises": [
+        ("kills", [("kills", "ge", 10)]),
+        ("assists", [("assists", "ge", 15)]),
+        ("imp", [("imp", "ge", 1.3)]),
+        ("campStack", [("campStack", "ge", 5)]),
+        ("killParticipation", [("killParticipation", "ge", 0.7)]),
+    ],
+    "critiques": [
+        ("deaths", [("deaths", "ge", 10)]),
+        ("killParticipation", [("killParticipation", "lt", 0.3)]),
+    ],
+    "compound_flags": [
+        ("no_stacking_support", [("roleCategory", "eq", "support"), ("campStack", "eq", 0)]),
+        ("low_kp", [("killParticipation", "lt", 0.3), ("durationSeconds", "gt", 900)]),
+        ("fed_no_impact", [("deaths", "ge", 10), ("imp", "lt", 0.2)]),
+        ("fed_early", [("deaths", "ge", 5), ("level", "lt", 10)]),
+        ("lane_violation", [("lane", "in", ("mid", "jungle")), ("roleCategory", "eq", "support")]),
+        ("intentional_feeder", [("intentionalFeeding", "eq", True)]),
+        # IMP trend from the per-minute timeline (averages are 0.0 without one → neither fires)
+        ("slow_start", [("impEarlyAvg", "lt", 0.5), ("impLateAvg", "gt", {"slot": "impEarlyAvg", "plus": 0.5})]),
+        ("late_game_falloff", [("impLateAvg", "lt", {"slot": "impEarlyAvg", "plus": -0.5})]),
+    ],
+}
+
+RULES = {
+    "NON_TURBO": _BASE_RULES,
+    # Turbo tags identically today; economy stats are gated later, at phrasing time
+    "TURBO": _BASE_RULES,
+}
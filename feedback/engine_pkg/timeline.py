@@ -0,0 +1,79 @@
+# feedback/engine_pkg/timeline.py
+"""
+Lazy per-player view over statsBlock timelines.
+
+Only the series and phases a rule actually asks for are segmented, on first request,
+and the results are cached on the instance. Each request costs one validation
+pass plus summing the segments in place (no sliced copies), so trend flags are
+O(length of that one series) however many timelines the player carries.
+
+Semantics match the former segment_phases + safe_avg pair exactly:
+  - a series counts only if it is a non-empty list whose values are all int/float
+  - duration <= 0, a missing series or a non-numeric value → every phase averages 0.0
+  - minutes split at total//3 and 2*total//3, total = max(1, int(duration) // 60)
+Averages are taken with the builtin sum() over float() values, as safe_avg did.
+(NumPy is deliberately not used: per-minute series are tens of values long, and its
+pairwise summation could round differently from sum() at the flag thresholds.)
+"""
+from itertools import islice, repeat
+from typing import Any, Dict, Optional, Tuple
+
+from .util import safe_num
+
+_NUMERIC = (int, float)
+
+
+def _segment_mean(arr: list, start: int, stop: int) -> float:
+    """Mean of arr[start:stop] without building the slice (0.0 when empty)."""
+    count = max(0, min(stop, len(arr)) - start)
+    if not count:
+        return 0.0
+    return sum(map(float, islice(arr, start, stop))) / count
+
+
+class Timeline:
+    __slots__ = ("_block", "_duration", "_cuts", "_series", "_averages")
+
+    def __init__(self, stats_block: Dict[str, Any], duration: Any):
+        self._block = stats_block
+        self._duration = duration
+        self._cuts: Optional[Tuple[int, int]] = None
+        self._series: Dict[str, Optional[list]] = {}
+        self._averages: Dict[Tuple[str, str], float] = {}
+
+    def _phase_cuts(self) -> Optional[Tuple[int, int]]:
+        if self._cuts is None:
+            duration = safe_num(self._duration, 0)
+            if duration <= 0:
+                return None
+            total_minutes = max(1, int(duration) // 60)
+            self._cuts = (total_minutes // 3, (total_minutes * 2) // 3)
+        return self._cuts
+
+    def series(self, key: str) -> Optional[list]:
+        """statsBlock[key] if it is segmentable (non-empty, all int/float, duration > 0), else None."""
+        if key in self._series:
+            return self._series[key]
+        arr = self._block.get(key, [])
+        usable = None
+        if isinstance(arr, list) and arr:
+            if self._phase_cuts() is not None and all(map(isinstance, arr, repeat(_NUMERIC))):
+                usable = arr
+        self._series[key] = usable
+        return usable
+
+    def phase_average(self, key: str, phase: str) -> float:
+        """Mean of one phase ("early" | "mid" | "late") of statsBlock[key]; 0.0 when unusable."""
+        cached = self._averages.get((key, phase))
+        if cached is not None:
+            return cached
+
+        arr = self.series(key)
+        if arr is None:
+            value = 0.0
+        else:
+            early_cut, mid_cut = self._cuts
+            start, stop = {"early": (0, early_cut), "mid": (early_cut, mid_cut), "late": (mid_cut, len(arr))}[phase]
+            value = _segment_mean(arr, start, stop)
+        self._averages[(key, phase)] = value
+        return value
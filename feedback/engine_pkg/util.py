@@ -0,0 +1,61 @@
+# feedback/engine_pkg/util.py
+# Numeric/context helpers shared by both engines (previously duplicated in engine.py / engine_turbo.py)
+from typing import Dict, Any, List
+
+def safe_num(val: Any, default: float = 0.0) -> float:
+    """Convert None or non-numeric values to a safe float."""
+    try:
+        if val is None:
+            return default
+        if isinstance(val, bool):
+            return float(val)
+        return float(val)
+    except (ValueError, TypeError):
+        return default
+
+def get_role_category(role: str, lane: str) -> str:
+    role = (role or "").lower()
+    lane = (lane or "").lower()
+    if role in ["softsupport", "hardsupport"]:
+        return "support"
+    if lane in ["offlane", "safelane", "mid"]:
+        return "core"
+    return "unknown"
+
+def compute_kp(kills: Any, assists: Any, team_kills: Any) -> float:
+    try:
+        kills = safe_num(kills)
+        assists = safe_num(assists)
+        team_kills = safe_num(team_kills)
+        return (kills + assists) / team_kills if team_kills > 0 else 0.0
+    except Exception:
+        return 0.0
+
+def segment_phases(stats_block: Dict[str, Any], duration: Any) -> Dict[str, Dict[str, List[float]]]:
+    """
+    Splits per-minute arrays into early/mid/late segments.
+    Only all-numeric, non-empty lists are segmented; returns {} when duration <= 0.
+    """
+    duration = safe_num(duration, 0)
+    if duration <= 0:
+        return {}
+
+    total_minutes = max(1, int(duration) // 60)
+    early_cut = total_minutes // 3
+    mid_cut = (total_minutes * 2) // 3
+
+    segmented = {}
+    for key, arr in stats_block.items():
+        if isinstance(arr, list) and arr and all(isinstance(x, (int, float)) for x in arr):
+            segmented[key] = {
+                "early": arr[:early_cut],
+                "mid": arr[early_cut:mid_cut],
+                "late": arr[mid_cut:]
+            }
+    return segmented
+
+def safe_avg(arr: List[float]) -> float:
+    if not arr:
+        return 0.0
+    arr = [safe_num(x) for x in arr]
+    return sum(arr) / len(arr) if arr else 0.0
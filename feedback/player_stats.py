@@ -0,0 +1,185 @@
+# feedback/player_stats.py
+"""
+PlayerStats — fixed-slot stats record for one player-match (replaces the ~35-key dict).
+
+Built in one pass by extract_player_record (below). Engines and the advice
+builder read it through the same .get()/[] calls they used on the dict, so it is a
+drop-in; to_dict() returns the exact dict extract_player_stats + the formatter's
+None-sweep used to produce (same keys, order and values) for anything that needs one.
+
+Which keys exist depends on mode: TURBO records have no gpm / xpm / networthPerMinute,
+and .get() on them returns the default exactly as the dict did.
+"""
+from typing import Any, Dict, Iterator, Tuple
+
+from feedback.extract import NORMAL_STATS, TURBO_STATS, TIMELINE_ARRAY_KEYS
+
+# Per-player context fields appended after the mode's stat keys (dict insertion order)
+CONTEXT_FIELDS = (
+    "lane", "roleBasic", "partyId", "intentionalFeeding", "neutral0Id",
+    "networth", "gold", "goldSpent", "statsBlock", "durationSeconds",
+)
+
+
+def _field_order(stat_keys) -> Tuple[str, ...]:
+    return tuple(stat_keys) + tuple(k for k in CONTEXT_FIELDS if k not in stat_keys)
+
+
+FIELD_ORDER = {
+    "NON_TURBO": _field_order(NORMAL_STATS),
+    "TURBO": _field_order(TURBO_STATS),
+}
+_FIELD_SETS = {mode: frozenset(order) for mode, order in FIELD_ORDER.items()}
+
+
+class PlayerStats:
+    # Scalar stats as extracted (numbers; per-minute keys may carry Stratz's raw value)
+    kills: float
+    deaths: float
+    assists: float
+    imp: float
+    level: float
+    gold: float
+    goldSpent: float
+    gpm: float
+    xpm: float
+    heroHealing: float
+    heroDamage: float
+    towerDamage: float
+    buildingDamage: float
+    damageTaken: float
+    actionsPerMinute: Any
+    killParticipation: float
+    fightParticipationPercent: float
+    stunDuration: float
+    disableDuration: float
+    runePickups: int
+    wardsPlaced: int
+    sentryWardsPlaced: int
+    observerWardsPlaced: int
+    wardsDestroyed: int
+    campStack: float
+    neutralKills: float
+    laneCreeps: float
+    jungleCreeps: float
+    networth: float
+    networthPerMinute: Any
+    experiencePerMinute: Any
+    # Context
+    lane: str
+    roleBasic: str
+    partyId: Any
+    intentionalFeeding: Any
+    neutral0Id: Any
+    durationSeconds: float
+    statsBlock: Dict[str, Any]  # timeline arrays (TIMELINE_ARRAY_KEYS always present)
+
+    __slots__ = FIELD_ORDER["NON_TURBO"] + ("mode", "_order", "_fields")
+
+    def __init__(self, mode: str = "NON_TURBO"):
+        self.mode = mode
+        # extract_player_stats treated every mode other than NON_TURBO as turbo
+        key = "NON_TURBO" if mode == "NON_TURBO" else "TURBO"
+        self._order = FIELD_ORDER[key]
+        self._fields = _FIELD_SETS[key]
+
+    # --- dict-compatible read access -------------------------------------------------
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._fields:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._order
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The legacy stats dict (extract_player_stats + None-sweep + durationSeconds)."""
+        return {k: getattr(self, k) for k in self._order}
+
+    def __repr__(self) -> str:
+        return f"PlayerStats({self.mode}, kills={self.kills!r}, deaths={self.deaths!r}, assists={self.assists!r}, imp={self.imp!r})"
+
+
+# Stat keys extract_player_stats derives specially; every other key is read generically
+_DERIVED = frozenset({
+    "campStack", "level", "runePickups", "wardsPlaced", "sentryWardsPlaced",
+    "observerWardsPlaced", "wardsDestroyed", "killParticipation", "imp",
+    "networth", "gold", "goldSpent",
+})
+_GENERIC_KEYS = {
+    "NON_TURBO": tuple(k for k in NORMAL_STATS if k not in _DERIVED),
+    "TURBO": tuple(k for k in TURBO_STATS if k not in _DERIVED),
+}
+
+
+def extract_player_record(
+    player: dict, stats_block: dict, mode: str = "NON_TURBO", duration_seconds: Any = 0
+) -> PlayerStats:
+    """
+    One pass from the Stratz player payload to a PlayerStats record.
+
+    Same values as extract_player_stats(...) followed by the formatter's
+    durationSeconds injection and None-sweep (lane/roleBasic → "", statsBlock → {},
+    anything else → 0), without building the intermediate dict.
+    """
+    rec = PlayerStats(mode)
+    sb = stats_block or {}
+    get = sb.get
+
+    for key in _GENERIC_KEYS["NON_TURBO" if mode == "NON_TURBO" else "TURBO"]:
+        setattr(rec, key, get(key, player.get(key, 0)) or 0)
+
+    rec.campStack = sum(get("campStack") or [])
+    levels = get("level") or []
+    rec.level = _none_to_zero(levels[-1] if levels else 0)
+    wards = len(get("wards") or [])
+    rec.runePickups = len(get("runes") or [])
+    rec.wardsPlaced = wards
+    rec.sentryWardsPlaced = round(wards / 2)
+    rec.observerWardsPlaced = round(wards / 2)
+    rec.wardsDestroyed = len(get("wardDestruction") or [])
+    # Engines compute KP; keep the placeholder the dict carried
+    rec.killParticipation = 0.0
+    try:
+        rec.imp = float(player.get("imp", 0.0))
+    except (ValueError, TypeError):
+        rec.imp = 0.0
+
+    # Context fields (None-swept as the formatter did)
+    lane, role_basic = player.get("lane", ""), player.get("roleBasic", "")
+    rec.lane = "" if lane is None else lane
+    rec.roleBasic = "" if role_basic is None else role_basic
+    rec.partyId = _none_to_zero(player.get("partyId"))
+    rec.intentionalFeeding = _none_to_zero(player.get("intentionalFeeding", False))
+    rec.neutral0Id = _none_to_zero(player.get("neutral0Id", 0))
+    rec.networth = _none_to_zero(player.get("networth", 0))
+    rec.gold = _none_to_zero(player.get("gold", 0))
+    rec.goldSpent = _none_to_zero(player.get("goldSpent", 0))
+    rec.durationSeconds = _none_to_zero(duration_seconds)
+
+    # Timeline arrays are always carried through (present or empty)
+    block = dict(sb)
+    raw_stats = player.get("stats", {})
+    for t_key in TIMELINE_ARRAY_KEYS:
+        if t_key not in block:
+            block[t_key] = raw_stats.get(t_key) or []
+    rec.statsBlock = block
+    return rec
+
+
+def _none_to_zero(value: Any) -> Any:
+    return 0 if value is None else value
@@ -0,0 +1,12 @@
+import pytest
+
+import bot.throttle as throttle
+
+
+@pytest.fixture(autouse=True)
+def _isolated_throttle_state(tmp_path, monkeypatch):
+    # Never touch (or spend) the persisted production budget under data/runtime
+    monkeypatch.setenv("THROTTLE_STATE_DIR", str(tmp_path / "throttle"))
+    throttle.reset_limiters()
+    yield
+    throttle.reset_limiters()
@@ -0,0 +1,107 @@
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bot.formatter import _analyze_player
+from feedback.advice_pkg.bands import band_for_stat, value_from_context
+from feedback.advice_pkg.flags import select_flag_phrase
+from feedback.advice_pkg.selectors import choose_banded_line, choose_banded_tip
+from feedback.catalog import COMPOUND_FLAGS, PHRASE_BOOK, TIP_LINES
+
+SAMPLES = Path(__file__).parent / "samples"
+
+
+def _jobs():
+    jobs = []
+    for name, mode in (("match_normal.json", "NON_TURBO"), ("match_turbo.json", "TURBO")):
+        match = json.loads((SAMPLES / name).read_text(encoding="utf-8"))
+        for i in range(20):
+            variant = dict(match, id=match["id"] + i)
+            for player in variant["players"]:
+                jobs.append((player, variant, player.get("stats", {}), mode))
+    return jobs
+
+
+def test_concurrent_analysis_matches_sequential_and_leaves_global_rng_alone():
+    jobs = _jobs()
+    random.seed(7)
+    before = random.getstate()
+    sequential = [_analyze_player(*job) for job in jobs]
+    assert random.getstate() == before
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(3):
+            assert list(pool.map(lambda job: _analyze_player(*job), jobs)) == sequential
+
+
+# Pre-index selectors (walked PHRASE_BOOK / TIP_LINES / COMPOUND_FLAGS per call), kept for parity
+def _legacy_flatten(lines_def):
+    if isinstance(lines_def, list):
+        return [s for s in lines_def if isinstance(s, str) and s.strip()]
+    out = []
+    for v in lines_def.values():
+        if isinstance(v, list):
+            out.extend([s for s in v if isinstance(s, str) and s.strip()])
+    return out
+
+
+def _legacy_line(stat, polarity, context, rng):
+    lines_def = PHRASE_BOOK.get(stat, {}).get(polarity, [])
+    if isinstance(lines_def, list):
+        flat = _legacy_flatten(lines_def)
+        return rng.choice(flat) if flat else None
+    band = band_for_stat(stat, value_from_context(stat, context), polarity)
+    lines = lines_def.get(band) or []
+    if not lines:
+        flat = _legacy_flatten(lines_def)
+        return rng.choice(flat) if flat else None
+    return rng.choice(lines)
+
+
+def _legacy_tip(stat, context, mode, rng):
+    entry = TIP_LINES.get(stat)
+    if not isinstance(entry, dict):
+        return None
+    allowed = entry.get("modes", ["ALL"])
+    if "ALL" not in allowed and mode not in allowed:
+        return None
+    text = entry.get("text")
+    if isinstance(text, str):
+        return text
+    lines = text.get(band_for_stat(stat, value_from_context(stat, context), "positive")) or []
+    return rng.choice(lines) if lines and isinstance(lines, list) else None
+
+
+def _legacy_flag(flags, mode, rng):
+    for flag in flags:
+        entry = COMPOUND_FLAGS.get(flag)
+        if not isinstance(entry, dict):
+            continue
+        allowed = entry.get("modes", ["ALL"])
+        if "ALL" not in allowed and mode not in allowed:
+            continue
+        if entry.get("lines", []):
+            return rng.choice(entry["lines"])
+    return None
+
+
+def test_indexed_selectors_match_catalog_walk():
+    stats = sorted(set(PHRASE_BOOK) | set(TIP_LINES)) + ["unknownStat"]
+    values = [None, float("nan"), -20, -5, 0, 0.1, 0.25, 0.5, 0.7, 0.9, 1, 2, 3, 5, 8, 10, 15, 20, 30, 300, 420, 520, 720]
+    flag_lists = [[f] for f in COMPOUND_FLAGS] + [["nope", *COMPOUND_FLAGS], []]
+    for mode in ("NON_TURBO", "TURBO", "ALL_PICK"):
+        for stat in stats:
+            for value in values:
+                ctx = {stat: value}
+                for polarity in ("positive", "negative"):
+                    a, b = random.Random(1), random.Random(1)
+                    assert choose_banded_line(stat, polarity, ctx, a) == _legacy_line(stat, polarity, ctx, b)
+                    assert a.getstate() == b.getstate()
+                a, b = random.Random(2), random.Random(2)
+                assert choose_banded_tip(stat, ctx, mode, a) == _legacy_tip(stat, ctx, mode, b)
+                assert a.getstate() == b.getstate()
+        for flags in flag_lists:
+            a, b = random.Random(3), random.Random(3)
+            assert select_flag_phrase(flags, mode, a) == _legacy_flag(flags, mode, b)
+            assert a.getstate() == b.getstate()
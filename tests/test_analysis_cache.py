@@ -0,0 +1,53 @@
+from bot.analysis_cache import AnalysisCache, analysis_key
+
+
+def test_lru_and_disk_tier(tmp_path):
+    path = str(tmp_path / "analysis.sqlite3")
+    cache = AnalysisCache(max_items=2, disk_path=path)
+    calls = []
+
+    def compute(tag):
+        calls.append(tag)
+        return {"title": tag, "tips": [tag]}
+
+    for tag in ("a", "b", "a", "c"):
+        assert cache.get_or_compute(analysis_key(1, tag), lambda: compute(tag))["title"] == tag
+    assert calls == ["a", "b", "c"]
+
+    # Callers get copies; mutating one does not poison the cache
+    cache.get(analysis_key(1, "a"))["tips"].append("x")
+    assert cache.get(analysis_key(1, "a"))["tips"] == ["a"]
+
+    # "b" fell out of the 2-item LRU but is still on disk; a fresh process reads it back
+    fresh = AnalysisCache(max_items=2, disk_path=path)
+    assert fresh.get_or_compute(analysis_key(1, "b"), lambda: compute("again"))["title"] == "b"
+    assert fresh.stats() == {"hits": 0, "disk_hits": 1, "misses": 0}
+    assert calls == ["a", "b", "c"]
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path, monkeypatch):
+    import sqlite3
+    import bot.analysis_cache as analysis_cache
+
+    clock = [1000.0]
+    monkeypatch.setattr(analysis_cache.time, "time", lambda: clock[0])
+    path = str(tmp_path / "analysis.sqlite3")
+
+    # A tier written before last_used existed is migrated in place
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE analyses (key TEXT PRIMARY KEY, payload TEXT NOT NULL, created REAL NOT NULL)")
+    conn.execute("INSERT INTO analyses VALUES ('a', '{\"title\": \"a\"}', 1.0)")
+    conn.commit()
+    conn.close()
+
+    cache = AnalysisCache(max_items=1, disk_path=path, disk_max=2)
+    clock[0] += 1
+    cache.put("b", {"title": "b"})
+    clock[0] += 1
+    assert cache.get("a") == {"title": "a"}  # disk hit: "a" is now the most recently used
+    clock[0] += 1
+    cache.put("c", {"title": "c"})
+
+    fresh = AnalysisCache(max_items=1, disk_path=path, disk_max=2)
+    assert fresh.get("a") == {"title": "a"} and fresh.get("c") == {"title": "c"}
+    assert fresh.get("b") is None
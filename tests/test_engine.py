@@ -12,3 +12,102 @@ def test_engine_turbo():
     baseline = {"kills": 5, "deaths": 4, "assists": 7, "imp": 0.7, "campStack": 1, "level": 13}
     result = turbo_analyze(sample_stats, baseline, "softsupport", team_kills=25)
     print(result)
+
+
+# Pre-rule-table _select_priority_feedback (verbatim logic, both engines shared it), kept for parity
+def _legacy_tags(role_category, context):
+    from feedback.engine_pkg.util import safe_avg, safe_num, segment_phases
+
+    result = {"highlight": None, "lowlight": None, "praises": [], "critiques": [], "compound_flags": []}
+    imp = safe_num(context.get("imp"))
+    kills = safe_num(context.get("kills"))
+    assists = safe_num(context.get("assists"))
+    deaths = safe_num(context.get("deaths"))
+    camp_stack = safe_num(context.get("campStack"))
+    level = safe_num(context.get("level"))
+    kp = safe_num(context.get("killParticipation"))
+    duration = safe_num(context.get("durationSeconds"))
+    lane = context.get("lane", "")
+    intentional_feeding = bool(context.get("intentionalFeeding", False))
+
+    ranked = {"imp": imp, "kills": kills, "assists": assists, "campStack": camp_stack,
+              "killParticipation": kp, "deaths": -deaths}
+    result["highlight"] = max(ranked, key=ranked.get)
+    result["lowlight"] = min(ranked, key=ranked.get)
+
+    if kills >= 10: result["praises"].append("kills")
+    if assists >= 15: result["praises"].append("assists")
+    if imp >= 1.3: result["praises"].append("imp")
+    if camp_stack >= 5: result["praises"].append("campStack")
+    if kp >= 0.7: result["praises"].append("killParticipation")
+    if deaths >= 10: result["critiques"].append("deaths")
+    if kp < 0.3: result["critiques"].append("killParticipation")
+
+    flags = result["compound_flags"]
+    if role_category == "support" and camp_stack == 0: flags.append("no_stacking_support")
+    if kp < 0.3 and duration > 900: flags.append("low_kp")
+    if deaths >= 10 and imp < 0.2: flags.append("fed_no_impact")
+    if deaths >= 5 and level < 10: flags.append("fed_early")
+    if lane in ["mid", "jungle"] and role_category == "support": flags.append("lane_violation")
+    if intentional_feeding: flags.append("intentional_feeder")
+
+    stats_block = context.get("statsBlock", {})
+    phases = segment_phases(stats_block, duration)
+    imp_pm = stats_block.get("impPerMinute", [])
+    if isinstance(imp_pm, list) and imp_pm:
+        early_avg = safe_avg(phases.get("impPerMinute", {}).get("early", []))
+        late_avg = safe_avg(phases.get("impPerMinute", {}).get("late", []))
+        if early_avg < 0.5 and late_avg > early_avg + 0.5: flags.append("slow_start")
+        if late_avg < early_avg - 0.5: flags.append("late_game_falloff")
+    return result
+
+
+def test_rule_table_engines_match_legacy_rules():
+    import random
+    from feedback.engine_pkg.util import compute_kp, get_role_category
+
+    rng = random.Random(22)
+    pick = lambda *opts: opts[rng.randrange(len(opts))]
+    for _ in range(4000):
+        stats = {
+            "kills": pick(0, 9, 10, rng.randrange(30), None, "4"),
+            "deaths": pick(0, 4, 5, 10, rng.randrange(25), float("nan")),
+            "assists": pick(0, 15, rng.randrange(40), True),
+            "imp": pick(0.19, 0.2, 1.3, rng.uniform(-3, 5), None),
+            "campStack": pick(0, 5, rng.randrange(12)),
+            "level": pick(9, 10, rng.randrange(1, 31)),
+            "durationSeconds": pick(0, 900, 901, rng.randrange(300, 4500)),
+            "lane": pick("mid", "jungle", "safelane", "", None),
+            "roleBasic": pick("softsupport", "hardsupport", "core", None),
+            "intentionalFeeding": pick(False, True, None),
+            "statsBlock": pick({}, {"impPerMinute": [rng.uniform(-2, 3) for _ in range(rng.randrange(60))]},
+                               {"impPerMinute": [1, "x"], "level": [1, 2]}),
+        }
+        team_kills = pick(0, 20, rng.randrange(60), None)
+        context = dict(stats, killParticipation=compute_kp(stats["kills"], stats["assists"], team_kills))
+        expected = _legacy_tags(get_role_category(stats["roleBasic"], stats["lane"]), context)
+        for analyze in (normal_analyze, turbo_analyze):
+            result = analyze(stats, {}, "", team_kills)
+            assert result["feedback_tags"] == expected
+
+
+def test_timeline_phase_averages_match_segment_phases():
+    import random
+    from feedback.engine_pkg.timeline import Timeline
+    from feedback.engine_pkg.util import safe_avg, segment_phases
+
+    rng = random.Random(23)
+    for _ in range(2000):
+        series = [rng.choice([rng.uniform(-3, 3), rng.randrange(-2, 4), True]) for _ in range(rng.randrange(0, 90))]
+        if series and rng.random() < 0.1:
+            series[rng.randrange(len(series))] = rng.choice(["1", None])
+        block = {"impPerMinute": series, "level": [1, 2, 3]}
+        duration = rng.choice([0, -60, 59, 60, 179, rng.randrange(60, 6000)])
+
+        phases = segment_phases(block, duration).get("impPerMinute", {})
+        timeline = Timeline(block, duration)
+        for phase in ("early", "mid", "late"):
+            expected = safe_avg(phases.get(phase, []))
+            assert timeline.phase_average("impPerMinute", phase) == expected
+            assert timeline.phase_average("impPerMinute", phase) == expected  # cached
+        assert Timeline(block, duration).phase_average("missing", "late") == 0.0
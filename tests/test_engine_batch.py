@@ -0,0 +1,63 @@
+import json
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from feedback.engine import analyze_player as normal_analyze
+from feedback.engine_batch import analyze_players_batch
+from feedback.engine_turbo import analyze_player as turbo_analyze
+from feedback.extract import extract_player_stats
+
+SAMPLES = Path(__file__).parent / "samples"
+
+
+def _sample_rows():
+    rows = []
+    for name, mode in (("match_normal.json", "NON_TURBO"), ("match_turbo.json", "TURBO")):
+        match = json.loads((SAMPLES / name).read_text(encoding="utf-8"))
+        for player in match["players"]:
+            tk = sum(p.get("kills", 0) for p in match["players"] if p.get("isRadiant") == player.get("isRadiant"))
+            stats = extract_player_stats(player, player.get("stats") or {}, tk, mode)
+            stats["durationSeconds"] = match.get("durationSeconds", 0)
+            rows.append((stats, tk))
+    return rows
+
+
+def _synthetic_rows(count=3000):
+    rng = random.Random(21)
+    pick = lambda *opts: opts[rng.randrange(len(opts))]
+    rows = []
+    for _ in range(count):
+        minutes = rng.randrange(0, 70)
+        series = [round(rng.uniform(-2, 3), 2) for _ in range(minutes)]
+        if rng.random() < 0.05:
+            series.append("x")  # non-numeric → series ignored
+        stats = {
+            "kills": pick(0, 5, 9, 10, 11, rng.randrange(30), None, "7"),
+            "deaths": pick(0, 4, 5, 9, 10, rng.randrange(25), None),
+            "assists": pick(0, 14, 15, rng.randrange(40), True),
+            "imp": pick(0.19, 0.2, 1.29, 1.3, rng.uniform(-3, 5), None, "bad"),
+            "campStack": pick(0, 4, 5, rng.randrange(12), None),
+            "level": pick(1, 9, 10, rng.randrange(1, 31)),
+            "durationSeconds": pick(0, 900, 901, rng.randrange(300, 4500), None),
+            "lane": pick("mid", "jungle", "safelane", "offlane", "MID_LANE", "", None),
+            "roleBasic": pick("softsupport", "hardsupport", "core", "", None),
+            "intentionalFeeding": pick(False, True, None, 0),
+            "statsBlock": pick({}, {"impPerMinute": series}, {"impPerMinute": []}),
+        }
+        rows.append((stats, pick(0, 1, 10, 30, rng.randrange(60), None)))
+    return rows
+
+
+@pytest.mark.parametrize("rows", [_sample_rows(), _synthetic_rows()], ids=["samples", "synthetic"])
+def test_batch_matches_scalar_engines(rows):
+    players = [stats for stats, _ in rows]
+    team_kills = [tk for _, tk in rows]
+    normal = analyze_players_batch(players, team_kills)
+    turbo = analyze_players_batch(players, team_kills, mode="TURBO")
+    assert len(normal) == len(turbo) == len(rows)
+    for (stats, tk), got_normal, got_turbo in zip(rows, normal, turbo):
+        assert got_normal == normal_analyze(stats, {}, "", tk)
+        assert got_turbo == turbo_analyze(stats, {}, "", tk)
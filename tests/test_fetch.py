@@ -0,0 +1,232 @@
+import bot.stratz as stratz
+import bot.fetch as fetch
+
+
+def test_latest_batch_query_aliases():
+    query = stratz._build_latest_batch_query(3)
+    for i in range(3):
+        assert f"$p{i}: Long!" in query
+        assert f"p{i}: player(steamAccountId: $p{i})" in query
+
+
+def test_fetch_latest_matches_chunks(monkeypatch):
+    calls = []
+
+    def fake_post(query, variables, timeout=10):
+        calls.append(variables)
+        return {
+            alias: ({"matches": [{"id": sid * 10}]} if sid % 2 else {"matches": []})
+            for alias, sid in variables.items()
+        }
+
+    monkeypatch.setattr(stratz, "post_stratz_query", fake_post)
+    latest = stratz.fetch_latest_matches([1, 2, 3, 4, 5], chunk_size=2)
+
+    assert len(calls) == 3
+    assert latest == {1: 10, 3: 30, 5: 50}
+
+
+def test_fetch_latest_matches_quota(monkeypatch):
+    monkeypatch.setattr(stratz, "post_stratz_query", lambda q, v, timeout=10: "quota_exceeded")
+    assert stratz.fetch_latest_matches([1, 2]) == {"error": "quota_exceeded"}
+
+
+def test_poll_latest_match_ids_falls_back_only_for_failed_chunks(monkeypatch):
+    # A failed chunk must not read as "no latest match" for its players
+    def flaky_post(query, variables, timeout=10):
+        if 3 in variables.values():
+            return None
+        return {alias: {"matches": [{"id": sid * 10}]} for alias, sid in variables.items()}
+
+    monkeypatch.setattr(stratz, "post_stratz_query", flaky_post)
+    monkeypatch.setattr(fetch, "fetch_latest_matches", stratz.fetch_latest_matches)
+    monkeypatch.setenv("STRATZ_LATEST_BATCH_SIZE", "2")
+    polled = fetch.poll_latest_match_ids([1, 2, 3, 4])
+    assert polled == {1: 10, 2: 20, 3: None, 4: None}
+
+    # Only players of the failed chunk fall back to a single-player lookup
+    looked_up = []
+    monkeypatch.setattr(fetch, "fetch_latest_match", lambda sid: looked_up.append(sid) or {"match_id": sid * 10})
+    monkeypatch.setattr(fetch, "get_full_match", lambda mid: {"id": mid, "players": []})
+    bundles = {sid: fetch.get_latest_new_match(sid, None, polled) for sid in (1, 2, 3, 4, 5)}
+    assert looked_up == [3, 4]
+    assert {sid: b and b["match_id"] for sid, b in bundles.items()} == {1: 10, 2: 20, 3: 30, 4: 40, 5: None}
+
+    def boom(*_a, **_k):
+        raise RuntimeError("network down")
+
+    monkeypatch.setattr(fetch, "fetch_latest_matches", boom)
+    assert fetch.poll_latest_match_ids([1, 2]) is None
+
+
+def test_fetch_imp_readiness_batches_and_uses_store(monkeypatch):
+    calls = []
+
+    def fake_post(query, variables, timeout=10):
+        calls.append(variables)
+        assert "stats" not in query and "m0: match(id: $m0)" in query
+        return {
+            alias: {"players": [{"steamAccountId": 1, "imp": 5 if mid % 2 else None}]}
+            for alias, mid in variables.items()
+        }
+
+    stored = {"players": [{"steamAccountId": 1, "imp": 9}]}
+    monkeypatch.setattr(stratz, "post_stratz_query", fake_post)
+    monkeypatch.setattr(stratz, "load_match", lambda mid: stored if mid == 100 else None)
+
+    readiness = stratz.fetch_imp_readiness([100, 101, 102, 103, 101], chunk_size=2)
+
+    assert calls == [{"m0": 101, "m1": 102}, {"m0": 103}]
+    assert readiness == {100: {1: 9}, 101: {1: 5}, 102: {1: None}, 103: {1: 5}}
+
+
+def test_get_latest_new_match_uses_polled_ids(monkeypatch):
+    def fail(*_a, **_k):
+        raise AssertionError("per-player poll should not run")
+
+    monkeypatch.setattr(fetch, "fetch_latest_match", fail)
+    monkeypatch.setattr(fetch, "get_full_match", lambda mid: {"id": mid, "players": []})
+
+    assert fetch.get_latest_new_match(7, "70", {7: 70}) is None
+    assert fetch.get_latest_new_match(8, None, {7: 70}) is None
+    bundle = fetch.get_latest_new_match(7, "69", {7: 70})
+    assert bundle["match_id"] == 70
+
+
+def test_match_cache_coalesces_concurrent_fetches():
+    import threading
+    import time
+    from bot.match_cache import MatchCache
+
+    loads = []
+
+    def slow_loader(mid):
+        loads.append(mid)
+        time.sleep(0.05)
+        return {"id": mid, "players": []}
+
+    cache = MatchCache(slow_loader)
+    results = []
+    workers = [threading.Thread(target=lambda: results.append(cache.get(42))) for _ in range(5)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert loads == [42]
+    assert all(r == {"id": 42, "players": []} for r in results)
+    assert cache.get(42)["id"] == 42
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] + stats["coalesced"] == 5
+
+
+def test_match_cache_does_not_keep_quota_signal():
+    from bot.match_cache import MatchCache
+
+    answers = [{"error": "quota_exceeded"}, {"id": 1}]
+    cache = MatchCache(lambda mid: answers.pop(0))
+    assert cache.get(1) == {"error": "quota_exceeded"}
+    assert cache.get(1) == {"id": 1}
+    assert cache.get(1) == {"id": 1}
+
+
+def test_match_store_round_trip_and_lru(tmp_path):
+    from bot.match_store import MatchStore, is_final_match
+
+    final = {"id": 1, "players": [{"steamAccountId": 5, "imp": 3}], "pad": "x" * 2000}
+    assert is_final_match(final)
+    assert not is_final_match({"id": 2, "players": [{"steamAccountId": 5, "imp": None}]})
+
+    store = MatchStore(str(tmp_path / "matches.sqlite3"), max_bytes=10**6)
+    assert store.save(1, final)
+    assert not store.save(1, final)  # identical content is not rewritten
+    assert store.load(1) == final
+    assert store.load(2) is None
+
+    store.max_bytes = store.stats()["bytes"] + 10
+    store.save(2, dict(final, id=2, pad="y" * 2000))
+    assert store.load(1) is None  # least recently used row evicted
+    assert store.load(2)["id"] == 2
+
+
+def test_async_client_batched_poll_and_quota(monkeypatch):
+    import asyncio
+    import json
+    import httpx
+    from bot.stratz_async import AsyncStratzClient
+
+    monkeypatch.setenv("STRATZ_TOKEN", "test-token")
+
+    def handler(request):
+        variables = json.loads(request.content)["variables"]
+        if 99 in variables.values():
+            return httpx.Response(429)
+        if 77 in variables.values():
+            return httpx.Response(500)
+        data = {alias: {"matches": [{"id": sid + 1000}]} for alias, sid in variables.items()}
+        return httpx.Response(200, json={"data": data})
+
+    async def scenario():
+        async with AsyncStratzClient(transport=httpx.MockTransport(handler)) as client:
+            latest = await client.fetch_latest_matches([1, 2, 3], chunk_size=2)
+            quota = await client.fetch_latest_matches([1, 99], chunk_size=1)
+            single = await client.fetch_latest_match(99)
+            failed = []
+            partial = await client.fetch_latest_matches([1, 77, 3], chunk_size=1, failed=failed)
+        return latest, quota, single, partial, failed
+
+    latest, quota, single, partial, failed = asyncio.run(scenario())
+    assert partial == {1: 1001, 3: 1003} and failed == [77]
+    assert latest == {1: 1001, 2: 1002, 3: 1003}
+    assert quota == {"error": "quota_exceeded"}
+    assert single == {"error": "quota_exceeded"}
+
+
+def test_async_default_client_is_per_loop_and_released_with_it():
+    import asyncio
+    import gc
+    import bot.stratz_async as stratz_async
+
+    async def grab():
+        return stratz_async._default_client()
+
+    first_loop = asyncio.new_event_loop()
+    first = first_loop.run_until_complete(grab())
+    assert first_loop.run_until_complete(grab()) is first
+    first_loop.run_until_complete(first.aclose())
+    first_loop.close()
+    del first_loop
+    gc.collect()
+    assert len(stratz_async._CLIENTS) == 0
+
+    async def scenario():
+        client = stratz_async._default_client()
+        await stratz_async.aclose_default_client()
+        return client
+
+    assert asyncio.run(scenario()) is not first
+    assert len(stratz_async._CLIENTS) == 0
+
+
+def test_async_full_match_keeps_the_store_off_the_loop(monkeypatch):
+    import asyncio
+    import threading
+    import bot.stratz_async as stratz_async
+
+    loop_threads = []
+    store_threads = []
+
+    def load_match(mid):
+        store_threads.append(threading.get_ident())
+        return {"id": mid, "players": []}
+
+    monkeypatch.setattr(stratz_async, "load_match", load_match)
+
+    async def scenario():
+        loop_threads.append(threading.get_ident())
+        async with stratz_async.AsyncStratzClient() as client:
+            return await client.fetch_full_match(5)
+
+    assert asyncio.run(scenario()) == {"id": 5, "players": []}
+    assert store_threads and store_threads[0] != loop_threads[0]
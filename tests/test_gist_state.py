@@ -0,0 +1,62 @@
+import json
+
+import bot.gist_state as gist_state
+
+
+class _Response:
+    def __init__(self, status_code, body=None, etag=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = {"ETag": etag} if etag else {}
+        self.text = ""
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class _FakeGitHub:
+    def __init__(self, content):
+        self.content = content
+        self.etag = '"v1"'
+        self.gets = []
+        self.patches = 0
+
+    def get(self, url, headers):
+        self.gets.append(headers.get("If-None-Match"))
+        if headers.get("If-None-Match") == self.etag:
+            return _Response(304)
+        files = {gist_state.GIST_FILENAME: {"content": self.content}}
+        return _Response(200, {"files": files}, self.etag)
+
+    def patch(self, url, headers, json):
+        self.patches += 1
+        self.content = json["files"][gist_state.GIST_FILENAME]["content"]
+        self.etag = f'"v{self.patches + 1}"'
+        return _Response(200, {}, self.etag)
+
+
+def test_conditional_load_and_unchanged_save(monkeypatch, tmp_path):
+    github = _FakeGitHub(json.dumps({"123": 456}, indent=2))
+    monkeypatch.setattr(gist_state, "requests", github)
+    monkeypatch.setattr(gist_state, "CACHE_PATH", str(tmp_path / "gist.json"))
+
+    state = gist_state.load_state()
+    assert state == {"123": 456}
+    assert gist_state.save_state(state) is False
+    assert github.patches == 0
+
+    # Second run: cached ETag → 304, no body, still no PATCH
+    assert gist_state.load_state() == {"123": 456}
+    assert github.gets == [None, '"v1"']
+
+    state["789"] = 1
+    assert gist_state.save_state(state) is True
+    assert github.content == '{"123":456,"789":1}'
+
+    # The PATCH's ETag is reused, so the next load is a 304 served from the cache
+    assert gist_state.load_state() == {"123": 456, "789": 1}
+    assert github.gets[-1] == '"v2"'
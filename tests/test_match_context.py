@@ -0,0 +1,61 @@
+import copy
+import json
+import random
+from pathlib import Path
+
+from bot.match_context import MatchContext, clear_match_contexts, match_context
+from feedback.engine_pkg.core import SLOT_INDEX, build_record
+
+SAMPLES = Path(__file__).parent / "samples"
+
+
+def _synthetic_match(seed: int) -> dict:
+    rng = random.Random(seed)
+    players = [
+        {
+            "steamAccountId": 1000 + i,
+            "isRadiant": i < 5,
+            "kills": rng.randint(0, 15),
+            "deaths": rng.randint(0, 12),
+            "assists": rng.randint(0, 25),
+            "goldPerMinute": rng.choice([300, 450, 450, 600]),
+            "experiencePerMinute": rng.randint(300, 800),
+            "roleBasic": rng.choice(["CORE", "SOFTSUPPORT", "HARDSUPPORT", None]),
+            "lane": rng.choice(["SAFE_LANE", "MID", "OFFLANE", None]),
+        }
+        for i in range(10)
+    ]
+    return {"id": seed, "gameMode": rng.choice([22, 23, "TURBO", None]), "durationSeconds": 2100, "players": players}
+
+
+def test_team_totals_and_roles_match_per_player_logic():
+    for seed in range(50):
+        match = _synthetic_match(seed)
+        ctx = MatchContext(match)
+        for player in match["players"]:
+            stats = {"roleBasic": player["roleBasic"] or "", "lane": player["lane"] or ""}
+            derived = build_record(stats, 0)[SLOT_INDEX["roleCategory"]]
+            assert ctx.role_category(player) == derived
+            team = [p for p in match["players"] if p["isRadiant"] == player["isRadiant"]]
+            assert ctx.team_kills_for(player) == sum(p["kills"] for p in team)
+
+
+def test_context_is_shared_per_payload():
+    match = json.loads((SAMPLES / "match_normal.json").read_text())
+    ctx = match_context(match)
+    assert match_context(match) is ctx
+    assert ctx.mode == "NON_TURBO" and ctx.game_mode_name == "Ranked All Pick"
+
+    # A re-fetched payload for the same match id gets its own context
+    refetched = copy.deepcopy(match)
+    refetched["players"][0]["kills"] += 3
+    fresh = match_context(refetched)
+    assert fresh is not ctx
+    assert fresh.team_kills_for(refetched["players"][0]) == ctx.team_kills_for(match["players"][0]) + 3
+
+    # A pre-set _team_kills still overrides the computed total
+    assert ctx.team_kills_for({"isRadiant": True, "_team_kills": 42}) == 42
+
+    # Cleared per run so a long-lived process does not pin match payloads
+    clear_match_contexts()
+    assert match_context(match) is not ctx
@@ -0,0 +1,113 @@
+from bot.runner_pkg.pending_schedule import PendingSchedule, check_delay, schedule_retry
+
+
+def test_schedule_orders_expiries_and_due_checks():
+    now = 100_000.0
+    expiry = lambda entry: 12 * 3600
+    pending = {
+        "1:1": {"postedAt": now - 60},                            # fresh: first check not due yet
+        "2:1": {"postedAt": now - 13 * 3600},                     # expired
+        "3:1": {"postedAt": now - 2 * 3600, "nextCheckAt": now - 5},
+        "4:1": {"postedAt": now - 3 * 3600},                      # legacy entry, due
+        "5:1": {"postedAt": now - 14 * 3600},                     # expired earlier
+        "6:1": {"postedAt": now - 3600, "nextCheckAt": now + 600},
+    }
+    schedule = PendingSchedule(pending, now, expiry)
+
+    assert schedule.pop_expired() == ["5:1", "2:1"]
+    assert schedule.pop_due() == ["4:1", "3:1"]
+    assert schedule.skipped == 2
+    assert schedule.next_due() == now + 600
+
+
+def test_retry_backoff_grows_and_caps(monkeypatch):
+    monkeypatch.setenv("PENDING_CHECK_BASE_SEC", "600")
+    monkeypatch.setenv("PENDING_CHECK_MAX_SEC", "3600")
+    assert [check_delay(n) for n in range(5)] == [600, 1200, 2400, 3600, 3600]
+
+    entry = {"postedAt": 0}
+    schedule_retry(entry, 1000)
+    schedule_retry(entry, 5000)
+    assert entry == {"postedAt": 0, "checkAttempts": 2, "nextCheckAt": 5000 + 2400}
+
+
+def test_expiry_retry_after_lost_drop_skips_the_patch(monkeypatch, tmp_path):
+    import bot.runner_pkg.pending as pending
+    import bot.runner_pkg.webhook_client as client
+    import bot.state_pkg.journal as journal
+    from bot.formatter import build_fallback_embed, embed_content_hash
+
+    journal_path = str(tmp_path / "journal.jsonl")
+    monkeypatch.setattr(journal, "_JOURNAL", journal.StateJournal(journal_path))
+    monkeypatch.setenv("STATE_COMPACT_EVERY", "0")
+    monkeypatch.setitem(pending.CONFIG, "webhook_enabled", True)
+    monkeypatch.setattr(client, "throttle_webhook", lambda *a, **k: None)
+    monkeypatch.setattr(client, "_LAST_EDIT_HASH", {})
+    patches = []
+    status = [500]
+
+    class _Transport:
+        def request(self, method, url, json, timeout=10):
+            patches.append(json)
+            return type("R", (), {"status_code": status[0], "headers": {}, "text": ""})()
+
+    monkeypatch.setattr(client, "get_webhook_transport", lambda: _Transport())
+
+    snapshot = {"playerName": "P", "emoji": "⏳", "title": "(Pending Stats)", "kda": "1/2/3", "matchId": 7}
+    entry = {
+        "steamId": 1, "matchId": 7, "messageId": "m1", "postedAt": 0,
+        "webhookBase": "https://discord.invalid/api/webhooks/1/t",
+        "snapshot": snapshot, "embedHash": embed_content_hash(build_fallback_embed(snapshot)),
+    }
+    state = {"pending": {"7:1": dict(entry)}}
+
+    # 1) The PATCH fails: the entry stays, nothing recorded
+    assert pending._expire_entry(state, "7:1", state["pending"]["7:1"], 7, 1)
+    assert len(patches) == 1 and "7:1" in state["pending"]
+
+    # 2) The PATCH lands but the drop is lost (crash before drop_pending)
+    status[0] = 204
+    monkeypatch.setattr(pending, "drop_pending", lambda *a, **k: None)
+    assert pending._expire_entry(state, "7:1", state["pending"]["7:1"], 7, 1)
+    assert len(patches) == 2
+
+    # 3) Fresh process: state rebuilt from the journal, no in-process edit memory
+    crashed = journal.get_state_journal()
+    crashed._file.close()  # process exit releases the journal lock
+    crashed._file = None
+    monkeypatch.undo()
+    monkeypatch.setattr(journal, "_JOURNAL", journal.StateJournal(journal_path))
+    monkeypatch.setenv("STATE_COMPACT_EVERY", "0")
+    monkeypatch.setitem(pending.CONFIG, "webhook_enabled", True)
+    monkeypatch.setattr(client, "_LAST_EDIT_HASH", {})
+    monkeypatch.setattr(client, "get_webhook_transport", lambda: _Transport())
+    monkeypatch.setattr(client, "throttle_webhook", lambda *a, **k: None)
+    restarted = {"pending": {"7:1": dict(entry)}}
+    journal.get_state_journal().replay(restarted)
+
+    assert pending._expire_entry(restarted, "7:1", restarted["pending"]["7:1"], 7, 1)
+    assert len(patches) == 2  # already showing the expired embed → no re-PATCH
+    assert "7:1" not in restarted["pending"]
+
+
+def test_failed_probe_chunk_leaves_the_schedule_alone(monkeypatch, tmp_path):
+    import bot.runner_pkg.pending as pending
+    import bot.state_pkg.journal as journal
+
+    monkeypatch.setattr(journal, "_JOURNAL", journal.StateJournal(str(tmp_path / "journal.jsonl")))
+    monkeypatch.setattr(pending, "is_hard_blocked", lambda: False)
+    monkeypatch.setattr(pending, "webhook_cooldown_active", lambda: False)
+    monkeypatch.setattr(pending, "get_full_match", lambda mid: None)
+    # Match 7's chunk answered (IMP not in yet); match 8's chunk failed, so it is absent
+    monkeypatch.setattr(pending, "probe_imp_readiness", lambda ids: {7: {1: None}})
+
+    now = pending.time.time()
+    state = {"pending": {
+        "7:1": {"steamId": 1, "matchId": 7, "postedAt": now - 3600},
+        "8:1": {"steamId": 1, "matchId": 8, "postedAt": now - 3600, "nextCheckAt": now - 5},
+    }}
+    assert pending.process_pending_upgrades_and_expiry(state)
+
+    assert state["pending"]["7:1"]["checkAttempts"] == 1
+    assert state["pending"]["7:1"]["nextCheckAt"] > now
+    assert state["pending"]["8:1"] == {"steamId": 1, "matchId": 8, "postedAt": now - 3600, "nextCheckAt": now - 5}
@@ -0,0 +1,111 @@
+import bot.runner_pkg.pipeline as pipeline
+
+
+def _patch_stages(monkeypatch, published, fail_on=None):
+    monkeypatch.setattr(pipeline, "is_hard_blocked", lambda: False)
+    monkeypatch.setattr(pipeline, "webhook_cooldown_active", lambda: False)
+    monkeypatch.setattr(
+        pipeline, "prepare_player",
+        lambda name, sid, last, latest: None if sid % 3 == 0 else {"playerName": name, "steamId": sid},
+    )
+    monkeypatch.setattr(pipeline, "build_player_post", lambda job: dict(job, kind="full"))
+
+    def publish(post, state, outbox=None):
+        if post["steamId"] == fail_on:
+            return False
+        published.append(post["steamId"])
+        state[str(post["steamId"])] = post["steamId"] * 10
+        return True
+
+    monkeypatch.setattr(pipeline, "publish_player_post", publish)
+
+
+def test_pipeline_processes_every_player(monkeypatch):
+    published = []
+    _patch_stages(monkeypatch, published)
+    players = {f"p{i}": i for i in range(1, 21)}
+    state = {}
+
+    assert pipeline.run_player_pipeline(players, state, {}) is None
+    expected = [i for i in range(1, 21) if i % 3]
+    assert sorted(published) == expected
+    assert state == {str(i): i * 10 for i in expected}
+
+
+def test_pipeline_stops_when_post_stage_fails(monkeypatch):
+    published = []
+    _patch_stages(monkeypatch, published, fail_on=1)
+    monkeypatch.setenv("PIPELINE_FETCH_WORKERS", "1")
+    monkeypatch.setenv("PIPELINE_QUEUE_SIZE", "1")
+    players = {f"p{i}": i for i in range(1, 200)}
+
+    assert pipeline.run_player_pipeline(players, {}, {}) == "stopped"
+    assert len(published) < len(players) - 1
+
+
+class _FakeOutbox:
+    def __init__(self, url):
+        self.items = []
+        self.flushed = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, steam_id):
+        self.items.append(steam_id)
+
+    def flush(self):
+        self.flushed.extend(self.items)
+        self.items = []
+        return True
+
+
+def _patch_outbox(monkeypatch, blocked=False):
+    import threading
+
+    created = []
+    parked = []
+    queued = threading.Event()
+
+    def make(url):
+        created.append(_FakeOutbox(url))
+        return created[-1]
+
+    def prepare(name, sid, last, latest):
+        if sid == 3:
+            queued.wait(5)  # quota hits only after the first two posts are queued
+            return {"error": "quota_exceeded"}
+        return {"playerName": name, "steamId": sid}
+
+    def publish(post, state, outbox=None):
+        outbox.add(post["steamId"])
+        if len(outbox) == 2:
+            queued.set()
+        return True
+
+    monkeypatch.setitem(pipeline.CONFIG, "webhook_enabled", True)
+    monkeypatch.setattr(pipeline, "resolve_webhook_for_post", lambda url: "https://example.invalid/hook")
+    monkeypatch.setattr(pipeline, "EmbedOutbox", make)
+    monkeypatch.setattr(pipeline, "park_unsent", lambda state, outbox: parked.extend(outbox.items))
+    monkeypatch.setattr(pipeline, "is_hard_blocked", lambda: False)
+    monkeypatch.setattr(pipeline, "webhook_cooldown_active", lambda: blocked and queued.is_set())
+    monkeypatch.setattr(pipeline, "prepare_player", prepare)
+    monkeypatch.setattr(pipeline, "build_player_post", lambda job: dict(job, kind="full"))
+    monkeypatch.setattr(pipeline, "publish_player_post", publish)
+    return created, parked
+
+
+def test_pipeline_flushes_built_embeds_after_quota_cancel(monkeypatch):
+    created, parked = _patch_outbox(monkeypatch)
+
+    assert pipeline.run_player_pipeline({"a": 1, "b": 2, "c": 3}, {}, {}) == "quota"
+    assert sorted(created[0].flushed) == [1, 2]
+    assert parked == []
+
+
+def test_pipeline_parks_built_embeds_on_webhook_cooldown(monkeypatch):
+    created, parked = _patch_outbox(monkeypatch, blocked=True)
+
+    pipeline.run_player_pipeline({"a": 1, "b": 2, "c": 3}, {}, {})
+    assert created[0].flushed == []
+    assert sorted(parked) == [1, 2]
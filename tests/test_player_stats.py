@@ -0,0 +1,45 @@
+import copy
+import json
+from pathlib import Path
+
+from feedback.engine import analyze_player
+from feedback.extract import extract_player_stats
+from feedback.player_stats import PlayerStats, extract_player_record
+
+SAMPLES = Path(__file__).parent / "samples"
+
+
+def _legacy_dict(player, mode, duration):
+    # extract_player_stats + the formatter's former durationSeconds injection and None-sweep
+    stats = extract_player_stats(player, player.get("stats") or {}, 0, mode)
+    stats["durationSeconds"] = duration
+    for k in list(stats):
+        if stats[k] is None:
+            stats[k] = "" if k in {"lane", "roleBasic"} else ({} if k == "statsBlock" else 0)
+    return stats
+
+
+def test_record_matches_legacy_stats_dict():
+    for name in ("match_normal.json", "match_turbo.json"):
+        match = json.loads((SAMPLES / name).read_text(encoding="utf-8"))
+        for base in match["players"]:
+            player = copy.deepcopy(base)
+            player.update(lane=None, roleBasic="hardsupport", partyId=None, gold=None)
+            player["stats"]["level"] = [3, None]
+            for mode in ("NON_TURBO", "TURBO"):
+                for duration in (match.get("durationSeconds", 0), None):
+                    expected = _legacy_dict(player, mode, duration)
+                    record = extract_player_record(player, player.get("stats") or {}, mode, duration)
+
+                    assert isinstance(record, PlayerStats)
+                    assert list(record.to_dict().items()) == list(expected.items())
+                    assert dict(record) == expected
+                    for key in list(expected) + ["gpm", "xpm", "unknown"]:
+                        assert record.get(key) == expected.get(key)
+                    assert analyze_player(record, {}, "", 30) == analyze_player(expected, {}, "", 30)
+
+
+def test_turbo_record_has_no_economy_keys():
+    record = PlayerStats("TURBO")
+    assert "gpm" not in record and record.get("gpm", "absent") == "absent"
+    assert "gpm" in PlayerStats("NON_TURBO").keys()
@@ -0,0 +1,148 @@
+from bot.state_pkg import SqliteStateBackend, migrate_pending_keys
+
+
+def test_sqlite_backend_writes_only_changed_rows(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    backend = SqliteStateBackend(path)
+    backend.replace_all({"1": 10, "2": 20, "pending": {"5:1": {"steamId": 1, "messageId": "m"}}})
+
+    state = SqliteStateBackend(path).load()
+    assert state == {"1": 10, "2": 20, "pending": {"5:1": {"steamId": 1, "messageId": "m"}}}
+
+    backend = SqliteStateBackend(path)
+    state = backend.load()
+    assert backend.save(state) is False
+
+    state["2"] = 21
+    backend.touch("state_kv", "2")  # in-place edits outside the mutation helpers must be reported
+    state["pending"].pop("5:1")
+    state["pending"]["6:2"] = {"steamId": 2}
+    assert backend.save(state) is True
+    assert SqliteStateBackend(path).load() == {"1": 10, "2": 21, "pending": {"6:2": {"steamId": 2}}}
+
+
+def test_sqlite_backend_reads_and_writes_only_touched_rows(monkeypatch, tmp_path):
+    import bot.state_pkg.backend as backend_mod
+    import bot.state_pkg.journal as journal
+    from bot.state_pkg import load_state, record_posted, put_pending, save_state
+
+    path = str(tmp_path / "state.sqlite3")
+    roster = {str(sid): sid * 10 for sid in range(1, 201)}
+    SqliteStateBackend(path).replace_all(dict(roster, outbox={}, pending={"5:1": {"steamId": 1}}))
+
+    db = SqliteStateBackend(path)
+    monkeypatch.setattr(backend_mod, "_BACKEND", db)
+    monkeypatch.setattr(journal, "_JOURNAL", journal.StateJournal(str(tmp_path / "journal.jsonl")))
+    monkeypatch.setenv("STATE_COMPACT_EVERY", "0")
+
+    state = load_state([3, 4])
+    assert state == {"3": 30, "4": 40, "outbox": {}, "pending": {"5:1": {"steamId": 1}}}
+
+    record_posted(state, 3, 31)
+    put_pending(state, "6:4", {"steamId": 4})
+    statements = []
+    db._connect().set_trace_callback(statements.append)
+    assert save_state(state)
+    writes = [sql for sql in statements if sql.startswith("INSERT") or sql.startswith("DELETE")]
+    assert len(writes) == 2  # the two touched rows; nothing unloaded was deleted
+
+    everything = SqliteStateBackend(path).load()
+    assert everything["3"] == 31 and everything["200"] == 2000
+    assert everything["pending"] == {"5:1": {"steamId": 1}, "6:4": {"steamId": 4}}
+
+
+def test_legacy_pending_keys_are_migrated():
+    state = {"pending": {"100": {"steamId": 7}, "101": {}, "102:8": {"steamId": 8}}}
+    assert migrate_pending_keys(state)["pending"] == {
+        "100:7": {"steamId": 7}, "101": {}, "102:8": {"steamId": 8},
+    }
+
+
+def test_journal_replays_mutations_after_a_crash(monkeypatch, tmp_path):
+    import bot.state_pkg.backend as backend
+    import bot.state_pkg.journal as journal
+    from bot.state_pkg import load_state, save_state, record_posted, put_pending, drop_pending
+
+    monkeypatch.setattr(backend, "_BACKEND", SqliteStateBackend(str(tmp_path / "state.sqlite3")))
+    monkeypatch.setattr(journal, "_JOURNAL", journal.StateJournal(str(tmp_path / "journal.jsonl")))
+    monkeypatch.setenv("STATE_COMPACT_EVERY", "0")
+
+    state = load_state()
+    put_pending(state, "5:1", {"steamId": 1})
+    record_posted(state, 1, 5)
+    put_pending(state, "6:2", {"steamId": 2})
+    drop_pending(state, "6:2")
+    with open(tmp_path / "journal.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"op":"set","key":"3"')  # torn write at the moment of the crash
+
+    # "Restart" without save_state: the journal restores every completed mutation
+    monkeypatch.setattr(backend, "_BACKEND", SqliteStateBackend(str(tmp_path / "state.sqlite3")))
+    state = load_state()
+    assert state == {"1": 5, "pending": {"5:1": {"steamId": 1}}}
+
+    assert save_state(state) is True
+    assert not (tmp_path / "journal.jsonl").exists()
+    assert load_state() == {"1": 5, "pending": {"5:1": {"steamId": 1}}}
+
+
+def test_journal_compacts_periodically(monkeypatch, tmp_path):
+    import bot.state_pkg.backend as backend
+    import bot.state_pkg.journal as journal
+    from bot.state_pkg import record_posted
+
+    db = SqliteStateBackend(str(tmp_path / "state.sqlite3"))
+    monkeypatch.setattr(backend, "_BACKEND", db)
+    monkeypatch.setattr(journal, "_JOURNAL", journal.StateJournal(str(tmp_path / "journal.jsonl")))
+    monkeypatch.setenv("STATE_COMPACT_EVERY", "3")
+
+    state = db.load()
+    for sid in range(1, 5):
+        record_posted(state, sid, sid * 10)
+
+    assert SqliteStateBackend(db.path).load() == {"1": 10, "2": 20, "3": 30, "pending": {}}
+    assert journal.get_state_journal().entries == 1
+
+
+def test_failed_compaction_backs_off(monkeypatch, tmp_path):
+    import bot.state_pkg.journal as journal
+    import bot.state_pkg.mutations as mutations
+    from bot.state_pkg import record_posted
+
+    saves = []
+
+    def failing_save(state):
+        saves.append(len(saves))
+        raise TimeoutError("gist down")
+
+    monkeypatch.setattr(journal, "_JOURNAL", journal.StateJournal(str(tmp_path / "journal.jsonl")))
+    monkeypatch.setattr(mutations, "save_state", failing_save)
+    monkeypatch.setenv("STATE_COMPACT_EVERY", "3")
+
+    state = {}
+    for sid in range(1, 9):
+        record_posted(state, sid, sid * 10)
+
+    # Tried at entry 3, then not again until 3 more entries (6), not on every post
+    assert len(saves) == 2
+    assert journal.get_state_journal().entries == 8
+
+
+def test_journal_has_a_single_writer(tmp_path):
+    import pytest
+    import bot.state_pkg.journal as journal
+
+    if journal.fcntl is None:
+        pytest.skip("flock unavailable")
+    path = str(tmp_path / "journal.jsonl")
+    owner = journal.StateJournal(path)
+    other = journal.StateJournal(path)
+    owner.append({"op": "set", "key": "1", "value": 10})
+
+    with pytest.raises(OSError):
+        other.append({"op": "set", "key": "2", "value": 20})
+    other.truncate()  # must not delete the owner's journal
+    assert other.replay({}) == 1
+
+    owner.truncate()
+    other.append({"op": "set", "key": "2", "value": 20})  # the lock is free again
+    other.truncate()
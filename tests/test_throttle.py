@@ -0,0 +1,106 @@
+from bot.throttle import SlidingWindowLimiter
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def test_per_second_window():
+    clock = FakeClock()
+    limiter = SlidingWindowLimiter([(1.0, 3), (60.0, 5)], clock=clock)
+    assert [limiter.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert abs(limiter.try_acquire() - 1.0) < 1e-9
+    clock.t += 0.5
+    assert abs(limiter.try_acquire() - 0.5) < 1e-9
+    clock.t += 0.5
+    assert limiter.try_acquire() == 0.0
+
+
+def test_longest_window_dominates():
+    clock = FakeClock()
+    limiter = SlidingWindowLimiter([(1.0, 3), (60.0, 5)], clock=clock)
+    for _ in range(5):
+        clock.t += 1.0
+        assert limiter.try_acquire() == 0.0
+    # Five calls in the last minute: wait until the first of them (t=1001) ages out
+    assert abs(limiter.try_acquire() - (1001.0 + 60.0 - clock.t)) < 1e-9
+    clock.t = 1061.0
+    assert limiter.try_acquire() == 0.0
+
+
+def test_rejected_attempts_are_not_recorded():
+    clock = FakeClock()
+    limiter = SlidingWindowLimiter([(10.0, 1)], clock=clock)
+    assert limiter.try_acquire() == 0.0
+    for _ in range(100):
+        assert limiter.try_acquire() > 0
+    clock.t += 10.0
+    assert limiter.try_acquire() == 0.0
+
+
+def test_persistent_state_survives_reopen_and_is_shared(tmp_path):
+    from bot.throttle import PersistentWindowLimiter
+
+    clock = FakeClock()
+    path = str(tmp_path / "throttle_test.bin")
+    first = PersistentWindowLimiter([(60.0, 3)], path, clock=clock)
+    second = PersistentWindowLimiter([(60.0, 3)], path, clock=clock)
+
+    assert first.try_acquire() == 0.0
+    assert second.try_acquire() == 0.0
+    assert first.try_acquire() == 0.0
+    assert second.try_acquire() > 0  # budget is shared through the file
+
+    reopened = PersistentWindowLimiter([(60.0, 3)], path, clock=clock)
+    assert abs(reopened.try_acquire() - 60.0) < 1e-9
+    clock.t += 60.0
+    assert reopened.try_acquire() == 0.0
+
+
+def test_persistent_state_resizes_when_caps_change(tmp_path):
+    from bot.throttle import PersistentWindowLimiter
+
+    clock = FakeClock()
+    path = str(tmp_path / "throttle_test.bin")
+    small = PersistentWindowLimiter([(60.0, 2)], path, clock=clock)
+    small.try_acquire()
+    small.try_acquire()
+
+    larger = PersistentWindowLimiter([(60.0, 3)], path, clock=clock)
+    assert larger.try_acquire() == 0.0
+    assert larger.try_acquire() > 0
+
+
+def test_persistent_state_shrink_swaps_file_without_breaking_old_mapping(tmp_path):
+    from bot.throttle import PersistentWindowLimiter
+
+    clock = FakeClock()
+    path = str(tmp_path / "throttle_test.bin")
+    large = PersistentWindowLimiter([(60.0, 4)], path, clock=clock)
+    large.try_acquire()
+
+    small = PersistentWindowLimiter([(60.0, 2)], path, clock=clock)
+    assert small.try_acquire() == 0.0
+    assert small.try_acquire() > 0  # newest timestamp carried over
+
+    # The old process keeps working on its (now unlinked) mapping instead of faulting
+    assert large.try_acquire() == 0.0
+    large.close()
+    small.close()
+
+
+def test_limiters_are_built_lazily_under_state_dir(tmp_path, monkeypatch):
+    import bot.throttle as throttle
+
+    state_dir = tmp_path / "lazy"
+    monkeypatch.setenv("THROTTLE_STATE_DIR", str(state_dir))
+    throttle.reset_limiters()
+    assert not state_dir.exists()
+
+    assert throttle.try_throttle() == 0.0
+    assert (state_dir / "throttle_stratz.bin").exists()
+    assert not (state_dir / "throttle_webhook.bin").exists()
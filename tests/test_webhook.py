@@ -0,0 +1,150 @@
+from bot.runner_pkg.webhook_transport import WebhookTransport
+
+BASE = "https://discord.com/api/webhooks/123/token"
+
+
+def test_route_key_collapses_message_ids():
+    key = WebhookTransport.route_key
+    assert key("patch", f"{BASE}/messages/111") == key("PATCH", f"{BASE}/messages/222?x=1")
+    assert key("POST", f"{BASE}?wait=true") == key("POST", BASE)
+    assert key("POST", BASE) != key("PATCH", f"{BASE}/messages/1")
+
+
+def test_bucket_headers_drive_pacing():
+    transport = WebhookTransport()
+    route = transport.route_key("POST", BASE)
+    assert transport.wait_time(route) == 0.0
+
+    transport._update(route, {"X-RateLimit-Remaining": "1", "X-RateLimit-Reset-After": "2.0"})
+    assert transport.wait_time(route) == 0.0
+
+    transport._update(route, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "2.0"})
+    assert 1.5 < transport.wait_time(route) <= 2.0
+
+
+def test_routes_sharing_a_discord_bucket_wait_together():
+    transport = WebhookTransport()
+    post = transport.route_key("POST", BASE)
+    edit = transport.route_key("PATCH", f"{BASE}/messages/1")
+    transport._update(post, {"X-RateLimit-Bucket": "abc", "X-RateLimit-Remaining": "3", "X-RateLimit-Reset-After": "1"})
+    transport._update(edit, {"X-RateLimit-Bucket": "abc", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "1"})
+    assert transport.wait_time(post) > 0
+
+
+def test_outbox_batches_by_embed_count_and_size(monkeypatch):
+    import bot.runner_pkg.outbox as outbox_mod
+
+    sent = []
+
+    def fake_post(embeds, url, want_message_id=False):
+        sent.append(len(embeds))
+        return True, f"m{len(sent)}"
+
+    monkeypatch.setattr(outbox_mod, "post_to_discord_embeds", fake_post)
+    box = outbox_mod.EmbedOutbox(BASE)
+    posted = []
+    small = {"title": "t", "description": "x" * 10}
+    big = {"title": "t", "description": "x" * 2500}
+
+    for _ in range(3):
+        assert box.add(big, lambda mid, i, n: posted.append((mid, i, n)))
+    for _ in range(4):
+        assert box.add(small, lambda mid, i, n: posted.append((mid, i, n)))
+    assert box.flush()
+
+    # 3 × 2501 chars overflow 6000 → [big, big] then [big, small × 4]
+    assert sent == [2, 5]
+    assert posted[:2] == [("m1", 0, 2), ("m1", 1, 2)]
+    assert posted[-1] == ("m2", 4, 5)
+
+    sent.clear()
+    for _ in range(10):
+        box.add(small, lambda *a: None)
+    assert sent == [10] and len(box) == 0
+
+
+def test_outbox_keeps_unsent_embeds_on_cooldown(monkeypatch):
+    import bot.runner_pkg.outbox as outbox_mod
+
+    monkeypatch.setattr(outbox_mod, "post_to_discord_embeds", lambda *a, **k: (False, None))
+    monkeypatch.setattr(outbox_mod, "is_hard_blocked", lambda: False)
+    monkeypatch.setattr(outbox_mod, "webhook_cooldown_active", lambda: True)
+    box = outbox_mod.EmbedOutbox(BASE)
+    box.add({"title": "a"}, lambda *a: None)
+    box.add({"title": "b"}, lambda *a: None)
+    assert box.flush() is False
+    assert [embed["title"] for embed, _ in box.pending()] == ["a", "b"]
+
+
+def test_edit_skipped_when_embed_content_unchanged(monkeypatch):
+    import bot.runner_pkg.webhook_client as client
+    from bot.formatter_pkg.embed import embed_content_hash
+
+    sent = []
+
+    class _Transport:
+        def request(self, method, url, json, timeout=10):
+            sent.append(json)
+            return type("R", (), {"status_code": 200, "headers": {}, "text": ""})()
+
+    monkeypatch.setattr(client, "get_webhook_transport", lambda: _Transport())
+    monkeypatch.setattr(client, "throttle_webhook", lambda *a, **k: None)
+    monkeypatch.setattr(client, "_LAST_EDIT_HASH", {})
+
+    embed = {"title": "a", "fields": [], "timestamp": "2024-01-01T00:00:00"}
+    rebuilt = dict(embed, timestamp="2024-01-01T00:05:00")
+    assert embed_content_hash(embed) == embed_content_hash(rebuilt)
+    assert embed_content_hash(embed) != embed_content_hash(dict(embed, title="b"))
+
+    # Stored hash says the message already shows it → no PATCH
+    assert client.edit_discord_message("1", rebuilt, BASE, last_hash=embed_content_hash(embed))
+    assert sent == []
+
+    # After a successful edit, an identical retry in the same process is skipped too
+    assert client.edit_discord_message("2", embed, BASE)
+    assert client.edit_discord_message("2", rebuilt, BASE)
+    assert len(sent) == 1
+
+
+def test_durable_outbox_parks_on_cooldown_and_drains_next_run(monkeypatch, tmp_path):
+    import bot.runner_pkg.outbox as outbox_mod
+    import bot.runner_pkg.durable_outbox as durable
+    import bot.state_pkg.journal as journal
+    from bot.runner_pkg.players import post_record
+
+    monkeypatch.setattr(journal, "_JOURNAL", journal.StateJournal(str(tmp_path / "journal.jsonl")))
+    monkeypatch.setenv("STATE_COMPACT_EVERY", "0")
+    monkeypatch.setitem(durable.CONFIG, "webhook_enabled", True)
+    monkeypatch.setattr(outbox_mod, "is_hard_blocked", lambda: False)
+    cooling = [True]
+    monkeypatch.setattr(outbox_mod, "webhook_cooldown_active", lambda: cooling[0])
+    sent = []
+
+    def fake_post(embeds, url, want_message_id=False):
+        if cooling[0]:
+            return False, None
+        sent.append(len(embeds))
+        return True, "msg"
+
+    monkeypatch.setattr(outbox_mod, "post_to_discord_embeds", fake_post)
+
+    posts = [
+        {"kind": "full", "playerName": "a", "steamId": 1, "matchId": 10, "embed": {"title": "a"}},
+        {"kind": "fallback", "playerName": "b", "steamId": 2, "matchId": 20, "embed": {"title": "b"}, "result": {}},
+    ]
+    state = {}
+    box = outbox_mod.EmbedOutbox(BASE)
+    for post in posts:
+        box.add(post["embed"], lambda *a: None, post_record(post, BASE, "embed"))
+    assert box.flush() is False
+    assert durable.park_unsent(state, box) == 2
+    assert set(state["outbox"]) == {"10:1", "20:2"}
+
+    # Next run: cooldown over, parked posts go out in one message and apply their state
+    cooling[0] = False
+    assert durable.drain_durable_outbox(state) is True
+    assert sent == [2]
+    assert state["outbox"] == {}
+    assert state["1"] == 10 and state["2"] == 20
+    assert state["pending"]["20:2"]["messageId"] == "msg"
+    assert state["pending"]["20:2"]["embedIndex"] == 1